@@ -0,0 +1,53 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from appointments.reminders import get_backend, send_due_reminders
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Worker de recordatorios; puede ejecutarse en varias réplicas a la vez"""
+    help = 'Envía los recordatorios de citas pendientes por lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Citas reclamadas por transacción')
+        parser.add_argument('--lead-minutes', type=int, default=None, help='Ventana de aviso (por defecto REMINDER_LEAD_MINUTES)')
+        parser.add_argument('--backend', default=None, help='Ruta del backend de entrega (por defecto REMINDER_BACKEND)')
+        parser.add_argument('--loop', action='store_true', help='Seguir ejecutando y revisar la cola periódicamente')
+        parser.add_argument('--interval', type=int, default=60, help='Segundos entre revisiones con --loop')
+
+    def handle(self, *args, **options):
+        backend = get_backend(options['backend'])
+        lead_time = timedelta(minutes=options['lead_minutes']) if options['lead_minutes'] else None
+
+        while True:
+            # Fuera del ciclo de peticiones nadie descarta la conexión caída por
+            # un reinicio de PostgreSQL o vencida por CONN_MAX_AGE
+            close_old_connections()
+            try:
+                sent, elapsed = send_due_reminders(backend, batch_size=options['batch_size'], lead_time=lead_time)
+            except Exception:
+                if not options['loop']:
+                    raise
+                # El lote fallido se revirtió y sigue pendiente: se reintenta en la próxima revisión
+                logger.exception('Error enviando recordatorios; reintento en %ss', options['interval'])
+                close_old_connections()
+                time.sleep(options['interval'])
+                continue
+
+            if sent:
+                rate = sent / elapsed if elapsed else float('inf')
+                self.stdout.write(self.style.SUCCESS(
+                    f'✅ {sent} recordatorios enviados en {elapsed:.2f}s ({rate:.1f} recordatorios/s)'
+                ))
+            else:
+                self.stdout.write('ℹ️  No hay recordatorios pendientes')
+
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
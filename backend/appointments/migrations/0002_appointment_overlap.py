@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:02
+
+from django.db import migrations, models
+
+
+EXCLUSION_SQL = """
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+ALTER TABLE appointments_appointment
+    ADD CONSTRAINT appointment_no_overlap
+    EXCLUDE USING gist (
+        professional_id WITH =,
+        tsrange(
+            appointment_date + appointment_time,
+            appointment_date + appointment_time + duration * interval '1 minute',
+            '[)'
+        ) WITH &&
+    )
+    WHERE (status IN ('scheduled', 'confirmed', 'in_progress'));
+"""
+
+
+def backfill_duration(apps, schema_editor):
+    Appointment = apps.get_model('appointments', 'Appointment')
+    Service = apps.get_model('appointments', 'Service')
+    Appointment.objects.update(
+        duration=models.Subquery(Service.objects.filter(pk=models.OuterRef('service_id')).values('duration')[:1])
+    )
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    # Solo PostgreSQL soporta restricciones de exclusión; en otros motores
+    # queda la restricción única parcial sobre la hora de inicio
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(EXCLUSION_SQL)
+
+
+def remove_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE appointments_appointment DROP CONSTRAINT IF EXISTS appointment_no_overlap')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='appointment',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='duration',
+            field=models.PositiveIntegerField(default=30, verbose_name='Duración en minutos'),
+        ),
+        migrations.RunPython(backfill_duration, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['professional', 'appointment_date'], name='appointment_prof_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ('scheduled', 'confirmed', 'in_progress'))), fields=('professional', 'appointment_date', 'appointment_time'), name='appointment_unique_active_start'),
+        ),
+        migrations.RunPython(add_exclusion_constraint, remove_exclusion_constraint),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0002_appointment_overlap'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='appointment',
+            name='appointment_prof_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['professional', '-appointment_date', 'appointment_time', 'id'], name='appointment_prof_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', '-appointment_date', 'appointment_time', 'id'], name='appointment_patient_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:07
+
+from django.conf import settings
+from django.db import migrations, models, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 5000
+
+
+def backfill_bounds(apps, schema_editor):
+    """
+    Rellena starts_at/ends_at en lotes por rango de id, cada lote en su propia
+    transacción, para no bloquear ni reescribir tablas grandes de una vez.
+    """
+    Appointment = apps.get_model('appointments', 'Appointment')
+    connection = schema_editor.connection
+    bounds = Appointment.objects.aggregate(low=models.Min('id'), high=models.Max('id'))
+    if bounds['low'] is None:
+        return
+
+    tz = timezone.get_default_timezone()
+    for low in range(bounds['low'], bounds['high'] + 1, BATCH_SIZE):
+        high = low + BATCH_SIZE
+        with transaction.atomic(using=connection.alias):
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        UPDATE appointments_appointment
+                        SET starts_at = (appointment_date + appointment_time) AT TIME ZONE %s,
+                            ends_at = (appointment_date + appointment_time) AT TIME ZONE %s
+                                      + duration * interval '1 minute'
+                        WHERE id >= %s AND id < %s
+                        """,
+                        [settings.TIME_ZONE, settings.TIME_ZONE, low, high],
+                    )
+                continue
+
+            batch = list(Appointment.objects.filter(id__gte=low, id__lt=high).only(
+                'id', 'appointment_date', 'appointment_time', 'duration'
+            ))
+            for appointment in batch:
+                appointment.starts_at = timezone.make_aware(
+                    timezone.datetime.combine(appointment.appointment_date, appointment.appointment_time), tz
+                )
+                appointment.ends_at = appointment.starts_at + timezone.timedelta(minutes=appointment.duration)
+            Appointment.objects.bulk_update(batch, ['starts_at', 'ends_at'])
+
+
+class Migration(migrations.Migration):
+    # Cada lote del backfill confirma su propia transacción
+    atomic = False
+
+    dependencies = [
+        ('appointments', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Fin'),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Inicio'),
+        ),
+        migrations.RunPython(backfill_bounds, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['professional', 'starts_at'], name='appointment_prof_starts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'starts_at'], name='appointment_patient_starts_idx'),
+        ),
+    ]
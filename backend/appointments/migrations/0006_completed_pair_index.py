@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0005_reminder_due_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('status', 'completed')), fields=['patient', 'professional', 'appointment_date'], name='appointment_completed_pair_idx'),
+        ),
+    ]
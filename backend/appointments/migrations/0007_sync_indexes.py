@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0006_completed_pair_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['professional', 'updated_at', 'id'], name='appointment_prof_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'updated_at', 'id'], name='appointment_patient_sync_idx'),
+        ),
+    ]
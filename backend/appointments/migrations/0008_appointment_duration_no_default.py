@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0007_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appointment',
+            name='duration',
+            field=models.PositiveIntegerField(blank=True, verbose_name='Duración en minutos'),
+        ),
+    ]
@@ -1,7 +1,6 @@
-from django.db import models
+from datetime import timedelta
 
-# Create your models here.
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 
@@ -19,6 +18,76 @@ class Service(models.Model):
     def __str__(self):
         return self.name
 
+# Estados que ocupan la agenda del profesional
+ACTIVE_STATUSES = ('scheduled', 'confirmed', 'in_progress')
+
+# Antelación mínima para poder cancelar una cita
+CANCELLATION_NOTICE = timedelta(hours=2)
+
+def starts_before(moment):
+    """Q para citas que empiezan antes de ``moment``"""
+    return models.Q(starts_at__lt=moment)
+
+def starts_after(moment):
+    """Q para citas que empiezan después de ``moment``"""
+    return models.Q(starts_at__gt=moment)
+
+def appointment_bounds(appointment_date, appointment_time, duration):
+    """(inicio, fin) con zona horaria de una cita en la zona del proyecto"""
+    starts_at = timezone.make_aware(
+        timezone.datetime.combine(appointment_date, appointment_time),
+        timezone.get_default_timezone()
+    )
+    return starts_at, starts_at + timedelta(minutes=duration)
+
+class AppointmentQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create no llama a save(): completar la duración y starts_at/ends_at aquí
+        objs = list(objs)
+        for obj in objs:
+            if obj.duration is None:
+                obj.duration = obj.service.duration
+            obj.set_bounds()
+        return super().bulk_create(objs, *args, **kwargs)
+    
+    def between(self, start, end):
+        """Citas que empiezan en [start, end); usa los índices (…, starts_at)"""
+        return self.filter(starts_at__gte=start, starts_at__lt=end)
+    
+    def for_user(self, user):
+        """Citas visibles para el usuario según su tipo (acepta usuarios solo-claims)"""
+        if user.user_type == 'patient':
+            return self.filter(patient_id=user.pk)
+        elif user.user_type == 'professional':
+            return self.filter(professional_id=user.pk)
+        return self.none()
+    
+    def with_related(self):
+        """Carga paciente, profesional y servicio en la misma consulta (evita N+1)"""
+        return self.select_related('patient', 'professional', 'service')
+    
+    def with_flags(self, now):
+        """
+        Calcula ``is_past_due`` y ``can_be_cancelled`` en la base de datos
+        respecto a un único ``now`` (normalmente uno por request).
+        """
+        return self.annotate(
+            db_is_past_due=models.ExpressionWrapper(starts_before(now), output_field=models.BooleanField()),
+            db_can_be_cancelled=models.ExpressionWrapper(
+                starts_after(now + CANCELLATION_NOTICE), output_field=models.BooleanField()
+            ),
+        )
+    
+    def upcoming(self, now):
+        return self.filter(starts_after(now))
+    
+    def cancellable(self, now):
+        return self.filter(starts_after(now + CANCELLATION_NOTICE))
+    
+    def reviewable(self):
+        """Citas finalizadas sin reseña (anti-join LEFT JOIN reviews ... IS NULL)"""
+        return self.filter(status='completed', review__isnull=True)
+
 class Appointment(models.Model):
     """Modelo para citas médicas"""
     
@@ -31,6 +100,8 @@ class Appointment(models.Model):
         ('no_show', 'No presentado'),
     )
     
+    ACTIVE_STATUSES = ACTIVE_STATUSES
+    
     patient = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -52,6 +123,12 @@ class Appointment(models.Model):
     )
     appointment_date = models.DateField(verbose_name='Fecha de la cita')
     appointment_time = models.TimeField(verbose_name='Hora de la cita')
+    # Copia de Service.duration al reservar (save() la completa al crear), usada
+    # por la restricción de solapamiento; no cambia si luego cambia el servicio
+    duration = models.PositiveIntegerField(blank=True, verbose_name='Duración en minutos')
+    # Derivados de fecha, hora y duración (ver set_bounds) para consultas por rango
+    starts_at = models.DateTimeField(null=True, editable=False, verbose_name='Inicio')
+    ends_at = models.DateTimeField(null=True, editable=False, verbose_name='Fin')
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -66,19 +143,87 @@ class Appointment(models.Model):
     reminder_sent = models.BooleanField(default=False, verbose_name='Recordatorio enviado')
     reminder_sent_at = models.DateTimeField(blank=True, null=True)
     
+    objects = AppointmentQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Cita'
         verbose_name_plural = 'Citas'
         ordering = ['-appointment_date', 'appointment_time']
-        unique_together = ['professional', 'appointment_date', 'appointment_time']
+        constraints = [
+            # En PostgreSQL la migración 0002 añade además una restricción de
+            # exclusión sobre el intervalo completo (inicio + duración)
+            models.UniqueConstraint(
+                fields=['professional', 'appointment_date', 'appointment_time'],
+                condition=models.Q(status__in=ACTIVE_STATUSES),
+                name='appointment_unique_active_start',
+            ),
+        ]
+        indexes = [
+            # Sirven tanto a la paginación keyset del listado como a las
+            # búsquedas por rango de fechas de un profesional o paciente
+            models.Index(fields=['professional', '-appointment_date', 'appointment_time', 'id'], name='appointment_prof_keyset_idx'),
+            models.Index(fields=['patient', '-appointment_date', 'appointment_time', 'id'], name='appointment_patient_keyset_idx'),
+            # Rangos de tiempo: agenda, horarios disponibles y recordatorios
+            models.Index(fields=['professional', 'starts_at'], name='appointment_prof_starts_idx'),
+            models.Index(fields=['patient', 'starts_at'], name='appointment_patient_starts_idx'),
+            # Cambios desde una marca de agua (sync, GET /api/sync/)
+            models.Index(fields=['professional', 'updated_at', 'id'], name='appointment_prof_sync_idx'),
+            models.Index(fields=['patient', 'updated_at', 'id'], name='appointment_patient_sync_idx'),
+            # Cola de recordatorios pendientes (appointments.reminders)
+            models.Index(
+                fields=['starts_at'], condition=models.Q(reminder_sent=False),
+                name='appointment_reminder_due_idx'
+            ),
+            # Visitas completadas por pareja paciente-profesional (clinic_history)
+            models.Index(
+                fields=['patient', 'professional', 'appointment_date'], condition=models.Q(status='completed'),
+                name='appointment_completed_pair_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"Cita {self.patient.get_full_name()} con {self.professional.get_full_name()} - {self.appointment_date}"
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self._state.adding and self.duration is None:
+            self.duration = self.service.duration
+        if update_fields is None:
+            self.set_bounds()
+        elif {'appointment_date', 'appointment_time', 'duration'} & set(update_fields):
+            self.set_bounds()
+            kwargs['update_fields'] = {*update_fields, 'starts_at', 'ends_at'}
+        # Atómico junto con lo que escriban los receptores de post_save (outbox)
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+        self._loaded_status = self.status
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Estado leído de la base de datos, para detectar transiciones al guardar
+        status = dict(zip(field_names, values)).get('status')
+        instance._loaded_status = None if status is models.DEFERRED else status
+        return instance
+    
+    @property
+    def previous_status(self):
+        """Estado antes del último save() (None si la cita es nueva)"""
+        return getattr(self, '_loaded_status', None)
+    
+    def set_bounds(self):
+        """Sincroniza starts_at/ends_at con fecha, hora y duración"""
+        if self.appointment_date and self.appointment_time:
+            self.starts_at, self.ends_at = appointment_bounds(
+                self.appointment_date, self.appointment_time, self.duration
+            )
+    
     @property
     def is_past_due(self):
         """Verifica si la cita ya pasó"""
-        appointment_datetime = timezone.make_aware(
+        if hasattr(self, 'db_is_past_due'):
+            return self.db_is_past_due
+        appointment_datetime = self.starts_at or timezone.make_aware(
             timezone.datetime.combine(self.appointment_date, self.appointment_time)
         )
         return appointment_datetime < timezone.now()
@@ -86,8 +231,10 @@ class Appointment(models.Model):
     @property
     def can_be_cancelled(self):
         """Verifica si la cita puede ser cancelada"""
-        appointment_datetime = timezone.make_aware(
+        if hasattr(self, 'db_can_be_cancelled'):
+            return self.db_can_be_cancelled
+        appointment_datetime = self.starts_at or timezone.make_aware(
             timezone.datetime.combine(self.appointment_date, self.appointment_time)
         )
         # Permitir cancelación hasta 2 horas antes
-        return (appointment_datetime - timezone.now()).total_seconds() > 7200
\ No newline at end of file
+        return (appointment_datetime - timezone.now()) > CANCELLATION_NOTICE
\ No newline at end of file
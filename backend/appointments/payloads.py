@@ -0,0 +1,31 @@
+"""
+Representación de una cita para integraciones externas (n8n).
+"""
+
+
+def appointment_payload(appointment):
+    """
+    Datos de la cita que consume n8n. ``appointment`` debe venir con
+    ``with_related()`` para no disparar consultas por fila.
+    """
+    return {
+        'id': appointment.id,
+        'date': str(appointment.appointment_date),
+        'time': str(appointment.appointment_time),
+        'status': appointment.status,
+        'patient': {
+            'id': appointment.patient.id,
+            'name': appointment.patient.get_full_name(),
+            'phone': appointment.patient.phone,
+            'email': appointment.patient.email
+        },
+        'professional': {
+            'name': appointment.professional.get_full_name(),
+            'specialty': appointment.professional.specialty
+        },
+        'service': {
+            'name': appointment.service.name,
+            # Duración propia de la cita (puede diferir de la actual del servicio)
+            'duration': appointment.duration
+        }
+    }
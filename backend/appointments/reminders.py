@@ -0,0 +1,123 @@
+"""
+Envío de recordatorios de citas por lotes.
+
+Cada lote se reclama con ``SELECT ... FOR UPDATE SKIP LOCKED``, se envía al
+backend configurado en ``REMINDER_BACKEND`` y se marca como enviado con un
+único ``UPDATE``, todo en la misma transacción. Varias réplicas pueden
+ejecutar el worker en paralelo sin enviar dos veces el mismo recordatorio.
+"""
+import json
+import logging
+import time
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Appointment
+from .payloads import appointment_payload
+
+logger = logging.getLogger(__name__)
+
+# Estados que reciben recordatorio
+REMINDER_STATUSES = ('scheduled', 'confirmed')
+
+
+# ==================== BACKENDS DE ENTREGA ====================
+
+class BaseReminderBackend:
+    """Recibe una lista de payloads y los entrega; debe lanzar excepción si falla"""
+
+    def send_batch(self, payloads):
+        raise NotImplementedError
+
+
+class WebhookReminderBackend(BaseReminderBackend):
+    """Envía el lote completo en un solo POST JSON al webhook de n8n"""
+
+    def __init__(self, url=None, timeout=10):
+        self.url = url or settings.N8N_REMINDER_WEBHOOK_URL
+        self.timeout = timeout
+
+    def send_batch(self, payloads):
+        body = json.dumps({'event_type': 'reminder', 'appointments': payloads}).encode()
+        request = urllib.request.Request(
+            self.url, data=body, method='POST', headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class LogReminderBackend(BaseReminderBackend):
+    """Solo registra los recordatorios en el log (desarrollo)"""
+
+    def send_batch(self, payloads):
+        for payload in payloads:
+            logger.info(f"Recordatorio cita {payload['id']} para {payload['patient']['email']}")
+
+
+class LocMemReminderBackend(BaseReminderBackend):
+    """Guarda los payloads en ``outbox`` (tests y benchmarks)"""
+    outbox = []
+
+    def send_batch(self, payloads):
+        self.outbox.extend(payloads)
+
+
+def get_backend(path=None):
+    return import_string(path or settings.REMINDER_BACKEND)()
+
+
+# ==================== RECLAMO Y ENVÍO ====================
+
+def due_reminders(now, lead_time=None):
+    """Citas que empiezan dentro de la ventana de aviso y aún sin recordatorio"""
+    lead_time = lead_time or timedelta(minutes=settings.REMINDER_LEAD_MINUTES)
+    return Appointment.objects.filter(
+        reminder_sent=False,
+        status__in=REMINDER_STATUSES,
+        starts_at__gt=now,
+        starts_at__lte=now + lead_time,
+    )
+
+
+def send_reminder_batch(backend, batch_size=200, now=None, lead_time=None):
+    """
+    Reclama hasta ``batch_size`` citas, las envía y las marca como enviadas.
+    Devuelve el número de recordatorios enviados (0 si no quedan pendientes).
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids = list(
+            due_reminders(now, lead_time)
+            .select_for_update(skip_locked=True)
+            .order_by('starts_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+
+        appointments = Appointment.objects.filter(id__in=ids).with_related().order_by('starts_at')
+        backend.send_batch([appointment_payload(appointment) for appointment in appointments])
+
+        # update() no aplica auto_now: sin updated_at la sincronización delta no vería el cambio
+        Appointment.objects.filter(id__in=ids).update(reminder_sent=True, reminder_sent_at=now, updated_at=now)
+    return len(ids)
+
+
+def send_due_reminders(backend=None, batch_size=200, lead_time=None, max_batches=None):
+    """Procesa lotes hasta vaciar la cola. Devuelve ``(enviados, segundos)``"""
+    backend = backend or get_backend()
+    sent = 0
+    batches = 0
+    start = time.perf_counter()
+    while max_batches is None or batches < max_batches:
+        count = send_reminder_batch(backend, batch_size=batch_size, lead_time=lead_time)
+        if not count:
+            break
+        sent += count
+        batches += 1
+    return sent, time.perf_counter() - start
@@ -1,5 +1,43 @@
 from rest_framework import serializers
 from .models import Appointment, Service
+from .slots import is_slot_available
+
+UNAVAILABLE_MESSAGE = "El profesional no está disponible en ese horario"
+
+def booking_duration(service, instance=None):
+    """
+    Duración de la reserva: la guardada en la cita mientras conserve su
+    servicio, o la del servicio al crearla o cambiarlo.
+    """
+    if instance is not None and (service is None or service.pk == instance.service_id):
+        return instance.duration
+    return service.duration
+
+def check_availability(attrs, instance=None):
+    """
+    Valida que el horario solicitado no se solape con otra cita activa del
+    profesional, usando la duración del servicio de ambas citas. En
+    actualizaciones parciales se completan los datos con los de la cita actual.
+    """
+    def current(field):
+        return attrs.get(field, getattr(instance, field, None))
+
+    appointment_date = current('appointment_date')
+    appointment_time = current('appointment_time')
+    professional = current('professional')
+    service = current('service')
+    status = current('status') or 'scheduled'
+    
+    if appointment_date and appointment_time and professional and status in Appointment.ACTIVE_STATUSES:
+        # Verificar que el profesional sea realmente un profesional
+        if not professional.is_professional:
+            raise serializers.ValidationError("El profesional seleccionado no es un profesional de la salud")
+        
+        # Verificar disponibilidad (una sola consulta indexada)
+        duration = booking_duration(service, instance)
+        exclude_id = instance.id if instance else None
+        if not is_slot_available(professional, appointment_date, appointment_time, duration, exclude_id=exclude_id):
+            raise serializers.ValidationError(UNAVAILABLE_MESSAGE)
 
 class ServiceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -24,30 +62,13 @@ class AppointmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
     
     def validate(self, attrs):
-        appointment_date = attrs.get('appointment_date')
-        appointment_time = attrs.get('appointment_time')
-        professional = attrs.get('professional')
-        
-        if appointment_date and appointment_time and professional:
-            # Verificar que el profesional sea realmente un profesional
-            if not professional.is_professional:
-                raise serializers.ValidationError("El profesional seleccionado no es un profesional de la salud")
-            
-            # Verificar disponibilidad
-            conflicting_appointments = Appointment.objects.filter(
-                professional=professional,
-                appointment_date=appointment_date,
-                appointment_time=appointment_time,
-                status__in=['scheduled', 'confirmed']
-            )
-            
-            if self.instance:  # Si es una actualización, excluir la cita actual
-                conflicting_appointments = conflicting_appointments.exclude(id=self.instance.id)
-            
-            if conflicting_appointments.exists():
-                raise serializers.ValidationError("El profesional no está disponible en ese horario")
-        
+        check_availability(attrs, self.instance)
         return attrs
+    
+    def update(self, instance, validated_data):
+        if 'service' in validated_data:
+            validated_data['duration'] = booking_duration(validated_data['service'], instance)
+        return super().update(instance, validated_data)
 
 class AppointmentCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -60,4 +81,5 @@ class AppointmentCreateSerializer(serializers.ModelSerializer):
             # CORREGIDO: usar user_type en lugar de is_patient
             if request.user.user_type != 'patient':
                 raise serializers.ValidationError("Solo los pacientes pueden crear citas")
+        check_availability(attrs)
         return super().validate(attrs)
\ No newline at end of file
@@ -0,0 +1,215 @@
+"""
+Motor de horarios disponibles.
+
+Cada día de la agenda de un profesional se representa como un bitmap (un
+``int`` de Python) donde cada bit equivale a ``SLOT_RESOLUTION`` minutos.
+Las citas activas se marcan como bits ocupados y un horario candidato está
+libre si su máscara no se cruza con el bitmap del día. Todas las citas del
+rango se obtienen con una sola consulta por profesional.
+
+``next_available_slots`` busca los primeros horarios libres entre varios
+profesionales con un merge k-way (``heapq.merge``) de los horarios de cada
+uno, que se generan en orden cronológico y de forma perezosa: las citas se
+cargan por ventanas crecientes de días (una consulta para todos los
+profesionales) y la búsqueda se detiene al juntar los resultados pedidos.
+"""
+import bisect
+import heapq
+import itertools
+from collections import defaultdict
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Appointment, appointment_bounds
+
+# Granularidad del bitmap en minutos (un día completo = 288 bits)
+SLOT_RESOLUTION = 5
+
+DAY_MINUTES = 24 * 60
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def _span_mask(start_minute, end_minute):
+    """Máscara de bits que cubre [start_minute, end_minute)"""
+    first = start_minute // SLOT_RESOLUTION
+    last = -(-end_minute // SLOT_RESOLUTION)  # redondeo hacia arriba
+    return ((1 << (last - first)) - 1) << first
+
+
+def _day_start(day):
+    return appointment_bounds(day, time(0, 0), 0)[0]
+
+
+def load_busy_bitmaps(professional, date_from, date_to, exclude_id=None):
+    """
+    Devuelve ``{fecha: bitmap}`` con los minutos ocupados del profesional
+    entre ``date_from`` y ``date_to`` (inclusive) usando una sola consulta.
+    Las citas que cruzan la medianoche ocupan también el día siguiente.
+    """
+    appointments = Appointment.objects.filter(
+        professional=professional,
+        status__in=Appointment.ACTIVE_STATUSES,
+    ).between(_day_start(date_from - timedelta(days=1)), _day_start(date_to + timedelta(days=1)))
+    if exclude_id is not None:
+        appointments = appointments.exclude(id=exclude_id)
+
+    busy = defaultdict(int)
+    rows = appointments.values_list('appointment_date', 'appointment_time', 'duration')
+    for appointment_date, appointment_time, duration in rows.iterator():
+        for day, mask in _day_masks(appointment_date, _minutes(appointment_time), duration):
+            if day >= date_from:
+                busy[day] |= mask
+    return busy
+
+
+def load_busy_bitmaps_many(professional_ids, date_from, date_to):
+    """``{professional_id: {fecha: bitmap}}`` de varios profesionales con una sola consulta"""
+    appointments = Appointment.objects.filter(
+        professional_id__in=professional_ids,
+        status__in=Appointment.ACTIVE_STATUSES,
+    ).between(_day_start(date_from - timedelta(days=1)), _day_start(date_to + timedelta(days=1)))
+
+    busy = defaultdict(lambda: defaultdict(int))
+    rows = appointments.values_list('professional_id', 'appointment_date', 'appointment_time', 'duration')
+    for professional_id, appointment_date, appointment_time, duration in rows.iterator():
+        for day, mask in _day_masks(appointment_date, _minutes(appointment_time), duration):
+            if day >= date_from:
+                busy[professional_id][day] |= mask
+    return busy
+
+
+def _day_masks(day, start_minute, duration):
+    """Parte el intervalo [inicio, inicio + duración) en máscaras por día"""
+    end_minute = start_minute + duration
+    yield day, _span_mask(start_minute, min(end_minute, DAY_MINUTES))
+    if end_minute > DAY_MINUTES:
+        yield day + timedelta(days=1), _span_mask(0, end_minute - DAY_MINUTES)
+
+
+def is_slot_available(professional, day, start_time, duration, exclude_id=None):
+    """
+    Indica si ``professional`` tiene libre [start_time, start_time + duration)
+    el día ``day``, teniendo en cuenta la duración de las citas existentes.
+    Resuelve con una única consulta sobre el índice (professional, starts_at).
+    """
+    busy = load_busy_bitmaps(professional, day, day + timedelta(days=1), exclude_id=exclude_id)
+    return not any(
+        busy.get(mask_day, 0) & mask
+        for mask_day, mask in _day_masks(day, _minutes(start_time), duration)
+    )
+
+
+def iter_candidate_starts(duration):
+    """Minutos de inicio posibles dentro de la jornada laboral"""
+    step = _setting('APPOINTMENT_SLOT_STEP', 30)
+    day_start = _setting('APPOINTMENT_WORKDAY_START', 8) * 60
+    day_end = _setting('APPOINTMENT_WORKDAY_END', 18) * 60
+    return range(day_start, day_end - duration + 1, step)
+
+
+def get_available_slots(professional, service, date_from, date_to=None, now=None):
+    """
+    Calcula los horarios libres de ``professional`` para ``service`` entre
+    ``date_from`` y ``date_to``. Devuelve ``{fecha: [time, ...]}`` solo con
+    los días laborables del rango.
+    """
+    date_to = date_to or date_from
+    now = timezone.localtime(now or timezone.now())
+    duration = service.duration if service is not None else _setting('APPOINTMENT_SLOT_STEP', 30)
+    working_weekdays = _setting('APPOINTMENT_WORKING_WEEKDAYS', (0, 1, 2, 3, 4))
+
+    busy = load_busy_bitmaps(professional, date_from, date_to)
+    candidates = [(start, _span_mask(start, start + duration)) for start in iter_candidate_starts(duration)]
+
+    slots = {}
+    day = date_from
+    while day <= date_to:
+        if day.weekday() in working_weekdays and day >= now.date():
+            day_busy = busy.get(day, 0)
+            min_start = _minutes(now) + 1 if day == now.date() else 0
+            slots[day] = [
+                time(start // 60, start % 60)
+                for start, mask in candidates
+                if start >= min_start and not day_busy & mask
+            ]
+        day += timedelta(days=1)
+    return slots
+
+
+# ==================== BÚSQUEDA ENTRE PROFESIONALES ====================
+
+class BusyWindows:
+    """
+    Bitmaps ocupados de un grupo de profesionales, cargados bajo demanda por
+    ventanas de días (una consulta por ventana para todos). Las ventanas
+    crecen 1, 2, 4... días hasta ``max_window_days``: lo habitual es
+    encontrar horarios en los primeros días y no leer citas de más.
+    """
+
+    def __init__(self, professional_ids, date_from, max_window_days):
+        self.professional_ids = list(professional_ids)
+        self.max_window_days = max_window_days
+        self.starts = []
+        self.windows = []
+        self.next_start = date_from
+
+    def get(self, professional_id, day):
+        while day >= self.next_start:
+            size = min(2 ** len(self.starts), self.max_window_days)
+            self.starts.append(self.next_start)
+            self.windows.append(None)
+            self.next_start += timedelta(days=size)
+        index = bisect.bisect_right(self.starts, day) - 1
+        window = self.windows[index]
+        if window is None:
+            end = self.starts[index + 1] if index + 1 < len(self.starts) else self.next_start
+            window = self.windows[index] = load_busy_bitmaps_many(
+                self.professional_ids, self.starts[index], end - timedelta(days=1)
+            )
+        return window.get(professional_id, {}).get(day, 0)
+
+
+def _free_starts(professional_id, busy, days, candidates, now):
+    """Horarios libres ``(fecha, minuto, professional_id)`` de un profesional, en orden"""
+    for day in days:
+        day_busy = busy.get(professional_id, day)
+        min_start = _minutes(now) + 1 if day == now.date() else 0
+        for start, mask in candidates:
+            if start >= min_start and not day_busy & mask:
+                yield day, start, professional_id
+
+
+def next_available_slots(professional_ids, service, limit, date_from=None, days=None, now=None):
+    """
+    Los ``limit`` primeros horarios libres entre ``professional_ids`` para
+    ``service`` desde ``date_from`` (hoy por defecto) en los ``days`` días
+    siguientes. Devuelve ``[(fecha, time, professional_id), ...]`` en orden
+    cronológico; los empates se ordenan por id de profesional.
+    """
+    now = timezone.localtime(now or timezone.now())
+    date_from = max(date_from or now.date(), now.date())
+    days = days or _setting('APPOINTMENT_MAX_RANGE_DAYS', 60)
+    duration = service.duration if service is not None else _setting('APPOINTMENT_SLOT_STEP', 30)
+    working_weekdays = _setting('APPOINTMENT_WORKING_WEEKDAYS', (0, 1, 2, 3, 4))
+
+    working_days = [
+        day for day in (date_from + timedelta(days=offset) for offset in range(days))
+        if day.weekday() in working_weekdays
+    ]
+    candidates = [(start, _span_mask(start, start + duration)) for start in iter_candidate_starts(duration)]
+    busy = BusyWindows(professional_ids, date_from, _setting('APPOINTMENT_NEXT_AVAILABLE_WINDOW_DAYS', 7))
+
+    streams = [_free_starts(pid, busy, working_days, candidates, now) for pid in professional_ids]
+    return [
+        (day, time(start // 60, start % 60), professional_id)
+        for day, start, professional_id in itertools.islice(heapq.merge(*streams), limit)
+    ]
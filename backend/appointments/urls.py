@@ -1,14 +1,31 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     ServiceListView, 
     AppointmentListView, 
     AppointmentDetailView,
-    available_slots_view
+    ReviewableAppointmentListView,
+    available_slots_view,
+    next_available_view,
+    agenda_view,
+    appointment_list_async_view,
+    appointment_detail_async_view
 )
 
+# Lecturas async bajo ASGI (ver ASYNC_READ_VIEWS); las escrituras siguen en las vistas DRF
+if settings.ASYNC_READ_VIEWS:
+    appointment_list = appointment_list_async_view
+    appointment_detail = appointment_detail_async_view
+else:
+    appointment_list = AppointmentListView.as_view()
+    appointment_detail = AppointmentDetailView.as_view()
+
 urlpatterns = [
     path('services/', ServiceListView.as_view(), name='services-list'),
     path('available-slots/', available_slots_view, name='available-slots'),
-    path('', AppointmentListView.as_view(), name='appointments-list'),
-    path('<int:pk>/', AppointmentDetailView.as_view(), name='appointment-detail'),
+    path('next-available/', next_available_view, name='next-available'),
+    path('agenda/', agenda_view, name='appointments-agenda'),
+    path('reviewable/', ReviewableAppointmentListView.as_view(), name='appointments-reviewable'),
+    path('', appointment_list, name='appointments-list'),
+    path('<int:pk>/', appointment_detail, name='appointment-detail'),
 ]
\ No newline at end of file
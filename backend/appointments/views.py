@@ -1,24 +1,92 @@
-from rest_framework import generics, permissions
-from .models import Appointment, Service
-from .serializers import AppointmentSerializer, AppointmentCreateSerializer, ServiceSerializer
+import hashlib
+from datetime import time, timedelta
+
+import orjson
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.http import Http404
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_date
+from django.utils.http import parse_etags
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from healthcare_system.async_views import async_read_view
+from healthcare_system.pagination import KeysetPagination
+from users.authentication import ClaimsJWTAuthentication
+from .models import Appointment, Service, appointment_bounds
+from .serializers import AppointmentSerializer, AppointmentCreateSerializer, ServiceSerializer, UNAVAILABLE_MESSAGE
+from .slots import get_available_slots, next_available_slots
+
+User = get_user_model()
+
+# Restricciones que rechazan un horario ocupado (migración 0002 de appointments)
+BOOKING_CONSTRAINTS = frozenset({'appointment_no_overlap', 'appointment_unique_active_start'})
+# SQLSTATE exclusion_violation de PostgreSQL
+EXCLUSION_VIOLATION = '23P01'
+
+def is_booking_conflict(error):
+    """Indica si el ``IntegrityError`` viene de una restricción de solapamiento"""
+    cause = error.__cause__
+    if getattr(cause, 'pgcode', None) == EXCLUSION_VIOLATION:
+        return True
+    return getattr(getattr(cause, 'diag', None), 'constraint_name', None) in BOOKING_CONSTRAINTS
+
+def save_booking(serializer, **kwargs):
+    """
+    Guarda la cita traduciendo a error de validación las violaciones de las
+    restricciones de solapamiento, que cubren las reservas concurrentes que
+    pasaron la validación al mismo tiempo. Cualquier otro ``IntegrityError``
+    se propaga.
+    """
+    try:
+        with transaction.atomic():
+            return serializer.save(**kwargs)
+    except IntegrityError as error:
+        if not is_booking_conflict(error):
+            raise
+        raise ValidationError(UNAVAILABLE_MESSAGE)
 
 class ServiceListView(generics.ListAPIView):
     queryset = Service.objects.all()
     serializer_class = ServiceSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class AppointmentListView(generics.ListCreateAPIView):
+class AppointmentQuerysetMixin:
+    """
+    Queryset de citas del usuario con relaciones precargadas y los flags
+    ``is_past_due``/``can_be_cancelled`` calculados en SQL con un único
+    ``now`` por request.
+    """
+    
+    # Las lecturas solo usan id y user_type del token
+    authentication_classes = [ClaimsJWTAuthentication]
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.now = timezone.now()
+    
+    def get_queryset(self):
+        return Appointment.objects.for_user(self.request.user).with_related().with_flags(self.now)
+
+class AppointmentListView(AppointmentQuerysetMixin, generics.ListCreateAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-appointment_date', 'appointment_time', 'id')
     
     def get_queryset(self):
-        user = self.request.user
-        # CORREGIR: usar user_type en lugar de is_patient/is_professional
-        if user.user_type == 'patient':
-            return Appointment.objects.filter(patient=user)
-        elif user.user_type == 'professional':
-            return Appointment.objects.filter(professional=user)
-        return Appointment.objects.none()
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        # Filtros resueltos en SQL: ?upcoming=true y ?cancellable=true
+        if params.get('upcoming') == 'true':
+            queryset = queryset.upcoming(self.now)
+        if params.get('cancellable') == 'true':
+            queryset = queryset.cancellable(self.now)
+        return queryset
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -28,17 +96,228 @@ class AppointmentListView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         # CORREGIDO: usar user_type en lugar de is_patient
         if self.request.user.user_type == 'patient':
-            serializer.save(patient=self.request.user)
+            save_booking(serializer, patient=self.request.user)
 
-class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ReviewableAppointmentListView(AppointmentQuerysetMixin, generics.ListAPIView):
+    """Citas finalizadas del paciente que aún no tienen reseña"""
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-appointment_date', 'appointment_time', 'id')
     
     def get_queryset(self):
-        user = self.request.user
-        # CORREGIR: usar user_type en lugar de is_patient/is_professional
-        if user.user_type == 'patient':
-            return Appointment.objects.filter(patient=user)
-        elif user.user_type == 'professional':
-            return Appointment.objects.filter(professional=user)
-        return Appointment.objects.none()
\ No newline at end of file
+        # Solo los pacientes dejan reseñas
+        if self.request.user.user_type != 'patient':
+            return Appointment.objects.none()
+        return super().get_queryset().reviewable()
+
+class AppointmentDetailView(AppointmentQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = AppointmentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    
+    def perform_update(self, serializer):
+        appointment = save_booking(serializer)
+        # La fecha pudo cambiar: descartar los flags anotados para recalcularlos
+        appointment.__dict__.pop('db_is_past_due', None)
+        appointment.__dict__.pop('db_can_be_cancelled', None)
+
+# ==================== LECTURAS ASYNC (ASGI) ====================
+
+@async_read_view(AppointmentListView.as_view())
+async def appointment_list_async_view(view, request):
+    """GET de ``AppointmentListView`` con el ORM async (mismos filtros y paginación)"""
+    queryset = view.filter_queryset(view.get_queryset())
+    rows = await view.paginator.apaginate_queryset(queryset, request, view=view)
+    if rows is None:
+        rows = [row async for row in queryset]
+        return Response(view.get_serializer(rows, many=True).data)
+    return view.get_paginated_response(view.get_serializer(rows, many=True).data)
+
+@async_read_view(AppointmentDetailView.as_view())
+async def appointment_detail_async_view(view, request, pk):
+    """GET de ``AppointmentDetailView`` con el ORM async"""
+    try:
+        appointment = await view.filter_queryset(view.get_queryset()).aget(pk=pk)
+    except Appointment.DoesNotExist:
+        raise Http404
+    view.check_object_permissions(request, appointment)
+    return Response(view.get_serializer(appointment).data)
+
+@api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
+@permission_classes([permissions.IsAuthenticated])
+def available_slots_view(request):
+    """
+    Horarios libres de un profesional.
+
+    GET ?professional=<id>&date=YYYY-MM-DD[&service=<id>]
+        -> ["08:00", "08:30", ...] (compatible con CreateAppointment.jsx)
+    GET ?professional=<id>&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD[&service=<id>]
+        -> {"professional": id, "service": id, "slots": {"YYYY-MM-DD": [...]}}
+    """
+    params = request.query_params
+    try:
+        single_date = parse_date(params.get('date') or '')
+        date_from = single_date or parse_date(params.get('date_from') or '')
+        date_to = single_date or parse_date(params.get('date_to') or '') or date_from
+    except ValueError:
+        # Formato válido pero fecha inexistente (2024-02-30)
+        return Response({'error': 'Fecha inválida'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not params.get('professional') or not date_from:
+        return Response(
+            {'error': 'Debe indicar profesional y fecha (date o date_from/date_to)'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    max_days = getattr(settings, 'APPOINTMENT_MAX_RANGE_DAYS', 60)
+    if date_to < date_from or (date_to - date_from) >= timedelta(days=max_days):
+        return Response(
+            {'error': f'El rango de fechas debe ser de 1 a {max_days} días'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        professional = User.objects.get(id=params['professional'], user_type='professional', is_active=True)
+    except (User.DoesNotExist, ValueError):
+        return Response({'error': 'Profesional no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+    service = None
+    if params.get('service'):
+        try:
+            service = Service.objects.get(id=params['service'])
+        except (Service.DoesNotExist, ValueError):
+            return Response({'error': 'Servicio no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+    slots = get_available_slots(professional, service, date_from, date_to)
+
+    if single_date:
+        return Response([slot.strftime('%H:%M') for slot in slots.get(single_date, [])])
+
+    return Response({
+        'professional': professional.id,
+        'service': service.id if service else None,
+        'slots': {
+            day.isoformat(): [slot.strftime('%H:%M') for slot in day_slots]
+            for day, day_slots in slots.items()
+        }
+    })
+
+
+@api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
+@permission_classes([permissions.IsAuthenticated])
+def next_available_view(request):
+    """
+    Primeros horarios libres entre todos los profesionales de una especialidad.
+
+    GET ?specialty=<especialidad>&service=<id>[&limit=10][&date_from=YYYY-MM-DD]
+        -> {"specialty": ..., "service": id, "results": [
+               {"professional": id, "professional_name": ..., "date": "YYYY-MM-DD", "time": "HH:MM"}, ...]}
+    """
+    params = request.query_params
+    specialty = (params.get('specialty') or '').strip()
+    if not specialty or not params.get('service'):
+        return Response({'error': 'Debe indicar especialidad y servicio'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        service = Service.objects.get(id=params['service'])
+    except (Service.DoesNotExist, ValueError):
+        return Response({'error': 'Servicio no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+    max_limit = getattr(settings, 'APPOINTMENT_NEXT_AVAILABLE_MAX_LIMIT', 50)
+    try:
+        limit = min(max(int(params.get('limit', 10)), 1), max_limit)
+        date_from = parse_date(params.get('date_from') or '')
+    except ValueError:
+        return Response({'error': 'limit debe ser un número y date_from una fecha válida'}, status=status.HTTP_400_BAD_REQUEST)
+
+    names = {
+        professional_id: f'{first_name} {last_name}'
+        for professional_id, first_name, last_name in User.objects.filter(
+            user_type='professional', is_active=True, specialty__iexact=specialty
+        ).order_by('id').values_list('id', 'first_name', 'last_name')
+    }
+    slots = next_available_slots(list(names), service, limit, date_from=date_from)
+
+    return Response({
+        'specialty': specialty,
+        'service': service.id,
+        'results': [
+            {
+                'professional': professional_id,
+                'professional_name': names[professional_id],
+                'date': day.isoformat(),
+                'time': slot.strftime('%H:%M'),
+            }
+            for day, slot, professional_id in slots
+        ]
+    })
+
+
+# Proyección compacta de la agenda (sin notas, flags ni datos del profesional)
+AGENDA_FIELDS = ('id', 'appointment_date', 'appointment_time', 'duration', 'status',
+                 'patient__first_name', 'patient__last_name', 'service__name')
+
+
+@api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
+@permission_classes([permissions.IsAuthenticated])
+def agenda_view(request):
+    """
+    Agenda del usuario agrupada por día, con una sola consulta por rango
+    sobre el índice (professional, starts_at).
+
+    GET ?from=YYYY-MM-DD&to=YYYY-MM-DD
+        -> {"from": ..., "to": ..., "days": {"YYYY-MM-DD": [
+               {"id", "time", "duration", "status", "patient_name", "service_name"}, ...]}}
+
+    Responde con un ETag débil calculado sobre el contenido; si coincide con
+    ``If-None-Match`` devuelve 304 sin cuerpo.
+    """
+    try:
+        date_from = parse_date(request.query_params.get('from') or '')
+        date_to = parse_date(request.query_params.get('to') or '') or date_from
+    except ValueError:
+        return Response({'error': 'Fecha inválida'}, status=status.HTTP_400_BAD_REQUEST)
+    if not date_from:
+        return Response({'error': 'Debe indicar el rango (from y to)'}, status=status.HTTP_400_BAD_REQUEST)
+
+    max_days = getattr(settings, 'APPOINTMENT_MAX_RANGE_DAYS', 60)
+    if date_to < date_from or (date_to - date_from) >= timedelta(days=max_days):
+        return Response(
+            {'error': f'El rango de fechas debe ser de 1 a {max_days} días'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    start = appointment_bounds(date_from, time(0, 0), 0)[0]
+    end = appointment_bounds(date_to + timedelta(days=1), time(0, 0), 0)[0]
+    rows = (
+        Appointment.objects.for_user(request.user).between(start, end)
+        .order_by('starts_at', 'id').values_list(*AGENDA_FIELDS)
+    )
+
+    days = {}
+    for pk, day, start_time, duration, appointment_status, first_name, last_name, service_name in rows:
+        days.setdefault(day.isoformat(), []).append({
+            'id': pk,
+            'time': start_time.strftime('%H:%M'),
+            'duration': duration,
+            'status': appointment_status,
+            'patient_name': f'{first_name} {last_name}',
+            'service_name': service_name,
+        })
+    data = {'from': date_from.isoformat(), 'to': date_to.isoformat(), 'days': days}
+
+    etag = 'W/"%s"' % hashlib.blake2b(orjson.dumps(data), digest_size=16).hexdigest()
+    # Comparación débil: se ignora el prefijo W/ de ambos lados
+    if etag[2:] in {tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))}:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    # El navegador guarda la respuesta pero siempre revalida (If-None-Match)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
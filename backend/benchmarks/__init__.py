@@ -0,0 +1,8 @@
+"""
+Benchmarks del backend.
+
+Cada módulo se ejecuta desde ``backend/`` con ``python -m benchmarks.<nombre>``
+contra la base de datos configurada en ``DJANGO_SETTINGS_MODULE``. Los datos de
+prueba se crean dentro de una transacción que se revierte al terminar, por lo
+que no dejan rastro en la base de datos.
+"""
@@ -0,0 +1,83 @@
+"""
+Benchmark de la agenda del profesional.
+
+Compara lo que hacía ``ProfessionalAgenda.jsx`` (``/api/appointments/?paginate=false``:
+todas las citas con el serializer completo) contra ``/api/appointments/agenda/``
+para un mes, y la revalidación con ``If-None-Match`` (304). Reporta latencia,
+consultas y bytes transferidos.
+
+    python -m benchmarks.bench_agenda [--appointments 2000 10000]
+"""
+import argparse
+from datetime import date, time, timedelta
+
+from benchmarks.utils import measure, print_table, rollback
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment, Service
+from users.models import User
+
+SLOTS_PER_DAY = 16
+
+
+def seed(count):
+    """Profesional con ``count`` citas repartidas hacia atrás y adelante desde hoy"""
+    patients = User.objects.bulk_create([
+        User(email=f'bench-agenda-patient-{index}@example.com', first_name='Paciente',
+             last_name=f'Bench{index}', user_type='patient')
+        for index in range(50)
+    ])
+    professional = User.objects.create_user(
+        email='bench-agenda-pro@example.com', password=None,
+        first_name='Bench', last_name='Profesional', user_type='professional'
+    )
+    service = Service.objects.create(name='Bench 30 min', duration=30)
+    start = date.today() - timedelta(days=count // SLOTS_PER_DAY // 2)
+    Appointment.objects.bulk_create([
+        Appointment(
+            patient=patients[index % len(patients)], professional=professional, service=service,
+            appointment_date=start + timedelta(days=index // SLOTS_PER_DAY),
+            appointment_time=time(8 + index % SLOTS_PER_DAY // 2, 30 * (index % 2)),
+            status='completed' if index % 3 else 'scheduled', notes='Notas de la consulta ' * 5,
+        )
+        for index in range(count)
+    ], batch_size=2000)
+    return professional
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--appointments', type=int, nargs='+', default=[2000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    first = date.today().replace(day=1)
+    last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    month = {'from': first.isoformat(), 'to': last.isoformat()}
+    results = []
+    for count in args.appointments:
+        with rollback():
+            client = APIClient()
+            client.force_authenticate(seed(count))
+            agenda_url = reverse('appointments-agenda')
+            etag = client.get(agenda_url, month)['ETag']
+            cases = (
+                ('lista completa', lambda: client.get(reverse('appointments-list'), {'paginate': 'false'})),
+                ('agenda del mes', lambda: client.get(agenda_url, month)),
+                ('agenda 304', lambda: client.get(agenda_url, month, HTTP_IF_NONE_MATCH=etag)),
+            )
+            for label, func in cases:
+                response = func()
+                results.append({
+                    'citas': count, 'caso': label, 'status': response.status_code,
+                    'kb': round(len(response.content) / 1024, 1),
+                    **measure(func, repeat=args.repeat, warmup=1),
+                })
+
+    print_table('Agenda del profesional', results)
+
+
+if __name__ == '__main__':
+    main()
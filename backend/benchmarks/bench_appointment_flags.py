@@ -0,0 +1,69 @@
+"""
+Benchmark de serialización del listado de citas.
+
+Compara el cálculo de ``is_past_due``/``can_be_cancelled`` en Python por fila
+(propiedades del modelo) contra las anotaciones SQL de
+``AppointmentQuerySet.with_flags``.
+
+    python -m benchmarks.bench_appointment_flags [--rows 100 1000 5000]
+"""
+import argparse
+from datetime import date, time, timedelta
+
+from benchmarks.utils import measure, print_table, rollback
+
+from django.utils import timezone
+
+from appointments.models import Appointment, Service
+from appointments.serializers import AppointmentSerializer
+from users.models import User
+
+
+def seed(rows):
+    patient = User.objects.create_user(
+        email='bench-flags-patient@example.com', password=None,
+        first_name='Bench', last_name='Paciente', user_type='patient'
+    )
+    professional = User.objects.create_user(
+        email='bench-flags-pro@example.com', password=None,
+        first_name='Bench', last_name='Profesional', user_type='professional'
+    )
+    service = Service.objects.create(name='Bench 30 min', duration=30)
+    start = date.today() - timedelta(days=rows // 40)
+    Appointment.objects.bulk_create([
+        Appointment(
+            patient=patient, professional=professional, service=service,
+            appointment_date=start + timedelta(days=index // 20),
+            appointment_time=time(8 + (index % 20) // 2, 30 * (index % 2)),
+        )
+        for index in range(rows)
+    ], batch_size=1000)
+    return professional
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        with rollback():
+            professional = seed(rows)
+            base = Appointment.objects.filter(professional=professional).with_related()
+
+            def python_flags():
+                return AppointmentSerializer(base.all(), many=True).data
+
+            def sql_flags():
+                return AppointmentSerializer(base.with_flags(timezone.now()), many=True).data
+
+            for label, func in (('python', python_flags), ('sql', sql_flags)):
+                results.append({'filas': rows, 'flags': label, **measure(func, repeat=args.repeat, warmup=1)})
+
+    print_table('Serialización del listado de citas', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Lecturas con vistas síncronas contra vistas async bajo ASGI (``ASYNC_READ_VIEWS``).
+
+Levanta gunicorn en modo ``asgi`` una vez por variante (``sync``: vistas DRF,
+``async``: ``healthcare_system.async_views``) con los datos de
+``generate_load_data`` (los crea si faltan) y, para cada ``--concurrency``,
+lanza esa cantidad de clientes que durante ``--duration`` segundos recorren
+las lecturas: listado y detalle de citas, directorio, estadísticas de un
+profesional y perfil. Los tokens se emiten en este proceso, sin pasar por
+el login. Reporta throughput, p50/p95/p99, errores y el máximo de conexiones
+a la base de datos durante la medición (``pg_stat_activity``, incluye las
+dos del propio benchmark): bajo ASGI cada petición abre la suya y
+``CONN_MAX_AGE = 0`` la cierra al terminar, así que ese máximo debe seguir a
+la concurrencia y volver a bajar, no crecer con el número de peticiones.
+
+Cada cliente usa su propia conexión keep-alive con un cliente HTTP/1.1
+mínimo: con cientos de conexiones el pool de httpx gasta más CPU que el
+servidor. Aun así cliente y servidor comparten la máquina, así que importa
+la diferencia entre variantes más que los valores absolutos.
+
+    python -m benchmarks.bench_async_reads [--concurrency 100 250 500 1000] [--duration 15] [--workers 1]
+"""
+import argparse
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from benchmarks.load_test import (
+    free_port,
+    percentile,
+    seed,
+    server_command,
+    start_server,
+    stop_server,
+)
+from benchmarks.utils import print_table
+
+from django.db import connection
+
+from appointments.models import Appointment
+from appointments.synthetic import EMAIL_DOMAIN
+from users.authentication import tokens_for_user
+from users.models import User
+
+VARIANTS = {'sync': '0', 'async': '1'}
+
+
+def read_plans(count):
+    """Por paciente: headers y las URLs de lectura que recorre (hasta ``count`` pacientes)"""
+    professionals = list(User.objects.filter(user_type='professional', is_active=True).values_list('id', flat=True))
+    patients = User.objects.filter(user_type='patient', email__endswith=f'@{EMAIL_DOMAIN}').order_by('id')[:count]
+    plans = []
+    for index, patient in enumerate(patients):
+        appointment = Appointment.objects.filter(patient=patient).values_list('id', flat=True).first()
+        urls = [
+            ('appointments', '/api/appointments/'),
+            ('professionals', '/api/professionals/'),
+            ('stats', f'/api/reviews/professional/{professionals[index % len(professionals)]}/stats/'),
+            ('profile', '/api/profile/'),
+        ]
+        if appointment is not None:
+            urls.append(('appointment', f'/api/appointments/{appointment}/'))
+        plans.append(({'Authorization': f'Bearer {tokens_for_user(patient).access_token}'}, urls))
+    return plans
+
+
+class Connection:
+    """Conexión HTTP/1.1 keep-alive que solo hace GET (reconecta si el servidor la cierra)"""
+
+    def __init__(self, base_url, headers):
+        parts = urlsplit(base_url)
+        self.address = (parts.hostname, parts.port)
+        self.head = ''.join(f'{name}: {value}\r\n' for name, value in {'Host': parts.netloc, **headers}.items())
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        """Estado de la respuesta (lee y descarta el cuerpo)"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(*self.address)
+        self.writer.write(f'GET {path} HTTP/1.1\r\n{self.head}\r\n'.encode())
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        fields = {name.lower(): value.strip() for name, _, value in (line.partition(':') for line in lines[1:] if line)}
+        await self.reader.readexactly(int(fields.get('content-length', 0)))
+        if fields.get('connection', '').lower() == 'close':
+            self.close()
+        return int(lines[0].split()[1])
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class ConnectionSampler(threading.Thread):
+    """Máximo de conexiones abiertas a la base de datos mientras corre"""
+
+    def __init__(self, interval=0.25):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.is_set():
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()')
+                    self.peak = max(self.peak, cursor.fetchone()[0])
+                self.stopped.wait(self.interval)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return self.peak
+
+
+class Recorder:
+    """
+    Latencias (ms) y estados de las peticiones que terminan dentro de la
+    ventana medida: con latencias de segundos, contar por inicio dejaría
+    fuera casi todo lo que empieza cerca del final.
+    """
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.latencies = []
+        self.statuses = defaultdict(int)
+
+    def add(self, began, status):
+        now = time.perf_counter()
+        if self.start <= now <= self.end:
+            self.latencies.append((now - began) * 1000)
+            self.statuses[status] += 1
+
+
+async def reader(base_url, recorder, headers, urls, offset, deadline):
+    connection = Connection(base_url, headers)
+    index = offset
+    while time.perf_counter() < deadline:
+        began = time.perf_counter()
+        try:
+            status = await connection.get(urls[index % len(urls)][1])
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            connection.close()
+            status = 'error'
+        recorder.add(began, status)
+        index += 1
+    connection.close()
+
+
+async def drive(base_url, plans, concurrency, duration, warmup):
+    start = time.perf_counter() + warmup
+    recorder = Recorder(start, start + duration)
+    await asyncio.gather(*(
+        reader(base_url, recorder, *plans[index % len(plans)], index, recorder.end)
+        for index in range(concurrency)
+    ))
+    return recorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[100, 250, 500, 1000])
+    parser.add_argument('--workers', type=int, default=1, help='Workers de gunicorn')
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--warmup', type=float, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--professionals', type=int, default=50)
+    parser.add_argument('--patients', type=int, default=2000)
+    parser.add_argument('--appointments', type=int, default=50000)
+    args = parser.parse_args()
+
+    seed(args)
+    plans = read_plans(max(args.concurrency))
+    results = []
+    for concurrency in args.concurrency:
+        for variant in args.variants:
+            port = free_port()
+            base_url = f'http://127.0.0.1:{port}'
+            command, env = server_command(port, 'asgi', args.workers)
+            env['ASYNC_READ_VIEWS'] = VARIANTS[variant]
+            # Sin reinicios del worker a mitad de la medición
+            env['GUNICORN_MAX_REQUESTS'] = '0'
+            process = start_server(command, base_url, env)
+            sampler = ConnectionSampler()
+            sampler.start()
+            try:
+                recorder = asyncio.run(drive(base_url, plans, concurrency, args.duration, args.warmup))
+            finally:
+                peak_connections = sampler.stop()
+                stop_server(process)
+
+            samples = sorted(recorder.latencies)
+            errors = sum(count for status, count in recorder.statuses.items() if status == 'error' or status >= 400)
+            results.append({
+                'clientes': concurrency,
+                'vistas': variant,
+                'req_s': round(len(samples) / args.duration, 1),
+                'p50_ms': round(percentile(samples, 0.50), 1),
+                'p95_ms': round(percentile(samples, 0.95), 1),
+                'p99_ms': round(percentile(samples, 0.99), 1),
+                'errores': errors,
+                'conexiones_max': peak_connections,
+            })
+
+    print_table(f'Lecturas bajo ASGI ({args.workers} worker(s), {args.duration:g}s)', results)
+
+
+if __name__ == '__main__':
+    main()
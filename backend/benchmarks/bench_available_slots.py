@@ -0,0 +1,62 @@
+"""
+Benchmark del motor de horarios disponibles (``appointments.slots``).
+
+Crea un profesional con la agenda casi llena durante 30 días y mide el cálculo
+de horarios para ventanas de 1, 7 y 30 días.
+
+    python -m benchmarks.bench_available_slots [--per-day 16]
+"""
+import argparse
+from datetime import date, time, timedelta
+
+from benchmarks.utils import measure, print_table, rollback
+
+from appointments.models import Appointment, Service
+from appointments.slots import get_available_slots
+from users.models import User
+
+
+def seed(per_day):
+    patient = User.objects.create_user(
+        email='bench-slots-patient@example.com', password=None,
+        first_name='Bench', last_name='Paciente', user_type='patient'
+    )
+    professional = User.objects.create_user(
+        email='bench-slots-pro@example.com', password=None,
+        first_name='Bench', last_name='Profesional', user_type='professional'
+    )
+    service = Service.objects.create(name='Bench 30 min', duration=30)
+
+    start = date.today() + timedelta(days=1)
+    appointments = []
+    for offset in range(31):
+        day = start + timedelta(days=offset)
+        for index in range(per_day):
+            minutes = 8 * 60 + index * 30
+            appointments.append(Appointment(
+                patient=patient, professional=professional, service=service,
+                appointment_date=day, appointment_time=time(minutes // 60 % 24, minutes % 60),
+            ))
+    Appointment.objects.bulk_create(appointments, batch_size=1000)
+    return professional, service, start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--per-day', type=int, default=16, help='Citas por día en la agenda')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+    with rollback():
+        professional, service, start = seed(args.per_day)
+        for days in (1, 7, 30):
+            end = start + timedelta(days=days - 1)
+            result = measure(lambda: get_available_slots(professional, service, start, end), repeat=args.repeat)
+            rows.append({'ventana_dias': days, **result})
+
+    print_table(f'Horarios disponibles ({args.per_day} citas/día)', rows)
+
+
+if __name__ == '__main__':
+    main()
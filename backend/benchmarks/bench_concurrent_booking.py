@@ -0,0 +1,129 @@
+"""
+Benchmark de reservas concurrentes sobre la agenda de un profesional.
+
+Varios hilos intentan reservar horarios aleatorios (servicios de 30 y 60
+minutos) del mismo profesional a través de la API. Al final se comprueba que
+ninguna cita activa se solape y se reporta el throughput bajo contención.
+A diferencia de otros benchmarks los datos deben confirmarse para que los
+hilos se vean entre sí, así que se eliminan explícitamente al terminar.
+
+    python -m benchmarks.bench_concurrent_booking [--workers 8] [--attempts 50]
+"""
+import argparse
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from benchmarks.utils import print_table
+
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment, Service
+from users.models import User
+
+
+def seed(workers):
+    professional = User.objects.create_user(
+        email='bench-booking-pro@example.com', password=None,
+        first_name='Bench', last_name='Profesional', user_type='professional'
+    )
+    patients = [
+        User.objects.create_user(
+            email=f'bench-booking-patient-{index}@example.com', password=None,
+            first_name='Bench', last_name=f'Paciente {index}', user_type='patient'
+        )
+        for index in range(workers)
+    ]
+    services = [
+        Service.objects.create(name='Bench 30 min', duration=30),
+        Service.objects.create(name='Bench 60 min', duration=60),
+    ]
+    return professional, patients, services
+
+
+def worker(patient, professional, services, days, attempts, seed_value, results):
+    rng = random.Random(seed_value)
+    client = APIClient()
+    client.force_authenticate(patient)
+    counter = Counter()
+    try:
+        for _ in range(attempts):
+            minutes = rng.randrange(8 * 60, 17 * 60, 15)
+            response = client.post(reverse('appointments-list'), {
+                'professional': professional.id,
+                'service': rng.choice(services).id,
+                'appointment_date': rng.choice(days).isoformat(),
+                'appointment_time': f'{minutes // 60:02d}:{minutes % 60:02d}',
+            })
+            counter[response.status_code] += 1
+    except Exception as exc:  # noqa: BLE001 - se reporta como error del hilo
+        counter[type(exc).__name__] += 1
+    finally:
+        connection.close()
+    results.append(counter)
+
+
+def count_overlaps(professional):
+    rows = sorted(
+        (datetime.combine(a.appointment_date, a.appointment_time), a.duration)
+        for a in Appointment.objects.filter(professional=professional, status__in=Appointment.ACTIVE_STATUSES)
+    )
+    overlaps = 0
+    for (start, duration), (next_start, _) in zip(rows, rows[1:]):
+        if start + timedelta(minutes=duration) > next_start:
+            overlaps += 1
+    return len(rows), overlaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--attempts', type=int, default=50, help='Intentos de reserva por hilo')
+    parser.add_argument('--days', type=int, default=1, help='Días sobre los que se reparten las reservas')
+    args = parser.parse_args()
+    # Los rechazos 400 son esperados; no inundar la salida con avisos
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+
+    professional, patients, services = seed(args.workers)
+    days = [date.today() + timedelta(days=offset + 1) for offset in range(args.days)]
+    try:
+        results = []
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(patient, professional, services, days, args.attempts, index, results)
+            )
+            for index, patient in enumerate(patients)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        totals = sum(results, Counter())
+        booked, overlaps = count_overlaps(professional)
+        attempts = sum(totals.values())
+        print_table(f'Reservas concurrentes ({args.workers} hilos, {connection.vendor})', [{
+            'intentos': attempts,
+            'creadas_201': totals.get(201, 0),
+            'rechazadas_400': totals.get(400, 0),
+            'otros': attempts - totals.get(201, 0) - totals.get(400, 0),
+            'req_por_seg': round(attempts / elapsed, 1),
+            'citas_activas': booked,
+            'solapamientos': overlaps,
+        }])
+    finally:
+        Appointment.objects.filter(professional=professional).delete()
+        Service.objects.filter(id__in=[service.id for service in services]).delete()
+        User.objects.filter(id__in=[professional.id] + [patient.id for patient in patients]).delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark del costo de un preflight CORS.
+
+Compara el middleware anterior (el preflight recorría sesiones, CSRF,
+autenticación, resolución de URL y la vista DRF antes de descartar el cuerpo)
+contra ``CorsMiddleware``, que lo responde antes del resto del stack.
+
+    python -m benchmarks.bench_cors_preflight [--requests 2000]
+"""
+import argparse
+
+from benchmarks.utils import measure, print_table
+
+from django.conf import settings
+from django.test import Client
+from django.test.utils import override_settings
+
+
+class LegacyCorsMiddleware:
+    """Réplica del middleware anterior, para comparar"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        response['Access-Control-Allow-Origin'] = 'http://localhost:3000'
+        response['Access-Control-Allow-Methods'] = 'GET, POST, PUT, PATCH, DELETE, OPTIONS'
+        response['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With'
+        response['Access-Control-Allow-Credentials'] = 'true'
+        response['Access-Control-Expose-Headers'] = 'Content-Type, Authorization'
+        if request.method == 'OPTIONS':
+            response.status_code = 200
+            response.content = b''
+            response['Content-Length'] = '0'
+        return response
+
+
+LEGACY_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'benchmarks.bench_cors_preflight.LegacyCorsMiddleware',
+    *[path for path in settings.MIDDLEWARE if path not in (
+        'django.middleware.security.SecurityMiddleware', 'healthcare_system.middleware.CorsMiddleware'
+    )],
+]
+
+PREFLIGHT = {
+    'HTTP_ORIGIN': 'http://localhost:3000',
+    'HTTP_ACCESS_CONTROL_REQUEST_METHOD': 'POST',
+    'HTTP_ACCESS_CONTROL_REQUEST_HEADERS': 'authorization, content-type',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--path', default='/api/appointments/')
+    args = parser.parse_args()
+
+    results = []
+    for label, middleware in (('anterior', LEGACY_MIDDLEWARE), ('short-circuit', settings.MIDDLEWARE)):
+        with override_settings(MIDDLEWARE=middleware, CORS_ALLOWED_ORIGINS=['http://localhost:3000']):
+            client = Client()
+            response = client.options(args.path, **PREFLIGHT)
+            timings = measure(lambda: client.options(args.path, **PREFLIGHT), repeat=args.requests, warmup=10)
+        results.append({
+            'middleware': label,
+            'status': response.status_code,
+            'max_age': response.get('Access-Control-Max-Age', '-'),
+            **timings,
+        })
+
+    print_table(f'Preflight CORS {args.path} ({args.requests} peticiones)', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark de renderizado y parseo JSON de la API.
+
+Serializa listados de citas y reseñas (100, 1k y 10k filas) con los
+serializers de la API y compara ``JSONRenderer``/``JSONParser`` de DRF contra
+``ORJSONRenderer``/``ORJSONParser``. Solo se mide la etapa JSON: los datos
+serializados se calculan una vez por tamaño.
+
+    python -m benchmarks.bench_json_rendering [--rows 100 1000 10000]
+"""
+import argparse
+import io
+from datetime import date, datetime, time, timedelta
+
+from benchmarks.utils import measure, print_table, rollback
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from appointments.models import Appointment, Service
+from appointments.serializers import AppointmentSerializer
+from healthcare_system.parsers import ORJSONParser
+from healthcare_system.renderers import ORJSONRenderer
+from reviews.models import Review
+from reviews.serializers import ReviewSerializer
+from users.models import User
+
+SLOTS_PER_DAY = 16
+
+
+def seed(rows):
+    """``rows`` citas finalizadas (16 por día, cada 30 minutos), todas reseñadas"""
+    patient = User.objects.create_user(
+        email='bench-json-patient@example.com', password=None,
+        first_name='Bench', last_name='Paciente', user_type='patient'
+    )
+    professional = User.objects.create_user(
+        email='bench-json-pro@example.com', password=None,
+        first_name='Bench', last_name='Profesional', user_type='professional'
+    )
+    service = Service.objects.create(name='Bench 30 min', duration=30)
+    start = date.today() - timedelta(days=rows // SLOTS_PER_DAY + 1)
+    appointments = Appointment.objects.bulk_create([
+        Appointment(
+            patient=patient, professional=professional, service=service,
+            appointment_date=start + timedelta(days=index // SLOTS_PER_DAY),
+            appointment_time=(datetime.combine(start, time(8, 0)) + timedelta(minutes=30 * (index % SLOTS_PER_DAY))).time(),
+            status='completed', notes=f'Control número {index} — sin novedades'
+        )
+        for index in range(rows)
+    ], batch_size=1000)
+    Review.objects.bulk_create([
+        Review(
+            patient=patient, professional=professional, appointment=appointment,
+            rating=index % 5 + 1, comment='Muy buena atención, puntual y clara ✓'
+        )
+        for index, appointment in enumerate(appointments)
+    ], batch_size=1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        with rollback():
+            seed(rows)
+            datasets = (
+                ('citas', AppointmentSerializer(Appointment.objects.with_related(), many=True).data),
+                ('reseñas', ReviewSerializer(Review.objects.select_related(
+                    'patient', 'professional', 'appointment'
+                ), many=True).data),
+            )
+
+        for label, data in datasets:
+            body = JSONRenderer().render(data)
+            cases = (
+                ('render', 'DRF', lambda: JSONRenderer().render(data)),
+                ('render', 'orjson', lambda: ORJSONRenderer().render(data)),
+                ('parse', 'DRF', lambda: JSONParser().parse(io.BytesIO(body))),
+                ('parse', 'orjson', lambda: ORJSONParser().parse(io.BytesIO(body))),
+            )
+            for stage, implementation, func in cases:
+                timings = measure(func, repeat=args.repeat, warmup=2)
+                timings.pop('queries')
+                results.append({
+                    'listado': label, 'filas': rows, 'etapa': stage,
+                    'implementación': implementation, 'kb': round(len(body) / 1024, 1), **timings,
+                })
+
+    print_table('Renderizado y parseo JSON', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark de la resolución del usuario en peticiones con JWT.
+
+Compara ``JWTAuthentication`` de simplejwt (una consulta por petición) con
+``CachedJWTAuthentication`` (LRU local y caché compartida) y con el modo
+solo-claims de ``ClaimsJWTAuthentication`` para lecturas. Reporta las
+consultas por petición y las consultas ahorradas según ``user_cache_stats``.
+Se mide con ``SHARED_CACHE=True``: en un solo proceso la caché configurada
+hace de caché compartida.
+
+    python -m benchmarks.bench_jwt_auth [--requests 2000]
+"""
+import argparse
+
+from benchmarks.utils import measure, print_table, rollback
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from users.authentication import (
+    CachedJWTAuthentication,
+    ClaimsJWTAuthentication,
+    local_cache,
+    tokens_for_user,
+    user_cache_stats,
+)
+from users.models import User
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    factory = APIRequestFactory()
+    results = []
+    with rollback(), override_settings(SHARED_CACHE=True):
+        user = User.objects.create_user(
+            email='bench-jwt@example.com', password=None,
+            first_name='Bench', last_name='JWT', user_type='patient'
+        )
+        header = f'Bearer {tokens_for_user(user).access_token}'
+        request = Request(factory.get('/api/appointments/', HTTP_AUTHORIZATION=header))
+
+        def call(authenticator, clear_local=False):
+            def run():
+                if clear_local:
+                    local_cache.clear()
+                authenticator.authenticate(request)
+            return run
+
+        cases = (
+            ('simplejwt (sin caché)', call(JWTAuthentication())),
+            ('caché compartida', call(CachedJWTAuthentication(), clear_local=True)),
+            ('LRU local', call(CachedJWTAuthentication())),
+            ('solo claims (GET)', call(ClaimsJWTAuthentication())),
+        )
+        for label, func in cases:
+            cache.clear()
+            local_cache.clear()
+            before = user_cache_stats().get('queries_saved', 0)
+            timings = measure(func, repeat=args.requests, warmup=1)
+            saved = user_cache_stats().get('queries_saved', 0) - before
+            results.append({'modo': label, 'consultas_ahorradas': saved, **timings})
+
+    print_table(f'Autenticación JWT ({args.requests} peticiones por modo)', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark de throughput de login con el hasher de producción (PBKDF2).
+
+Compara el camino anterior (``authenticate()`` y, si falla, otra búsqueda y
+otro ``check_password``) contra ``users.authentication.check_credentials``
+para logins correctos, contraseñas incorrectas y emails inexistentes, y mide
+el endpoint ``/api/login/`` completo.
+
+    python -m benchmarks.bench_login [--attempts 20]
+"""
+import argparse
+import logging
+import time
+
+from benchmarks.utils import print_table, rollback
+
+from django.contrib.auth import authenticate
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from users.authentication import check_credentials
+from users.models import User
+
+PASSWORD = 'Bench.Secreta.123'
+
+
+def legacy_login(email, password):
+    """Réplica del camino anterior de EmailTokenObtainPairSerializer"""
+    user = authenticate(username=email, password=password)
+    if user is None:
+        try:
+            user = User.objects.get(email=email)
+            if not user.check_password(password):
+                user = None
+        except User.DoesNotExist:
+            user = None
+    return user
+
+
+def throughput(func, attempts):
+    func()
+    start = time.perf_counter()
+    for _ in range(attempts):
+        func()
+    elapsed = time.perf_counter() - start
+    return {
+        'ms_por_intento': round(elapsed / attempts * 1000, 2),
+        'logins_s': round(attempts / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--attempts', type=int, default=20)
+    args = parser.parse_args()
+    # Los intentos fallidos responden 400 a propósito
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+
+    results = []
+    with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.PBKDF2PasswordHasher']), rollback():
+        User.objects.create_user(
+            email='bench-login@example.com', password=PASSWORD,
+            first_name='Bench', last_name='Login', user_type='patient'
+        )
+        client = APIClient()
+        cases = (
+            ('correcto', 'bench-login@example.com', PASSWORD),
+            ('contraseña incorrecta', 'bench-login@example.com', 'incorrecta'),
+            ('email inexistente', 'nadie@example.com', 'incorrecta'),
+        )
+        for label, email, password in cases:
+            for mode, func in (
+                ('anterior', lambda: legacy_login(email, password)),
+                ('un hash', lambda: check_credentials(email, password)),
+                ('endpoint /api/login/', lambda: client.post(
+                    reverse('token_obtain_pair'), {'email': email, 'password': password}
+                )),
+            ):
+                results.append({'caso': label, 'camino': mode, **throughput(func, args.attempts)})
+
+    print_table('Login con PBKDF2', results)
+
+
+if __name__ == '__main__':
+    main()
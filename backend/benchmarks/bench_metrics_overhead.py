@@ -0,0 +1,88 @@
+"""
+Benchmark del costo de ``MetricsMiddleware``.
+
+Mide las mismas peticiones sin el middleware, con él (modo normal) y con
+muestreo de SQL en todas las peticiones, y reporta el sobrecosto relativo a
+la mediana sin métricas. Incluye una ruta barata (``/api/professionals/``
+en caché) para que el sobrecosto fijo se note.
+
+    python -m benchmarks.bench_metrics_overhead [--requests 500]
+"""
+import argparse
+from datetime import date, time, timedelta
+
+from benchmarks.utils import measure, print_table, rollback
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment, Service
+from healthcare_system.metrics import registry
+from users.models import User
+
+METRICS_MIDDLEWARE = 'healthcare_system.metrics.MetricsMiddleware'
+
+
+def seed(appointments):
+    patient = User.objects.create_user(
+        email='bench-metrics-patient@example.com', password=None,
+        first_name='Bench', last_name='Paciente', user_type='patient'
+    )
+    professional = User.objects.create_user(
+        email='bench-metrics-pro@example.com', password=None,
+        first_name='Bench', last_name='Profesional', user_type='professional', specialty='Cardiología'
+    )
+    service = Service.objects.create(name='Bench 30 min', duration=30)
+    start = date.today() + timedelta(days=1)
+    Appointment.objects.bulk_create([
+        Appointment(
+            patient=patient, professional=professional, service=service,
+            appointment_date=start + timedelta(days=index), appointment_time=time(9, 0)
+        )
+        for index in range(appointments)
+    ])
+    return patient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--appointments', type=int, default=50)
+    args = parser.parse_args()
+
+    without = [path for path in settings.MIDDLEWARE if path != METRICS_MIDDLEWARE]
+    modes = (
+        ('sin métricas', {'MIDDLEWARE': without}),
+        ('métricas', {'MIDDLEWARE': settings.MIDDLEWARE, 'METRICS_SQL_SAMPLE_RATE': 0.0}),
+        ('métricas + muestreo SQL', {
+            'MIDDLEWARE': settings.MIDDLEWARE, 'METRICS_SQL_SAMPLE_RATE': 1.0, 'METRICS_SLOW_REQUEST_MS': 10_000,
+        }),
+    )
+    results = []
+    with rollback():
+        patient = seed(args.appointments)
+        paths = (
+            ('/api/professionals/ (caché)', reverse('professionals-list')),
+            ('/api/appointments/', reverse('appointments-list')),
+        )
+        for label, path in paths:
+            baseline = None
+            for mode, overrides in modes:
+                with override_settings(**overrides):
+                    client = APIClient()
+                    client.force_authenticate(patient)
+                    cache.clear()
+                    timings = measure(lambda: client.get(path), repeat=args.requests, warmup=20)
+                baseline = baseline or timings['median_ms']
+                overhead = (timings['median_ms'] - baseline) / baseline * 100
+                results.append({'ruta': label, 'modo': mode, 'sobrecosto_%': round(overhead, 1), **timings})
+    registry.reset()
+
+    print_table(f'Sobrecosto de MetricsMiddleware ({args.requests} peticiones por modo)', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark de "próximos horarios" entre todos los profesionales de una especialidad.
+
+Compara calcular el calendario completo de cada profesional en el horizonte
+(``get_available_slots`` por profesional, ordenar y cortar) contra
+``next_available_slots`` (merge k-way perezoso con carga por ventanas). Las
+agendas de los primeros días están casi llenas para forzar que el merge
+avance.
+
+Dos escenarios: agenda típica (ocupación media en las próximas dos semanas)
+y primeros días casi llenos (el merge tiene que recorrer varios días
+ocupados de todos los profesionales).
+
+    python -m benchmarks.bench_next_available [--professionals 100 300] [--horizon 60]
+"""
+import argparse
+import itertools
+import random
+from datetime import date, time, timedelta
+
+from benchmarks.utils import measure, print_table, rollback
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment, Service
+from appointments.slots import get_available_slots, iter_candidate_starts, next_available_slots
+from users.models import User
+
+SPECIALTY = 'Bench Cardiología'
+
+
+def seed(professionals, busy_days, occupancy):
+    """Profesionales de una especialidad con ``busy_days`` días hábiles ocupados al ``occupancy``"""
+    rng = random.Random(7)
+    patient = User.objects.create_user(
+        email='bench-next-patient@example.com', password=None,
+        first_name='Bench', last_name='Paciente', user_type='patient'
+    )
+    service = Service.objects.create(name='Bench 30 min', duration=30)
+    pros = User.objects.bulk_create([
+        User(
+            email=f'bench-next-{index}@example.com', first_name='Bench', last_name=f'Profesional{index}',
+            user_type='professional', specialty=SPECIALTY
+        )
+        for index in range(professionals)
+    ])
+    days = []
+    day = date.today() + timedelta(days=1)
+    while len(days) < busy_days:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    starts = [time(start // 60, start % 60) for start in iter_candidate_starts(30)]
+    Appointment.objects.bulk_create([
+        Appointment(
+            patient=patient, professional=pro, service=service, duration=30,
+            appointment_date=day, appointment_time=start
+        )
+        for pro in pros for day in days for start in starts
+        if rng.random() < occupancy
+    ], batch_size=5000)
+    return patient, service, [pro.id for pro in pros]
+
+
+def full_calendars(professional_ids, service, horizon, limit):
+    """Lo que haría el cliente: el calendario completo de cada profesional"""
+    date_from = date.today()
+    date_to = date_from + timedelta(days=horizon - 1)
+    slots = []
+    for professional in User.objects.filter(id__in=professional_ids):
+        for day, day_slots in get_available_slots(professional, service, date_from, date_to).items():
+            slots.extend((day, slot, professional.id) for slot in day_slots)
+    return sorted(slots)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--professionals', type=int, nargs='+', default=[100, 300])
+    parser.add_argument('--horizon', type=int, default=60)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    scenarios = (
+        ('típica', 10, 0.6),
+        ('primeros días llenos', 5, 0.97),
+    )
+    results = []
+    for (scenario, busy_days, occupancy), count in itertools.product(scenarios, args.professionals):
+        with rollback():
+            patient, service, ids = seed(count, busy_days, occupancy)
+            client = APIClient()
+            client.force_authenticate(patient)
+            params = {'specialty': SPECIALTY, 'service': service.id, 'limit': args.limit}
+            assert full_calendars(ids, service, args.horizon, args.limit) == \
+                next_available_slots(ids, service, args.limit, days=args.horizon)
+
+            cases = (
+                ('calendarios completos', lambda: full_calendars(ids, service, args.horizon, args.limit)),
+                ('merge k-way', lambda: next_available_slots(ids, service, args.limit, days=args.horizon)),
+                ('endpoint next-available', lambda: client.get(reverse('next-available'), params)),
+            )
+            for label, func in cases:
+                results.append({
+                    'agenda': scenario, 'profesionales': count, 'caso': label,
+                    **measure(func, repeat=args.repeat, warmup=1),
+                })
+
+    print_table(f'Próximos {args.limit} horarios en {args.horizon} días', results)
+
+
+if __name__ == '__main__':
+    main()
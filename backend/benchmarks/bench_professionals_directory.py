@@ -0,0 +1,90 @@
+"""
+Benchmark del directorio de profesionales (``/api/professionals/``).
+
+Compara la vista anterior (todos los profesionales instanciados y
+convertidos en un bucle) contra la página por cursor con ``.values()``, con
+y sin caché, y una búsqueda por especialidad.
+
+    python -m benchmarks.bench_professionals_directory [--professionals 10000]
+"""
+import argparse
+
+from benchmarks.utils import measure, print_table, rollback
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from users.models import User
+
+SPECIALTIES = ['Cardiología', 'Dermatología', 'Pediatría', 'Neurología', 'Traumatología', 'Oftalmología']
+
+
+def seed(count):
+    patient = User.objects.create_user(
+        email='bench-directory-patient@example.com', password=None,
+        first_name='Bench', last_name='Paciente', user_type='patient'
+    )
+    User.objects.bulk_create([
+        User(
+            email=f'bench-directory-{index}@example.com', first_name=f'Nombre{index}',
+            last_name=f'Apellido{index:06d}', user_type='professional',
+            specialty=SPECIALTIES[index % len(SPECIALTIES)], license_number=f'LM-{index}'
+        )
+        for index in range(count)
+    ], batch_size=2000)
+    return patient
+
+
+def legacy_list():
+    """Réplica de la vista anterior sin la capa HTTP (cota inferior de su costo)"""
+    data = []
+    for prof in User.objects.filter(user_type='professional', is_active=True):
+        data.append({
+            'id': prof.id,
+            'first_name': prof.first_name,
+            'last_name': prof.last_name,
+            'email': prof.email,
+            'specialty': getattr(prof, 'specialty', 'General'),
+            'license_number': getattr(prof, 'license_number', ''),
+            'phone_number': getattr(prof, 'phone', ''),
+            'user_type': prof.user_type,
+            'username': prof.email.split('@')[0]
+        })
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--professionals', type=int, nargs='+', default=[10000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    results = []
+    for count in args.professionals:
+        with rollback():
+            client = APIClient()
+            client.force_authenticate(seed(count))
+            url = reverse('professionals-list')
+
+            def uncached(params):
+                def run():
+                    cache.clear()
+                    client.get(url, params)
+                return run
+
+            cases = (
+                ('anterior (lista completa)', legacy_list),
+                ('página sin caché', uncached({})),
+                ('página en caché', lambda: client.get(url)),
+                ('búsqueda sin caché', uncached({'search': 'neuro'})),
+                ('especialidad sin caché', uncached({'specialty': 'Pedia', 'page_size': 100})),
+            )
+            for label, func in cases:
+                results.append({'profesionales': count, 'caso': label, **measure(func, repeat=args.repeat, warmup=1)})
+
+    print_table('Directorio de profesionales', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark del canal de eventos en vivo (``/api/push/``).
+
+Abre ``--connections`` conexiones SSE contra ``PushApplication`` dentro de un
+solo event loop (sin sockets: mide el servidor, no la red) y reporta:
+
+- memoria por conexión abierta (tracemalloc, que también hace más lenta
+  la apertura),
+- tiempo en entregar un evento a cada conexión publicando desde otro hilo,
+  como lo hace ``transaction.on_commit`` en una vista,
+- que un cliente que no lee no acumula más de ``PUSH_QUEUE_SIZE`` mensajes.
+
+    python -m benchmarks.bench_push [--connections 1000 5000]
+"""
+import argparse
+import asyncio
+import threading
+import time
+import tracemalloc
+
+from benchmarks.utils import print_table
+
+from django.conf import settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from sync.pubsub import hub, publish
+from sync.push import PUSH_PATH, PushApplication
+
+
+async def not_found(scope, receive, send):
+    raise AssertionError(scope['path'])
+
+
+def token_for(user_id):
+    token = AccessToken()
+    token['user_id'] = user_id
+    token['user_type'] = 'professional'
+    return str(token).encode()
+
+
+class Client:
+    """Conexión SSE simulada que cuenta los eventos recibidos"""
+
+    def __init__(self, user_id, stuck=False):
+        self.scope = {
+            'type': 'http', 'path': PUSH_PATH, 'method': 'GET', 'query_string': b'',
+            'headers': [(b'authorization', b'Bearer ' + token_for(user_id))],
+        }
+        self.stuck = stuck
+        self.events = 0
+        self.ready = asyncio.Event()
+        self.disconnect = asyncio.Event()
+
+    async def receive(self):
+        await self.disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        body = message.get('body', b'')
+        if body.startswith(b'retry'):
+            self.ready.set()
+        elif b'data: ' in body:
+            if self.stuck:
+                # Socket lleno: el envío no termina nunca
+                await asyncio.Event().wait()
+            self.events += body.count(b'data: ')
+
+
+async def run(count, queue_size):
+    app = PushApplication(not_found)
+    clients = [Client(user_id) for user_id in range(count)]
+    stuck = Client(count, stuck=True)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    tasks = [asyncio.ensure_future(app(client.scope, client.receive, client.send)) for client in clients + [stuck]]
+    await asyncio.gather(*(client.ready.wait() for client in clients + [stuck]))
+    open_ms = (time.perf_counter() - start) * 1000
+    growth = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Un evento por conexión, publicado desde otro hilo (como on_commit en una vista)
+    channels = [f'professional:{user_id}' for user_id in range(count + 1)]
+    start = time.perf_counter()
+    threading.Thread(target=lambda: [publish([channel], {'event': 'created'}) for channel in channels]).start()
+    while sum(client.events for client in clients) < count:
+        await asyncio.sleep(0.001)
+    fanout_ms = (time.perf_counter() - start) * 1000
+
+    # El cliente trabado recibe muchos más eventos de los que caben en su cola
+    for _ in range(queue_size * 10):
+        hub.dispatch(channels[-1], b'{"event":"updated"}')
+    subscription = next(iter(hub._channels[channels[-1]]))
+    stuck_pending = subscription.queue.qsize()
+
+    for client in clients + [stuck]:
+        client.disconnect.set()
+    await asyncio.gather(*tasks)
+    return {
+        'conexiones': count,
+        'apertura_ms': round(open_ms, 1),
+        'kb_por_conexion': round(growth / (count + 1) / 1024, 2),
+        'fanout_ms': round(fanout_ms, 1),
+        'eventos_s': round(count / fanout_ms * 1000),
+        'cola_trabada': f'{stuck_pending}/{queue_size}',
+        'descartados': subscription.dropped,
+        'abiertas_al_final': hub.connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, nargs='+', default=[1000, 5000])
+    args = parser.parse_args()
+
+    queue_size = getattr(settings, 'PUSH_QUEUE_SIZE', 100)
+    results = [asyncio.run(run(count, queue_size)) for count in args.connections]
+    print_table('Conexiones SSE en un proceso', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark de "citas reseñables" para un paciente con cientos de citas.
+
+Compara el cruce en el navegador que hacía ``reviewService.jsx`` (listado
+completo de citas + listado completo de reseñas) contra la primera página de
+``/api/appointments/reviewable/`` (anti-join en SQL). Reporta latencia,
+consultas y bytes transferidos.
+
+    python -m benchmarks.bench_reviewable_appointments [--rows 100 500 1000]
+"""
+import argparse
+from datetime import date, time, timedelta
+
+from benchmarks.utils import measure, print_table, rollback
+
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment, Service
+from reviews.models import Review
+from users.models import User
+
+
+def seed(rows):
+    """Paciente con ``rows`` citas: 70% finalizadas, la mitad de ellas reseñadas"""
+    patient = User.objects.create_user(
+        email='bench-reviewable-patient@example.com', password=None,
+        first_name='Bench', last_name='Paciente', user_type='patient'
+    )
+    professional = User.objects.create_user(
+        email='bench-reviewable-pro@example.com', password=None,
+        first_name='Bench', last_name='Profesional', user_type='professional'
+    )
+    service = Service.objects.create(name='Bench 30 min', duration=30)
+    start = date.today() - timedelta(days=rows)
+    appointments = Appointment.objects.bulk_create([
+        Appointment(
+            patient=patient, professional=professional, service=service,
+            appointment_date=start + timedelta(days=index), appointment_time=time(9, 0),
+            status='completed' if index % 10 < 7 else 'cancelled'
+        )
+        for index in range(rows)
+    ], batch_size=1000)
+    completed = [appointment for appointment in appointments if appointment.status == 'completed']
+    Review.objects.bulk_create([
+        Review(patient=patient, professional=professional, appointment=appointment, rating=5)
+        for appointment in completed[::2]
+    ], batch_size=1000)
+    return patient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        with rollback():
+            client = APIClient()
+            client.force_authenticate(seed(rows))
+            sizes = {}
+
+            def client_join():
+                appointments = client.get('/api/appointments/', {'paginate': 'false'})
+                reviews = client.get('/api/reviews/my_reviews/', {'paginate': 'false'})
+                sizes['client_join'] = len(appointments.content) + len(reviews.content)
+
+            def reviewable_page():
+                response = client.get('/api/appointments/reviewable/')
+                sizes['reviewable'] = len(response.content)
+
+            for label, func in (('client_join', client_join), ('reviewable', reviewable_page)):
+                timings = measure(func, repeat=args.repeat, warmup=1)
+                results.append({'citas': rows, 'modo': label, 'kb': round(sizes[label] / 1024, 1), **timings})
+
+    print_table('Citas reseñables de un paciente', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Comparación de ``runserver`` contra gunicorn (``SERVER_MODE`` wsgi y asgi).
+
+Para cada modo mide el tiempo de arranque (desde lanzar el proceso hasta la
+primera respuesta) y corre la mezcla de escenarios de ``load_test`` durante
+``--duration`` segundos. Usa los datos de ``generate_load_data`` (los crea
+si faltan).
+
+    python -m benchmarks.bench_server_modes [--concurrency 20] [--duration 15] [--workers 4]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.load_test import (
+    SERVER_MODES,
+    drive,
+    free_port,
+    percentile,
+    seed,
+    server_command,
+    start_server,
+    stop_server,
+)
+from benchmarks.utils import print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--modes', nargs='+', choices=SERVER_MODES, default=list(SERVER_MODES))
+    parser.add_argument('--workers', type=int, help='Workers de gunicorn (por defecto WEB_CONCURRENCY)')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--professionals', type=int, default=50)
+    parser.add_argument('--patients', type=int, default=2000)
+    parser.add_argument('--appointments', type=int, default=50000)
+    args = parser.parse_args()
+
+    seed(args)
+    results = []
+    for mode in args.modes:
+        port = free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        command, env = server_command(port, mode, args.workers)
+        start = time.perf_counter()
+        process = start_server(command, base_url, env)
+        startup = time.perf_counter() - start
+        try:
+            recorder = asyncio.run(drive(base_url, args.concurrency, args.duration, args.warmup, args.seed))
+        finally:
+            stop_server(process)
+
+        samples = sorted(latency for latencies in recorder.latencies.values() for latency in latencies)
+        errors = sum(
+            count for statuses in recorder.statuses.values()
+            for status, count in statuses.items() if status == 'error' or status >= 500
+        )
+        results.append({
+            'modo': mode,
+            'arranque_s': round(startup, 2),
+            'req_s': round(len(samples) / args.duration, 1),
+            'p50_ms': round(percentile(samples, 0.50), 2),
+            'p95_ms': round(percentile(samples, 0.95), 2),
+            'p99_ms': round(percentile(samples, 0.99), 2),
+            'errores': errors,
+        })
+
+    workers = args.workers or 'WEB_CONCURRENCY'
+    print_table(f'Modos de servidor ({args.concurrency} pacientes, {args.duration:g}s, workers={workers})', results)
+
+
+if __name__ == '__main__':
+    main()
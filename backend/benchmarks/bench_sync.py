@@ -0,0 +1,105 @@
+"""
+Benchmark de la sincronización incremental.
+
+Compara lo que descarga un cliente para refrescar sus datos con los listados
+completos (``/api/appointments/?paginate=false`` + ``/api/reviews/my_reviews/?paginate=false``)
+contra ``/api/sync/?since=<marca>`` tras ``--changes`` modificaciones y un
+borrado. Reporta latencia, consultas y bytes transferidos.
+
+    python -m benchmarks.bench_sync [--appointments 2000 10000] [--changes 10]
+"""
+import argparse
+from datetime import date, time, timedelta
+
+from benchmarks.utils import measure, print_table, rollback
+
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment, Service
+from reviews.models import Review
+from users.models import User
+
+SLOTS_PER_DAY = 16
+
+
+def seed(count):
+    """Paciente con ``count`` citas pasadas (con reseña la mitad de las completadas)"""
+    patient = User.objects.create_user(
+        email='bench-sync-patient@example.com', password=None,
+        first_name='Bench', last_name='Paciente', user_type='patient'
+    )
+    professionals = User.objects.bulk_create([
+        User(email=f'bench-sync-pro-{index}@example.com', first_name='Profesional',
+             last_name=f'Bench{index}', user_type='professional')
+        for index in range(10)
+    ])
+    service = Service.objects.create(name='Bench 30 min', duration=30)
+    start = date.today() - timedelta(days=count // SLOTS_PER_DAY + 1)
+    appointments = Appointment.objects.bulk_create([
+        Appointment(
+            patient=patient, professional=professionals[index % len(professionals)], service=service,
+            appointment_date=start + timedelta(days=index // SLOTS_PER_DAY),
+            appointment_time=time(8 + index % SLOTS_PER_DAY // 2, 30 * (index % 2)),
+            status='completed' if index % 3 else 'cancelled', notes='Notas de la consulta ' * 5,
+        )
+        for index in range(count)
+    ], batch_size=2000)
+    Review.objects.bulk_create([
+        Review(patient=patient, professional_id=appointment.professional_id, appointment=appointment,
+               rating=5, comment='Muy buena atención', is_verified=True)
+        for appointment in appointments[::2] if appointment.status == 'completed'
+    ], batch_size=2000)
+    return patient, appointments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--appointments', type=int, nargs='+', default=[2000, 10000])
+    parser.add_argument('--changes', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    results = []
+    for count in args.appointments:
+        with rollback(), override_settings(SYNC_WATERMARK_LAG_SECONDS=0):
+            patient, appointments = seed(count)
+            client = APIClient()
+            client.force_authenticate(patient)
+            sync_url = reverse('sync-changes')
+            # El cliente ya tiene todo: recorre la copia completa hasta el final
+            data = client.get(sync_url).json()
+            while data['has_more']:
+                data = client.get(sync_url, {'since': data['watermark']}).json()
+            watermark = data['watermark']
+
+            for appointment in appointments[:args.changes]:
+                appointment.notes = 'Actualizada'
+                appointment.save()
+            appointments[-1].delete()
+
+            def full_lists():
+                return [
+                    client.get(reverse('appointments-list'), {'paginate': 'false'}),
+                    client.get(reverse('reviews-my-reviews'), {'paginate': 'false'}),
+                ]
+
+            cases = (
+                ('listas completas', full_lists),
+                ('sync completo (1.ª página)', lambda: [client.get(sync_url)]),
+                (f'sync {args.changes} cambios', lambda: [client.get(sync_url, {'since': watermark})]),
+            )
+            for label, func in cases:
+                responses = func()
+                results.append({
+                    'citas': count, 'caso': label,
+                    'kb': round(sum(len(response.content) for response in responses) / 1024, 1),
+                    **measure(func, repeat=args.repeat, warmup=1),
+                })
+
+    print_table('Refresco de citas y reseñas del paciente', results)
+
+
+if __name__ == '__main__':
+    main()
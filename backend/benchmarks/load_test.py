@@ -0,0 +1,343 @@
+"""
+Prueba de carga HTTP de punta a punta contra la API.
+
+Levanta el servidor (``--server``: ``runserver``, o gunicorn en modo ``wsgi`` o
+``asgi`` con ``gunicorn.conf.py``) con la configuración de
+``DJANGO_SETTINGS_MODULE`` (PostgreSQL local o un settings con SQLite),
+aplica migraciones, siembra datos con ``generate_load_data`` si no existen y
+lanza ``--concurrency`` pacientes virtuales que durante ``--duration``
+segundos eligen escenarios al azar: login, listado de citas, reserva,
+reseña, estadísticas de un profesional y directorio de profesionales.
+
+Reporta por endpoint p50/p95/p99, throughput y errores, y guarda el
+resultado en JSON (``--output``) junto con el commit actual; ``--compare``
+muestra la diferencia contra un resultado anterior.
+
+    python -m benchmarks.load_test [--concurrency 20] [--duration 30] [--output carga.json]
+    python -m benchmarks.load_test --base-url http://localhost:8000 --compare carga-anterior.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.utils import print_table
+
+from appointments.synthetic import EMAIL_DOMAIN, existing_load_data
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = 'Carga.12345'
+
+# Escenario -> peso relativo (un paciente típico consulta mucho más de lo que escribe)
+SCENARIOS = {
+    'appointments': 30,
+    'professionals': 20,
+    'stats': 20,
+    'book': 10,
+    'review': 10,
+    'login': 10,
+}
+
+
+# ==================== SERVIDOR ====================
+
+def manage(*args, check=True, **kwargs):
+    return subprocess.run([sys.executable, 'manage.py', *args], cwd=BACKEND_DIR, check=check, **kwargs)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+SERVER_MODES = ('runserver', 'wsgi', 'asgi')
+
+
+def server_command(port, mode='runserver', workers=None):
+    """(comando, variables de entorno) para levantar el servidor en ``mode``"""
+    env = dict(os.environ, SERVER_MODE=mode)
+    if mode == 'runserver':
+        return [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload'], env
+    if workers:
+        env['WEB_CONCURRENCY'] = str(workers)
+    return [
+        sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+        '--bind', f'127.0.0.1:{port}',
+    ], env
+
+
+def start_server(command, base_url, env=None, timeout=30):
+    """Inicia el servidor y espera a que responda"""
+    process = subprocess.Popen(
+        command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'El servidor terminó con código {process.returncode}: {" ".join(command)}')
+        try:
+            httpx.get(f'{base_url}/api/professionals/', timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'El servidor no respondió en {timeout}s')
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def seed(args):
+    manage('migrate', '--noinput', '-v0')
+    if existing_load_data():
+        print('ℹ️  Usando los datos de carga existentes')
+        return
+    print('🚀 Generando datos de carga...')
+    manage(
+        'generate_load_data',
+        '--professionals', str(args.professionals),
+        '--patients', str(args.patients),
+        '--appointments', str(args.appointments),
+        '--seed', str(args.seed),
+        '--password', PASSWORD,
+    )
+
+
+# ==================== CARGA ====================
+
+class Recorder:
+    """Latencias (ms) y estados por endpoint, ignorando lo anterior a ``start``"""
+
+    def __init__(self):
+        self.start = None
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client, label, method, url, **kwargs):
+        began = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 'error'
+        if self.start is not None and began >= self.start:
+            self.latencies[label].append((time.perf_counter() - began) * 1000)
+            self.statuses[label][status] += 1
+        return response
+
+
+class VirtualPatient:
+    def __init__(self, client, recorder, rng, email, catalog):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.email = email
+        self.catalog = catalog
+        self.headers = {}
+
+    async def login(self):
+        response = await self.recorder.request(
+            self.client, 'login', 'POST', '/api/login/', json={'email': self.email, 'password': PASSWORD}
+        )
+        if response is not None and response.status_code == 200:
+            self.headers = {'Authorization': f'Bearer {response.json()["access"]}'}
+
+    async def get(self, label, url, **params):
+        return await self.recorder.request(self.client, label, 'GET', url, params=params, headers=self.headers)
+
+    async def post(self, label, url, data):
+        return await self.recorder.request(self.client, label, 'POST', url, json=data, headers=self.headers)
+
+    async def appointments(self):
+        await self.get('appointments', '/api/appointments/')
+
+    async def professionals(self):
+        await self.get('professionals', '/api/professionals/')
+
+    async def stats(self):
+        professional = self.rng.choice(self.catalog['professionals'])
+        await self.get('stats', f'/api/reviews/professional/{professional}/stats/')
+
+    async def book(self):
+        professional = self.rng.choice(self.catalog['professionals'])
+        day = date.today() + timedelta(days=self.rng.randint(1, 30))
+        response = await self.get('slots', '/api/appointments/available-slots/',
+                                  professional=professional, date=day.isoformat())
+        if response is None or response.status_code != 200 or not response.json():
+            return
+        await self.post('book', '/api/appointments/', {
+            'professional': professional,
+            'service': self.rng.choice(self.catalog['services']),
+            'appointment_date': day.isoformat(),
+            'appointment_time': self.rng.choice(response.json()),
+        })
+
+    async def review(self):
+        response = await self.get('reviewable', '/api/appointments/reviewable/')
+        if response is None or response.status_code != 200 or not response.json()['results']:
+            return
+        await self.post('review', '/api/reviews/', {
+            'appointment': response.json()['results'][0]['id'],
+            'rating': self.rng.randint(1, 5),
+            'comment': 'Reseña de la prueba de carga',
+        })
+
+    async def run(self, deadline):
+        await self.login()
+        scenarios, weights = list(SCENARIOS), list(SCENARIOS.values())
+        while time.perf_counter() < deadline:
+            await getattr(self, self.rng.choices(scenarios, weights)[0])()
+
+
+async def load_catalog(client, email):
+    """Ids de profesionales y servicios para armar las peticiones"""
+    response = await client.post('/api/login/', json={'email': email, 'password': PASSWORD})
+    response.raise_for_status()
+    headers = {'Authorization': f'Bearer {response.json()["access"]}'}
+    professionals = await client.get('/api/professionals/', params={'page_size': 200}, headers=headers)
+    services = await client.get('/api/appointments/services/', headers=headers)
+    services = services.json()
+    return {
+        'professionals': [row['id'] for row in professionals.json()['results']],
+        'services': [row['id'] for row in (services['results'] if isinstance(services, dict) else services)],
+    }
+
+
+async def drive(base_url, concurrency, duration, warmup, seed_value):
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        catalog = await load_catalog(client, f'patient-0@{EMAIL_DOMAIN}')
+        patients = [
+            VirtualPatient(client, recorder, random.Random(seed_value + index),
+                           f'patient-{index}@{EMAIL_DOMAIN}', catalog)
+            for index in range(concurrency)
+        ]
+        recorder.start = time.perf_counter() + warmup
+        await asyncio.gather(*(patient.run(recorder.start + duration) for patient in patients))
+    return recorder
+
+
+# ==================== REPORTE ====================
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def summarize(recorder, duration):
+    results = {}
+    for label in sorted(recorder.latencies):
+        samples = sorted(recorder.latencies[label])
+        statuses = recorder.statuses[label]
+        results[label] = {
+            'requests': len(samples),
+            'rps': round(len(samples) / duration, 1),
+            'p50_ms': round(percentile(samples, 0.50), 2),
+            'p95_ms': round(percentile(samples, 0.95), 2),
+            'p99_ms': round(percentile(samples, 0.99), 2),
+            'errors': sum(count for status, count in statuses.items() if status == 'error' or status >= 500),
+            'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        }
+    return results
+
+
+def git_commit():
+    result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def compare(results, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    rows = []
+    for label, current in results['endpoints'].items():
+        before = baseline['endpoints'].get(label)
+        if before is None:
+            continue
+        rows.append({
+            'endpoint': label,
+            **{
+                f'{metric}_Δ%': round((current[metric] - before[metric]) / before[metric] * 100, 1) if before[metric] else '-'
+                for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'rps')
+            },
+        })
+    print_table(f'Comparación contra {baseline_path} (commit {baseline["meta"].get("commit")})', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', help='Servidor ya levantado (omite migraciones, siembra y arranque)')
+    parser.add_argument('--server', choices=SERVER_MODES, default='runserver', help='Servidor a levantar')
+    parser.add_argument('--workers', type=int, help='Workers de gunicorn (por defecto WEB_CONCURRENCY)')
+    parser.add_argument('--concurrency', type=int, default=20, help='Pacientes virtuales simultáneos')
+    parser.add_argument('--duration', type=float, default=30, help='Segundos medidos')
+    parser.add_argument('--warmup', type=float, default=3, help='Segundos iniciales descartados')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--professionals', type=int, default=50, help='Para generate_load_data')
+    parser.add_argument('--patients', type=int, default=2000, help='Para generate_load_data')
+    parser.add_argument('--appointments', type=int, default=50000, help='Para generate_load_data')
+    parser.add_argument('--output', help='Archivo JSON con los resultados')
+    parser.add_argument('--compare', help='JSON de una ejecución anterior para comparar')
+    args = parser.parse_args()
+
+    process = None
+    base_url = args.base_url
+    command = None
+    if base_url is None:
+        seed(args)
+        port = free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        command, env = server_command(port, args.server, args.workers)
+        process = start_server(command, base_url, env)
+    try:
+        recorder = asyncio.run(drive(base_url, args.concurrency, args.duration, args.warmup, args.seed))
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    endpoints = summarize(recorder, args.duration)
+    total = sum(row['requests'] for row in endpoints.values())
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'settings': os.environ.get('DJANGO_SETTINGS_MODULE'),
+            'base_url': base_url,
+            'server': args.server if command else None,
+            'workers': args.workers,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'seed': args.seed,
+        },
+        'total': {'requests': total, 'rps': round(total / args.duration, 1)},
+        'endpoints': endpoints,
+    }
+
+    print_table(
+        f'Carga: {args.concurrency} pacientes durante {args.duration:g}s ({results["total"]["rps"]} req/s)',
+        [{'endpoint': label, **{k: v for k, v in row.items() if k != 'statuses'}} for label, row in endpoints.items()],
+    )
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        print(f'\n💾 Resultados en {args.output}')
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
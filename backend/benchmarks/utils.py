@@ -0,0 +1,67 @@
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthcare_system.settings')
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rollback():
+    """Ejecuta el bloque en una transacción que siempre se revierte"""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def measure(func, repeat=20, warmup=2):
+    """
+    Ejecuta ``func`` ``repeat`` veces y devuelve un dict con los tiempos en ms
+    (mínimo, mediana y p95) y las consultas SQL de una ejecución.
+    """
+    for _ in range(warmup):
+        func()
+
+    with CaptureQueriesContext(connection) as ctx:
+        func()
+    queries = len(ctx.captured_queries)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'min_ms': round(samples[0], 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[max(0, int(len(samples) * 0.95) - 1)], 3),
+        'queries': queries,
+    }
+
+
+def print_table(title, rows):
+    """Imprime ``rows`` (lista de dicts con las mismas claves) como tabla"""
+    print(f"\n📊 {title}")
+    if not rows:
+        print("   (sin resultados)")
+        return
+    headers = list(rows[0].keys())
+    widths = [max(len(str(h)), *(len(str(row[h])) for row in rows)) for h in headers]
+    print("   " + "  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("   " + "  ".join("-" * w for w in widths))
+    for row in rows:
+        print("   " + "  ".join(str(row[h]).ljust(w) for h, w in zip(headers, widths)))
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ClinicHistoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clinic_history'
+
+    def ready(self):
+        from . import signals  # noqa: F401
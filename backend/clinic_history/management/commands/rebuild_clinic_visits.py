@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from clinic_history.visits import rebuild_visits
+
+
+class Command(BaseCommand):
+    """Recalcula el historial de consultorios desde las citas completadas"""
+    help = 'Reconstruye ClinicVisit con un agregado agrupado y upserts por lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Parejas por upsert')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        total = rebuild_visits(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} visitas reconstruidas en {elapsed:.2f}s'))
@@ -56,14 +56,18 @@ class ClinicVisit(models.Model):
     def update_visit_stats(self):
         """Actualiza estadísticas cuando hay una nueva cita completada"""
         from appointments.models import Appointment
-        recent_appointments = Appointment.objects.filter(
-            patient=self.patient,
-            professional=self.professional,
+        # Un solo agregado en lugar de exists() + first() + last() + count()
+        stats = Appointment.objects.filter(
+            patient_id=self.patient_id,
+            professional_id=self.professional_id,
             status='completed'
-        ).order_by('appointment_date')
+        ).aggregate(
+            first_visit_date=models.Min('appointment_date'),
+            last_visit_date=models.Max('appointment_date'),
+            total_visits=models.Count('id')
+        )
         
-        if recent_appointments.exists():
-            self.first_visit_date = recent_appointments.first().appointment_date
-            self.last_visit_date = recent_appointments.last().appointment_date
-            self.total_visits = recent_appointments.count()
-            self.save()
\ No newline at end of file
+        if stats['total_visits']:
+            for field, value in stats.items():
+                setattr(self, field, value)
+            self.save(update_fields=['first_visit_date', 'last_visit_date', 'total_visits', 'updated_at'])
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from appointments.models import Appointment
+from .visits import discard_completed_visit, record_completed_visit
+
+
+@receiver(post_save, sender=Appointment, dispatch_uid='clinic_history_completed_visit')
+def appointment_completed(sender, instance, created, raw=False, **kwargs):
+    """Suma la visita cuando la cita pasa a finalizada y la descuenta si deja de estarlo"""
+    if raw or instance.status == instance.previous_status:
+        return
+    if instance.status == 'completed':
+        record_completed_visit(instance)
+    elif instance.previous_status == 'completed':
+        discard_completed_visit(instance)
@@ -1,3 +1,101 @@
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from appointments.models import Appointment, Service
+from users.models import User
+from .models import ClinicVisit
+
+
+class ClinicVisitTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional',
+            clinic_name='Consultorio Centro', clinic_address='Av. Juárez 10', specialty='Cardiología'
+        )
+        cls.service = Service.objects.create(name='Consulta General', duration=30)
+
+    def book(self, day, status='scheduled'):
+        return Appointment.objects.create(
+            patient=self.patient, professional=self.professional, service=self.service,
+            appointment_date=date(2025, 1, 6) + timedelta(days=day), appointment_time=time(9, 0),
+            status=status
+        )
+
+    def complete(self, appointment):
+        appointment.status = 'completed'
+        appointment.save()
+
+    def test_completion_creates_and_bumps_visit(self):
+        self.complete(self.book(3))
+        visit = ClinicVisit.objects.get()
+        self.assertEqual((visit.total_visits, visit.first_visit_date), (1, date(2025, 1, 9)))
+        self.assertEqual((visit.clinic_name, visit.specialty_visited), ('Consultorio Centro', 'Cardiología'))
+
+        appointment = self.book(1)
+        # UPDATE de la cita + UPDATE de la visita
+        with self.assertNumQueries(2):
+            self.complete(appointment)
+        self.complete(self.book(7))
+        visit.refresh_from_db()
+        self.assertEqual(visit.total_visits, 3)
+        self.assertEqual((visit.first_visit_date, visit.last_visit_date), (date(2025, 1, 7), date(2025, 1, 13)))
+
+    def test_only_transitions_to_completed_count(self):
+        appointment = self.book(0)
+        appointment.notes = 'Pendiente'
+        appointment.save()
+        self.assertFalse(ClinicVisit.objects.exists())
+
+        self.complete(appointment)
+        appointment = Appointment.objects.get(id=appointment.id)
+        appointment.notes = 'Editada después de finalizar'
+        appointment.save()
+        self.book(2, status='completed')
+        self.assertEqual(ClinicVisit.objects.get().total_visits, 2)
+
+    def test_reopening_completed_appointment_does_not_count_twice(self):
+        self.complete(self.book(0))
+        appointment = self.book(5)
+        self.complete(appointment)
+        appointment.status = 'in_progress'
+        appointment.save()
+        visit = ClinicVisit.objects.get()
+        self.assertEqual((visit.total_visits, visit.last_visit_date), (1, date(2025, 1, 6)))
+
+        self.complete(appointment)
+        visit.refresh_from_db()
+        self.assertEqual((visit.total_visits, visit.last_visit_date), (2, date(2025, 1, 11)))
+
+    def test_update_visit_stats_is_single_aggregate(self):
+        self.complete(self.book(0))
+        self.complete(self.book(4))
+        visit = ClinicVisit.objects.get()
+        ClinicVisit.objects.update(total_visits=9)
+        visit.refresh_from_db()
+        with self.assertNumQueries(2):
+            visit.update_visit_stats()
+        visit.refresh_from_db()
+        self.assertEqual(visit.total_visits, 2)
+
+    def test_rebuild_recomputes_and_keeps_patient_data(self):
+        self.complete(self.book(0))
+        self.complete(self.book(5))
+        other = User.objects.create_user(email='otro@test.com', password='x', user_type='patient')
+        Appointment.objects.bulk_create([Appointment(
+            patient=other, professional=self.professional, service=self.service,
+            appointment_date=date(2025, 2, 3), appointment_time=time(9, 0), status='completed'
+        )])
+        ClinicVisit.objects.update(total_visits=40, patient_notes='Muy recomendable', rating=5)
+
+        call_command('rebuild_clinic_visits', '--batch-size', '1', stdout=StringIO())
+        visit = ClinicVisit.objects.get(patient=self.patient)
+        self.assertEqual((visit.total_visits, visit.last_visit_date), (2, date(2025, 1, 11)))
+        self.assertEqual((visit.patient_notes, visit.rating), ('Muy recomendable', 5))
+        self.assertEqual(ClinicVisit.objects.get(patient=other).clinic_name, 'Consultorio Centro')
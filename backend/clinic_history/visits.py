@@ -0,0 +1,119 @@
+"""
+Mantenimiento del historial de consultorios visitados (``ClinicVisit``).
+
+``record_completed_visit`` suma una visita con un ``UPDATE`` atómico sobre la
+pareja paciente-profesional (``F()``/``Greatest``/``Least``); solo la primera
+vez inserta antes la fila en cero. Si la cita deja de estar completada,
+``discard_completed_visit`` recalcula la pareja (descontarla con ``F()`` no
+sabría corregir las fechas). ``rebuild_visits`` recalcula todas las parejas con un
+único agregado agrupado que se recorre por lotes.
+"""
+from django.db.models import Count, F, Max, Min, TextField, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from appointments.models import Appointment
+from .models import ClinicVisit
+
+STATS_FIELDS = ['first_visit_date', 'last_visit_date', 'total_visits', 'updated_at']
+
+
+def clinic_fields(professional):
+    """Datos del consultorio copiados del profesional al crear la visita"""
+    return {
+        'clinic_name': professional.clinic_name or '',
+        'clinic_address': professional.clinic_address or '',
+        'clinic_phone': professional.phone or '',
+        'specialty_visited': professional.specialty or '',
+    }
+
+
+def record_completed_visit(appointment):
+    """Registra una cita recién completada en la visita de su pareja paciente-profesional"""
+    visits = ClinicVisit.objects.filter(
+        patient_id=appointment.patient_id, professional_id=appointment.professional_id
+    )
+    changes = {
+        'total_visits': F('total_visits') + 1,
+        'first_visit_date': Least('first_visit_date', Value(appointment.appointment_date)),
+        'last_visit_date': Greatest('last_visit_date', Value(appointment.appointment_date)),
+        'updated_at': timezone.now(),
+    }
+    if visits.update(**changes):
+        return
+    # Primera visita de la pareja: fila en cero (tolerando otra creación
+    # concurrente) y el mismo UPDATE la deja en una visita
+    ClinicVisit.objects.bulk_create([
+        ClinicVisit(
+            patient_id=appointment.patient_id,
+            professional_id=appointment.professional_id,
+            first_visit_date=appointment.appointment_date,
+            last_visit_date=appointment.appointment_date,
+            total_visits=0,
+            **clinic_fields(appointment.professional)
+        )
+    ], ignore_conflicts=True)
+    visits.update(**changes)
+
+
+def discard_completed_visit(appointment):
+    """Descuenta una cita que deja de estar completada (agregado de la pareja + UPDATE)"""
+    stats = Appointment.objects.filter(
+        patient_id=appointment.patient_id, professional_id=appointment.professional_id, status='completed'
+    ).aggregate(
+        first_visit_date=Min('appointment_date'),
+        last_visit_date=Max('appointment_date'),
+        total_visits=Count('id'),
+    )
+    if not stats['total_visits']:
+        # Sin visitas completadas: se conservan las fechas, las notas y la calificación
+        stats = {'total_visits': 0}
+    ClinicVisit.objects.filter(
+        patient_id=appointment.patient_id, professional_id=appointment.professional_id
+    ).update(updated_at=timezone.now(), **stats)
+
+
+def visit_aggregates():
+    """Agregado por pareja paciente-profesional de las citas completadas (una consulta)"""
+    return (
+        Appointment.objects.filter(status='completed')
+        .values('patient_id', 'professional_id')
+        .annotate(
+            first_visit_date=Min('appointment_date'),
+            last_visit_date=Max('appointment_date'),
+            total_visits=Count('id'),
+            clinic_name=Coalesce(Max('professional__clinic_name'), Value('')),
+            clinic_address=Coalesce(Max('professional__clinic_address'), Value(''), output_field=TextField()),
+            clinic_phone=Coalesce(Max('professional__phone'), Value('')),
+            specialty_visited=Coalesce(Max('professional__specialty'), Value('')),
+        )
+        .order_by()
+    )
+
+
+def rebuild_visits(batch_size=5000):
+    """
+    Inserta o actualiza todas las parejas desde el agregado. Las notas y la
+    calificación del paciente se conservan en las filas existentes.
+    Devuelve el número de parejas procesadas.
+    """
+    total = 0
+    batch = []
+    for row in visit_aggregates().iterator(chunk_size=batch_size):
+        batch.append(ClinicVisit(**row))
+        if len(batch) >= batch_size:
+            total += _upsert(batch)
+            batch = []
+    if batch:
+        total += _upsert(batch)
+    return total
+
+
+def _upsert(visits):
+    ClinicVisit.objects.bulk_create(
+        visits,
+        update_conflicts=True,
+        unique_fields=['patient', 'professional'],
+        update_fields=STATS_FIELDS,
+    )
+    return len(visits)
@@ -17,7 +17,30 @@ echo "🚀 Aplicando migraciones de Django..."
 # La bandera --noinput hace que no pregunte nada al ejecutar
 python manage.py migrate --noinput
 
-# 3. Iniciar el servidor (Ejecuta el comando CMD original de Django)
-echo "✅ Iniciando servidor Django..."
-# exec "$@" es el patrón estándar para pasar el control al CMD
-exec "$@"
\ No newline at end of file
+# 3. Iniciar el servidor
+# Un comando explícito (docker run ... <cmd>) tiene prioridad; si no, SERVER_MODE elige:
+#   wsgi      gunicorn con workers gthread (producción, por defecto)
+#   asgi      gunicorn con workers uvicorn
+#   runserver servidor de desarrollo de Django con autoreload
+# Ver gunicorn.conf.py para WEB_CONCURRENCY, keep-alive y recarga con HUP.
+if [ "$#" -gt 0 ]; then
+    echo "✅ Iniciando: $*"
+    exec "$@"
+fi
+
+SERVER_MODE="${SERVER_MODE:-wsgi}"
+export SERVER_MODE
+case "$SERVER_MODE" in
+    wsgi|asgi)
+        echo "✅ Iniciando gunicorn ($SERVER_MODE)..."
+        exec gunicorn --config gunicorn.conf.py
+        ;;
+    runserver)
+        echo "✅ Iniciando servidor de desarrollo Django..."
+        exec python manage.py runserver "0.0.0.0:${PORT:-8000}"
+        ;;
+    *)
+        echo "❌ Error: SERVER_MODE desconocido '$SERVER_MODE' (wsgi, asgi o runserver)"
+        exit 1
+        ;;
+esac
@@ -0,0 +1,122 @@
+"""
+Configuración de gunicorn para producción (``SERVER_MODE=wsgi`` o ``asgi``
+en ``entrypoint.sh``).
+
+El proceso maestro importa la aplicación una sola vez (``preload_app``) y
+forkea los workers, que comparten esas páginas de memoria y arrancan sin
+volver a importar Django. ``kill -HUP <pid del maestro>`` recarga la
+configuración y reemplaza los workers de a uno sin cortar conexiones; para
+desplegar código nuevo con ``preload_app`` hay que usar ``USR2`` + ``TERM``
+(o reiniciar el contenedor), porque el maestro conserva el código importado.
+
+Todo se puede ajustar por variables de entorno:
+
+    SERVER_MODE           wsgi (workers síncronos con hilos) o asgi (uvicorn)
+    PORT                  puerto (8000)
+    WEB_CONCURRENCY       workers (por defecto 2 × núcleos + 1, acotado por
+                          DB_CONNECTION_BUDGET)
+    DB_CONNECTION_BUDGET  conexiones a PostgreSQL por instancia (24)
+    GUNICORN_THREADS      hilos por worker WSGI (4)
+    ASGI_DB_CONCURRENCY   peticiones con base de datos a la vez por worker
+                          ASGI, para el presupuesto (4)
+    GUNICORN_TIMEOUT      segundos antes de reiniciar un worker colgado (30)
+    GUNICORN_KEEPALIVE    segundos de keep-alive HTTP (5)
+    GUNICORN_MAX_REQUESTS reinicio periódico de workers, 0 lo desactiva (2000)
+    PUSH_BROKER_ADDRESS   broker de eventos de /api/push/ (asgi con más de un
+                          worker: 127.0.0.1:8765, lo arranca el maestro)
+
+Presupuesto de conexiones (``DB_CONNECTION_BUDGET``, por instancia):
+
+- WSGI: con ``CONN_MAX_AGE`` cada hilo de gthread conserva su propia conexión
+  a PostgreSQL, así que una instancia abre hasta ``workers × GUNICORN_THREADS``.
+- ASGI: Django ejecuta el código síncrono de cada petición (incluido el ORM
+  async) en un hilo propio (``ThreadSensitiveContext``), así que cada petición
+  en curso usa su propia conexión; settings fija ``CONN_MAX_AGE = 0`` para
+  cerrarla al terminar. Las conexiones siguen a la concurrencia, no a los
+  workers: el presupuesto supone ``ASGI_DB_CONCURRENCY`` (4) peticiones con
+  base de datos a la vez por worker. Para un tope estricto bajo picos hace
+  falta un pooler (PgBouncer en modo transaction) delante de PostgreSQL.
+
+Sin ``WEB_CONCURRENCY`` explícito, los workers se reducen para no pasar del
+presupuesto; la suma de los presupuestos de todas las réplicas, más los
+comandos (``send_reminders``, ``deliver_webhooks``) y un margen para
+administración, debe quedar por debajo de ``max_connections`` (100 por
+defecto). Con el valor por defecto caben cuatro réplicas.
+"""
+import multiprocessing
+import os
+import subprocess
+import sys
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _cores():
+    # Núcleos asignados al proceso (respeta cpusets del contenedor)
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return multiprocessing.cpu_count()
+
+
+def _default_workers(connections_per_worker):
+    # 2 × núcleos + 1, sin pasar del presupuesto de conexiones de la instancia
+    budget = _env_int('DB_CONNECTION_BUDGET', 24)
+    return max(1, min(_cores() * 2 + 1, budget // connections_per_worker))
+
+
+bind = f"0.0.0.0:{_env_int('PORT', 8000)}"
+
+if os.environ.get('SERVER_MODE', 'wsgi') == 'asgi':
+    wsgi_app = 'healthcare_system.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    # Una conexión por petición en curso (CONN_MAX_AGE = 0 en settings)
+    workers = _env_int('WEB_CONCURRENCY', _default_workers(_env_int('ASGI_DB_CONCURRENCY', 4)))
+    # Los eventos en vivo de un worker llegan a las conexiones de los demás por el broker
+    if workers > 1:
+        os.environ.setdefault('PUSH_BROKER_ADDRESS', '127.0.0.1:8765')
+else:
+    wsgi_app = 'healthcare_system.wsgi:application'
+    # Hilos para que las esperas de la base de datos no bloqueen el worker
+    worker_class = 'gthread'
+    threads = _env_int('GUNICORN_THREADS', 4)
+    # Cada hilo conserva su conexión (CONN_MAX_AGE)
+    workers = _env_int('WEB_CONCURRENCY', _default_workers(threads))
+
+preload_app = True
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = 30
+# Acota el crecimiento de memoria; el jitter evita que todos reinicien a la vez
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+# Sin el ?token= de /api/push/ en la línea de petición
+logger_class = 'healthcare_system.access_log.AccessLogger'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+forwarded_allow_ips = '*'
+
+
+def post_fork(server, worker):
+    # Las conexiones abiertas por el maestro al precargar no se comparten entre procesos
+    from django.db import connections
+    connections.close_all()
+
+
+MANAGE_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manage.py')
+_broker = None
+
+
+def on_starting(server):
+    global _broker
+    address = os.environ.get('PUSH_BROKER_ADDRESS') if worker_class.startswith('uvicorn') else None
+    if address:
+        _broker = subprocess.Popen([sys.executable, MANAGE_PY, 'run_push_broker', '--address', address])
+
+
+def on_exit(server):
+    if _broker is not None:
+        _broker.terminate()
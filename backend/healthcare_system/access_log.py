@@ -0,0 +1,49 @@
+"""
+Log de accesos de gunicorn sin el access token de ``/api/push/``.
+
+``EventSource`` y WebSocket del navegador no envían headers propios, así que
+el canal en vivo acepta el token en ``?token=`` (ver ``sync.push``) y la línea
+de petición del log de accesos lo dejaría en claro. ``AccessLogger`` agrega
+``RedactTokenFilter`` a los handlers de accesos: los usa tanto el log de
+gunicorn (WSGI, argumentos en un dict de átomos) como ``uvicorn.access`` bajo
+``UvicornWorker``, que reutiliza esos mismos handlers (argumentos en tupla).
+"""
+import logging
+import re
+
+from gunicorn.glogging import Logger
+
+TOKEN_PARAM = re.compile(r'([?&]token=)[^&\s"]*')
+
+
+def redact_token(text):
+    """``text`` con el valor de los parámetros ``token`` reemplazado"""
+    return TOKEN_PARAM.sub(r'\1[redacted]', text)
+
+
+def _redact(value):
+    return redact_token(value) if isinstance(value, str) and 'token=' in value else value
+
+
+class RedactTokenFilter(logging.Filter):
+    """Quita el token de los argumentos del registro antes de formatearlo"""
+
+    def filter(self, record):
+        if isinstance(record.args, dict):
+            # Se modifica en su lugar: los átomos de gunicorn son un dict propio
+            # que resuelve los headers (``%({x-forwarded-for}i)s``) al formatear
+            for key, value in list(record.args.items()):
+                record.args[key] = _redact(value)
+        elif isinstance(record.args, tuple):
+            record.args = tuple(_redact(value) for value in record.args)
+        record.msg = _redact(record.msg)
+        return True
+
+
+class AccessLogger(Logger):
+    """``logger_class`` de gunicorn.conf.py"""
+
+    def setup(self, cfg):
+        super().setup(cfg)
+        for handler in self.access_log.handlers:
+            handler.addFilter(RedactTokenFilter())
@@ -3,6 +3,9 @@ ASGI config for healthcare_system project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+``/api/push/`` (eventos en vivo por SSE o WebSocket) lo atiende
+``sync.push.PushApplication``; el resto de las rutas, Django.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -13,4 +16,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthcare_system.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Después de get_asgi_application(): necesita las apps cargadas
+from sync.push import PushApplication  # noqa: E402
+
+application = PushApplication(django_application)
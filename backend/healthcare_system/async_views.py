@@ -0,0 +1,106 @@
+"""
+Variantes async de las lecturas más frecuentes de la API, para el servidor
+ASGI (``SERVER_MODE=asgi``, ver ``ASYNC_READ_VIEWS``).
+
+``async_read_view(sync_view)`` convierte un handler ``async`` en una vista
+que responde los GET en el event loop: autentica con ``aauthenticate`` (sin
+consultas si el token alcanza; los backends sin ella, en un hilo), corre el
+``initial`` de la vista DRF (negociación, permisos, throttling) y el handler
+lee con el ORM async. Los errores salen de ``handle_exception`` de la misma
+vista y el resto (escrituras y la API navegable) lo atiende ``sync_view`` en
+un hilo, así que las respuestas son las mismas que las de la vista síncrona.
+
+En Django 4.2 cada consulta del ORM async sigue ejecutándose en un hilo de
+la petición (``sync_to_async``); lo que se evita es pasar a ese hilo la
+autenticación, la serialización y el renderizado, y crearlo siquiera cuando
+la respuesta sale de las cachés (perfil, directorio).
+
+Ese hilo es propio de cada petición (``ThreadSensitiveContext`` del
+``ASGIHandler``) y con él su conexión a la base de datos: bajo ASGI settings
+usa ``CONN_MAX_AGE = 0`` y Django la cierra con ``request_finished``, que
+corre en el mismo contexto. Con conexiones persistentes quedaría una
+abierta por cada petición atendida (ver el presupuesto en gunicorn.conf.py).
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+
+async def authenticate(request):
+    """``Request._authenticate`` con ``aauthenticate``; mismas excepciones"""
+    for authenticator in request.authenticators:
+        backend = getattr(authenticator, 'aauthenticate', None) or sync_to_async(authenticator.authenticate)
+        try:
+            user_auth_tuple = await backend(request)
+        except Exception:
+            request._not_authenticated()
+            raise
+        if user_auth_tuple is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth_tuple
+            return
+    request._not_authenticated()
+
+
+def view_instance(sync_view, request, args, kwargs):
+    """Instancia de la vista DRF detrás de ``sync_view`` (APIView, ``@api_view`` o acción de ViewSet)"""
+    view = sync_view.cls(**sync_view.initkwargs)
+    actions = getattr(sync_view, 'actions', None)
+    if actions:
+        view.action_map = actions
+        for method, action in actions.items():
+            setattr(view, method, getattr(view, action))
+    view.setup(request, *args, **kwargs)
+    return view
+
+
+def plain_response(response):
+    """
+    Copia ya renderizada de un ``Response`` de DRF. El handler async de
+    Django pasa a un hilo toda respuesta con ``render`` aunque ya esté
+    renderizada; esta no lo tiene. Conserva ``data`` y el renderer, que
+    leen los tests con ``APIClient``.
+    """
+    response.render()
+    plain = HttpResponse(response.content, status=response.status_code, headers=dict(response.items()))
+    for name in ('data', 'exception', 'accepted_renderer', 'accepted_media_type'):
+        setattr(plain, name, getattr(response, name, None))
+    return plain
+
+
+def async_read_view(sync_view):
+    """
+    Decorador: ``handler(view, request, *args, **kwargs)`` devuelve el
+    ``Response`` del GET de ``sync_view``; ``view`` es la vista DRF ya
+    inicializada y ``request`` el ``Request`` autenticado.
+    """
+    def decorator(handler):
+        fallback = sync_to_async(sync_view)
+
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method != 'GET':
+                return await fallback(request, *args, **kwargs)
+            instance = view_instance(sync_view, request, args, kwargs)
+            drf_request = instance.initialize_request(request, *args, **kwargs)
+            instance.request = drf_request
+            instance.headers = instance.default_response_headers
+            instance.format_kwarg = instance.get_format_suffix(**kwargs)
+            try:
+                await authenticate(drf_request)
+                # Con el usuario resuelto, perform_authentication no hace nada
+                instance.initial(drf_request, *args, **kwargs)
+                if not isinstance(drf_request.accepted_renderer, JSONRenderer):
+                    return await fallback(request, *args, **kwargs)
+                response = await handler(instance, drf_request, *args, **kwargs)
+            except Exception as exc:
+                response = instance.handle_exception(exc)
+            response = instance.finalize_response(drf_request, response, *args, **kwargs)
+            return plain_response(response)
+
+        # Igual que las vistas DRF: la autenticación es por token, no por sesión
+        view.csrf_exempt = True
+        return view
+    return decorator
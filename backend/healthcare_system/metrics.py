@@ -0,0 +1,306 @@
+"""
+Métricas de peticiones HTTP por ruta, en formato de texto de Prometheus.
+
+``MetricsMiddleware`` registra por (método, ruta, estado) un histograma de
+latencia, las consultas SQL y su tiempo, y los bytes de respuesta. La ruta es
+el patrón de la URL resuelta (``/api/appointments/<int:pk>/``), no el path
+concreto, para acotar la cardinalidad; los grupos de las rutas regex del router
+de DRF se muestran como ``<nombre>``.
+
+Los agregados son por proceso y sin locks en el camino de la petición: cada
+hilo escribe solo en su propio shard y ``render_prometheus`` los suma al
+exportar. Con varios workers cada proceso expone sus propios contadores.
+
+Con ``METRICS_SQL_SAMPLE_RATE`` > 0 una fracción de las peticiones guarda
+además el SQL ejecutado; si la petición supera ``METRICS_SLOW_REQUEST_MS``
+la traza queda en ``slow_traces`` y se registra en el log.
+
+Bajo ASGI las consultas corren en el hilo del ORM (``sync_to_async``), con
+otra conexión que la del middleware: el tracker de la petición viaja en
+``current_tracker`` y ``tracked_execute``, instalado en cada conexión nueva,
+lo aplica.
+"""
+import bisect
+import contextvars
+import functools
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = '<unmatched>'
+_REGEX_GROUP = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+@functools.lru_cache(maxsize=512)
+def route_label(route):
+    """``api/reviews/(?P<pk>[^/.]+)/$`` -> ``/api/reviews/<pk>/``"""
+    return '/' + _REGEX_GROUP.sub(r'<\1>', route).replace('^', '').replace('$', '')
+
+
+# ==================== AGREGADOS ====================
+
+class RouteStats:
+    """Acumulados de una combinación (método, ruta, estado)"""
+
+    __slots__ = ('buckets', 'duration', 'queries', 'db_duration', 'response_bytes')
+
+    def __init__(self, size):
+        # Un contador por límite más el de +Inf (no acumulativos)
+        self.buckets = [0] * (size + 1)
+        self.duration = 0.0
+        self.queries = 0
+        self.db_duration = 0.0
+        self.response_bytes = 0
+
+    def merge(self, other):
+        for index, count in enumerate(other.buckets):
+            self.buckets[index] += count
+        self.duration += other.duration
+        self.queries += other.queries
+        self.db_duration += other.db_duration
+        self.response_bytes += other.response_bytes
+
+
+class MetricsRegistry:
+    """
+    Shards por hilo: el hilo dueño es el único que escribe en su dict, así que
+    ``observe`` no necesita locks. El lock solo protege el alta de un shard
+    nuevo (una vez por hilo). Los shards de hilos terminados se conservan para
+    que los contadores nunca retrocedan.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._shards = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def observe(self, method, route, status, duration, queries=0, db_duration=0.0, response_bytes=0):
+        shard = self._shard()
+        key = (method, route, status)
+        stats = shard.get(key)
+        if stats is None:
+            stats = shard[key] = RouteStats(len(self.buckets))
+        stats.buckets[bisect.bisect_left(self.buckets, duration)] += 1
+        stats.duration += duration
+        stats.queries += queries
+        stats.db_duration += db_duration
+        stats.response_bytes += response_bytes
+
+    def snapshot(self):
+        """Suma de todos los shards: ``{(método, ruta, estado): RouteStats}``"""
+        with self._lock:
+            shards = list(self._shards)
+        totals = {}
+        for shard in shards:
+            # list() copia el dict de una vez aunque su hilo agregue claves
+            for key, stats in list(shard.items()):
+                total = totals.get(key)
+                if total is None:
+                    total = totals[key] = RouteStats(len(self.buckets))
+                total.merge(stats)
+        return totals
+
+    def reset(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+registry = MetricsRegistry(_setting('METRICS_LATENCY_BUCKETS', DEFAULT_BUCKETS))
+
+# Últimas trazas SQL de peticiones lentas muestreadas
+slow_traces = deque(maxlen=_setting('METRICS_SLOW_TRACES', 50))
+
+
+# ==================== EXPORTACIÓN ====================
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(method, route, status, **extra):
+    pairs = [('method', method), ('route', route), ('status', status), *extra.items()]
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def render_prometheus(metrics=None):
+    """Texto de exposición de Prometheus (versión 0.0.4) con todas las rutas"""
+    metrics = registry if metrics is None else metrics
+    snapshot = sorted(metrics.snapshot().items())
+    bounds = [repr(bound) for bound in metrics.buckets] + ['+Inf']
+    lines = [
+        '# HELP http_request_duration_seconds Latencia de las peticiones HTTP por ruta.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for (method, route, status), stats in snapshot:
+        cumulative = 0
+        for bound, count in zip(bounds, stats.buckets):
+            cumulative += count
+            lines.append(
+                f'http_request_duration_seconds_bucket{_labels(method, route, status, le=bound)} {cumulative}'
+            )
+        labels = _labels(method, route, status)
+        lines.append(f'http_request_duration_seconds_sum{labels} {stats.duration!r}')
+        lines.append(f'http_request_duration_seconds_count{labels} {cumulative}')
+
+    counters = (
+        ('http_request_db_queries_total', 'Consultas SQL ejecutadas por las peticiones.', 'queries'),
+        ('http_request_db_duration_seconds_total', 'Tiempo en consultas SQL de las peticiones.', 'db_duration'),
+        ('http_response_bytes_total', 'Bytes del cuerpo de las respuestas.', 'response_bytes'),
+    )
+    for name, help_text, attribute in counters:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for (method, route, status), stats in snapshot:
+            lines.append(f'{name}{_labels(method, route, status)} {getattr(stats, attribute)!r}')
+    return '\n'.join(lines) + '\n'
+
+
+# ==================== MIDDLEWARE ====================
+
+class QueryTracker:
+    """``execute_wrapper`` que cuenta y cronometra las consultas (y opcionalmente guarda el SQL)"""
+
+    __slots__ = ('count', 'duration', 'statements')
+
+    def __init__(self, sample):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = [] if sample else None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if self.statements is not None:
+                self.statements.append((sql, elapsed))
+
+
+# Tracker de la petición async en curso (se propaga a los hilos de sync_to_async)
+current_tracker = contextvars.ContextVar('current_tracker', default=None)
+
+
+def tracked_execute(execute, sql, params, many, context):
+    tracker = current_tracker.get()
+    if tracker is None:
+        return execute(sql, params, many, context)
+    return tracker(execute, sql, params, many, context)
+
+
+def install_tracked_execute(sender, connection, **kwargs):
+    # connection_created se emite en cada reconexión del mismo objeto
+    if tracked_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(tracked_execute)
+
+
+connection_created.connect(install_tracked_execute, dispatch_uid='metrics_tracked_execute')
+
+
+class MetricsMiddleware:
+    """
+    Registra las métricas de cada petición en ``registry``. Va después de
+    ``CorsMiddleware`` (los preflight no se miden) y antes del resto. Sirve
+    tanto a cadenas síncronas (WSGI) como async (ASGI).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        self.enabled = _setting('METRICS_ENABLED', True)
+        self.sample_rate = _setting('METRICS_SQL_SAMPLE_RATE', 0.0)
+        self.slow_seconds = _setting('METRICS_SLOW_REQUEST_MS', 500) / 1000
+        self.max_statements = _setting('METRICS_SLOW_TRACE_QUERIES', 100)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        tracker = self.tracker()
+        start = time.perf_counter()
+        with connection.execute_wrapper(tracker):
+            response = self.get_response(request)
+        self.record(request, response, tracker, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        tracker = self.tracker()
+        token = current_tracker.set(tracker)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_tracker.reset(token)
+        self.record(request, response, tracker, time.perf_counter() - start)
+        return response
+
+    def tracker(self):
+        return QueryTracker(sample=self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def record(self, request, response, tracker, duration):
+        match = request.resolver_match
+        route = route_label(match.route) if match is not None else UNMATCHED_ROUTE
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(
+            request.method, route, response.status_code, duration,
+            tracker.count, tracker.duration, size,
+        )
+        if tracker.statements is not None and duration >= self.slow_seconds:
+            self.record_slow(request, route, response.status_code, duration, tracker)
+
+    def record_slow(self, request, route, status, duration, tracker):
+        trace = {
+            'method': request.method,
+            'route': route,
+            'path': request.path,
+            'status': status,
+            'duration_ms': round(duration * 1000, 2),
+            'queries': tracker.count,
+            'db_ms': round(tracker.duration * 1000, 2),
+            'sql': [
+                {'sql': sql, 'ms': round(elapsed * 1000, 3)}
+                for sql, elapsed in tracker.statements[:self.max_statements]
+            ],
+        }
+        slow_traces.append(trace)
+        logger.warning(
+            'Petición lenta %s %s: %.1f ms, %d consultas (%.1f ms en SQL)',
+            request.method, route, trace['duration_ms'], tracker.count, trace['db_ms'],
+        )
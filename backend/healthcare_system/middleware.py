@@ -1,30 +1,92 @@
 """
 Middleware CORS manual que SÍ funciona
 """
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
 
 class CorsMiddleware:
     """
-    Middleware CORS manual para desarrollo
+    Middleware CORS con lista de orígenes configurable (``CORS_ALLOWED_ORIGINS``).
+    Solo los orígenes listados reciben ``Access-Control-Allow-Credentials``;
+    con ``'*'`` se responde un comodín literal sin credenciales.
+
+    Los preflight (``OPTIONS`` con ``Access-Control-Request-Method``) se
+    responden aquí mismo, sin pasar por sesiones, CSRF, autenticación ni la
+    vista, e incluyen ``Access-Control-Max-Age`` para que el navegador los
+    reutilice. Debe ir primero en ``MIDDLEWARE``.
+
+    Funciona tanto en WSGI como en ASGI sin adaptar la vista: con una cadena
+    async, Django no tiene que ejecutar las vistas async en un hilo.
     """
+    sync_capable = True
+    async_capable = True
     
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        origins = getattr(settings, 'CORS_ALLOWED_ORIGINS', ['http://localhost:3000'])
+        self.allow_all = '*' in origins
+        self.allowed_origins = frozenset(origin.rstrip('/') for origin in origins)
+        # Headers precalculados una sola vez
+        self.preflight_headers = {
+            'Access-Control-Allow-Methods': ', '.join(getattr(settings, 'CORS_ALLOW_METHODS', ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'])),
+            'Access-Control-Allow-Headers': ', '.join(getattr(settings, 'CORS_ALLOW_HEADERS', ['Content-Type', 'Authorization', 'X-Requested-With'])),
+            'Access-Control-Max-Age': str(getattr(settings, 'CORS_PREFLIGHT_MAX_AGE', 86400)),
+        }
+        self.expose_headers = ', '.join(getattr(settings, 'CORS_EXPOSE_HEADERS', ['Content-Type', 'Authorization']))
         
     def __call__(self, request):
-        # Obtener la respuesta
-        response = self.get_response(request)
-        
-        # Headers CORS obligatorios
-        response['Access-Control-Allow-Origin'] = 'http://localhost:3000'
-        response['Access-Control-Allow-Methods'] = 'GET, POST, PUT, PATCH, DELETE, OPTIONS'
-        response['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With'
+        if self.is_async:
+            return self.__acall__(request)
+        response = self.preflight(request)
+        if response is None:
+            response = self.finish(request, self.get_response(request))
+        return response
+    
+    async def __acall__(self, request):
+        response = self.preflight(request)
+        if response is None:
+            response = self.finish(request, await self.get_response(request))
+        return response
+    
+    def preflight(self, request):
+        """Respuesta del preflight, sin ejecutar el resto del stack (None si no lo es)"""
+        if request.method != 'OPTIONS' or 'HTTP_ACCESS_CONTROL_REQUEST_METHOD' not in request.META:
+            return None
+        origin = request.META.get('HTTP_ORIGIN')
+        response = HttpResponse(status=200)
+        response['Content-Length'] = '0'
+        patch_vary_headers(response, ('Origin',))
+        if self.is_allowed(origin):
+            self.add_cors_headers(response, origin)
+            for header, value in self.preflight_headers.items():
+                response[header] = value
+        return response
+    
+    def is_allowed(self, origin):
+        return origin is not None and (self.allow_all or origin in self.allowed_origins)
+    
+    def finish(self, request, response):
+        origin = request.META.get('HTTP_ORIGIN')
+        allowed = self.is_allowed(origin)
+        if origin is not None:
+            patch_vary_headers(response, ('Origin',))
+        if allowed:
+            self.add_cors_headers(response, origin)
+            response['Access-Control-Expose-Headers'] = self.expose_headers
+        return response
+    
+    def add_cors_headers(self, response, origin):
+        if self.allow_all:
+            # Cualquier origen: '*' literal y sin credenciales, para que otro
+            # sitio no pueda hacer peticiones con las cookies del usuario
+            response['Access-Control-Allow-Origin'] = '*'
+            return
+        # Se devuelve el origen concreto (no '*') porque se permiten credenciales
+        response['Access-Control-Allow-Origin'] = origin
         response['Access-Control-Allow-Credentials'] = 'true'
-        response['Access-Control-Expose-Headers'] = 'Content-Type, Authorization'
-        
-        # Manejar preflight requests (OPTIONS)
-        if request.method == 'OPTIONS':
-            response.status_code = 200
-            response.content = b''
-            response['Content-Length'] = '0'
-        
-        return response
\ No newline at end of file
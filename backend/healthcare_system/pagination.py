@@ -0,0 +1,155 @@
+"""
+Paginación por cursor (keyset) para los listados de la API.
+
+A diferencia de la paginación por página u offset, cada página se obtiene
+filtrando por la posición del último elemento de la anterior sobre un
+ordenamiento único, por lo que el costo no crece con la profundidad.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación keyset sobre ``ordering`` (debe terminar en un campo único,
+    normalmente ``id``). Las vistas pueden definir ``keyset_ordering`` para
+    usar otro ordenamiento.
+
+    Modo compatibilidad: ``?paginate=false`` devuelve la lista completa sin
+    envolver, como antes de paginar.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    compat_query_param = 'paginate'
+    ordering = ('-id',)
+    invalid_cursor_message = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.page_rows(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` con el ORM async (vistas de ``healthcare_system.async_views``)"""
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.page_rows([row async for row in queryset])
+
+    def page_queryset(self, queryset, request, view=None):
+        """Consulta de la página (una fila de más para saber si hay otra) o None sin paginar"""
+        if request.query_params.get(self.compat_query_param, '').lower() in ('false', '0', 'no'):
+            return None
+
+        self.request = request
+        self.ordering = tuple(getattr(view, 'keyset_ordering', self.ordering))
+        self.page_size = self.get_page_size(request)
+        self.cursor_values, self.cursor_reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self._reversed(self.ordering) if self.cursor_reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor_values is not None:
+            queryset = queryset.filter(self._after(ordering, self.cursor_values))
+        return queryset[:self.page_size + 1]
+
+    def page_rows(self, rows):
+        """Recorta las filas leídas por ``page_queryset`` y calcula las posiciones vecinas"""
+        reverse = self.cursor_reverse
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_position = self._position(rows[-1]) if rows and (has_more or reverse) else None
+        self.previous_position = (
+            self._position(rows[0]) if rows and (has_more if reverse else self.cursor_values is not None) else None
+        )
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.encode_cursor(self.next_position, reverse=False),
+            'previous': self.encode_cursor(self.previous_position, reverse=True),
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    # ---- cursor -------------------------------------------------------
+
+    def encode_cursor(self, position, reverse):
+        if position is None:
+            return None
+        payload = json.dumps({'v': position, 'r': int(reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            raw_values = payload['v']
+            if len(raw_values) != len(self.ordering):
+                raise ValueError
+            values = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, raw_values)
+            ]
+            return values, bool(payload.get('r'))
+        except (ValueError, KeyError, TypeError, ValidationError):
+            # base64/JSON mal formados (ValueError), estructura inesperada o
+            # valores que no corresponden al tipo del campo
+            raise NotFound(self.invalid_cursor_message)
+
+    # ---- helpers ------------------------------------------------------
+
+    def _position(self, row):
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return position
+
+    @staticmethod
+    def _reversed(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    @staticmethod
+    def _after(ordering, values):
+        """
+        Expande la comparación de tuplas (a, b, c) > (x, y, z) respetando la
+        dirección de cada campo: a >= x AND (a > x OR (a = x AND b > y) OR ...).
+        La cota redundante sobre el primer campo es la que PostgreSQL puede usar
+        como condición del índice; sin ella la cadena de OR queda como filtro y
+        recorre todas las filas anteriores a la página.
+        """
+        leading = ordering[0]
+        bound = Q(**{f"{leading.lstrip('-')}__{'lte' if leading.startswith('-') else 'gte'}": values[0]})
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clause = Q(**{f'{name}__{lookup}': values[index]})
+            for previous_field, previous_value in zip(ordering[:index], values[:index]):
+                clause &= Q(**{previous_field.lstrip('-'): previous_value})
+            condition |= clause
+        return bound & condition
@@ -0,0 +1,48 @@
+"""
+Renderer JSON basado en orjson.
+
+Produce la misma salida que ``rest_framework.renderers.JSONRenderer`` para los
+datos de la API (fechas ISO 8601 con ``Z`` en UTC, ``Decimal`` como número),
+pero serializa fechas, horas y UUID de forma nativa en C.
+"""
+import datetime
+import decimal
+
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+
+
+def default(obj):
+    """Tipos que orjson no conoce; mismo criterio que el encoder de DRF"""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f'Tipo no serializable a JSON: {type(obj).__name__}')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` con orjson; respeta ``indent`` del media type o del contexto"""
+
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=default, option=options)
@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,11 +31,17 @@ INSTALLED_APPS = [
     'users',
     'appointments',
     'reviews',
+    'webhooks',
+    'clinic_history',
+    'sync',
 ]
 
 MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
+    # Primero: responde los preflight CORS sin pasar por el resto del stack
     'healthcare_system.middleware.CorsMiddleware',  # NUESTRO MIDDLEWARE MANUAL
+    # Latencia, consultas y tamaño por ruta (healthcare_system.metrics)
+    'healthcare_system.metrics.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -66,6 +72,9 @@ WSGI_APPLICATION = 'healthcare_system.wsgi.application'
 
 # ==================== DATABASE CONFIGURATION ====================
 
+# wsgi, asgi o runserver (lo exporta entrypoint.sh)
+SERVER_MODE = config('SERVER_MODE', default='wsgi')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -74,13 +83,45 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD', 'healthcare_password'),
         'HOST': os.environ.get('DB_HOST', 'db'),
         'PORT': os.environ.get('DB_PORT', '5432'),
-        'CONN_MAX_AGE': 600,
+        # WSGI: conexión persistente por hilo de gthread (ver el presupuesto en
+        # gunicorn.conf.py). ASGI: cada petición corre su código síncrono en un
+        # hilo propio (ThreadSensitiveContext), así que una conexión persistente
+        # quedaría abierta por petición; se cierra al terminar cada una
+        'CONN_MAX_AGE': 0 if SERVER_MODE == 'asgi' else config('DB_CONN_MAX_AGE', default=600, cast=int),
         'OPTIONS': {
             'connect_timeout': 10,
         }
     }
 }
 
+# ==================== CACHE ====================
+
+# La caché local es por proceso: con varios workers conviene un backend
+# compartido para que la invalidación llegue a todos. Con REDIS_URL (p. ej.
+# redis://redis:6379/1) se usa Redis; CACHE_BACKEND/CACHE_LOCATION permiten
+# elegir cualquier otro backend.
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+REDIS_URL = config('REDIS_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.redis.RedisCache' if REDIS_URL else 'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', REDIS_URL or 'healthcare-cache'),
+    }
+}
+# Si la caché la ven todos los procesos. Sin ella no se confía en lo que otro
+# proceso invalidó: la autenticación JWT no usa el modo solo-claims ni el nivel
+# compartido de usuarios, y el directorio guarda su versión en la base de datos
+SHARED_CACHE = CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+# Directorio de profesionales (users.directory)
+PROFESSIONALS_CACHE_SECONDS = 300
+
 # ==================== PASSWORD VALIDATION ====================
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -116,22 +157,79 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication con el usuario cacheado (users.authentication)
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # JSON con orjson (healthcare_system.renderers / parsers)
     'DEFAULT_PARSER_CLASSES': (
-        'rest_framework.parsers.JSONParser',
+        'healthcare_system.parsers.ORJSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        'healthcare_system.renderers.ORJSONRenderer',
     ),
 }
 
+# La API navegable solo en desarrollo
+if DEBUG:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] += ('rest_framework.renderers.BrowsableAPIRenderer',)
+
+# ==================== AGENDA DE CITAS ====================
+
+# Jornada laboral por defecto para el cálculo de horarios disponibles
+APPOINTMENT_WORKDAY_START = config('APPOINTMENT_WORKDAY_START', default=8, cast=int)  # hora
+APPOINTMENT_WORKDAY_END = config('APPOINTMENT_WORKDAY_END', default=18, cast=int)  # hora
+APPOINTMENT_SLOT_STEP = config('APPOINTMENT_SLOT_STEP', default=30, cast=int)  # minutos
+APPOINTMENT_WORKING_WEEKDAYS = (0, 1, 2, 3, 4)  # lunes a viernes
+APPOINTMENT_MAX_RANGE_DAYS = 60
+# Búsqueda de próximos horarios entre profesionales (appointments.slots.next_available_slots):
+# máximo de días de citas cargados por consulta y de resultados por petición
+APPOINTMENT_NEXT_AVAILABLE_WINDOW_DAYS = 7
+APPOINTMENT_NEXT_AVAILABLE_MAX_LIMIT = 50
+
+# ==================== RECORDATORIOS Y EVENTOS (n8n) ====================
+
+# Backend de entrega: WebhookReminderBackend (n8n), LogReminderBackend o LocMemReminderBackend
+REMINDER_BACKEND = config('REMINDER_BACKEND', default='appointments.reminders.WebhookReminderBackend')
+N8N_REMINDER_WEBHOOK_URL = config('N8N_REMINDER_WEBHOOK_URL', default='http://n8n:5678/webhook/appointment-reminders')
+REMINDER_LEAD_MINUTES = config('REMINDER_LEAD_MINUTES', default=24 * 60, cast=int)
+
+# Destinos del outbox de eventos de citas (webhooks.delivery)
+WEBHOOK_DESTINATIONS = {
+    'n8n': {
+        'url': config('N8N_EVENTS_WEBHOOK_URL', default='http://n8n:5678/webhook/appointment-events'),
+        'events': ['created', 'confirmed', 'cancelled'],
+    },
+}
+WEBHOOK_MAX_ATTEMPTS = 8
+WEBHOOK_RETRY_BASE_SECONDS = 5
+WEBHOOK_RETRY_MAX_SECONDS = 3600
+
+# ==================== SINCRONIZACIÓN Y EVENTOS EN VIVO ====================
+
+# GET /api/sync/?since=<marca>: filas cambiadas desde la marca de agua (sync.changes)
+SYNC_MAX_CHANGES = 500  # filas por tipo y petición
+SYNC_WATERMARK_LAG_SECONDS = 5  # margen para transacciones que aún no confirman
+SYNC_TOMBSTONE_DAYS = 30  # retención de borrados; marcas más viejas reciben una copia completa
+
+# Eventos en vivo por SSE/WebSocket en /api/push/ (solo con SERVER_MODE=asgi, ver sync.push).
+# Con varios workers se comparten por el broker local (run_push_broker); gunicorn.conf.py
+# lo arranca y completa la dirección en modo asgi. Vacío = solo dentro del proceso.
+PUSH_BROKER_ADDRESS = config('PUSH_BROKER_ADDRESS', default='')
+PUSH_QUEUE_SIZE = 100  # mensajes pendientes por conexión antes de pedirle un resync
+PUSH_HEARTBEAT_SECONDS = 15
+
+# ==================== LECTURAS ASYNC ====================
+
+# Listado/detalle de citas, directorio, perfil y estadísticas de reseñas con vistas
+# async y el ORM async (healthcare_system.async_views). Solo conviene bajo ASGI: con
+# WSGI cada vista async necesita su propio event loop.
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=SERVER_MODE == 'asgi', cast=bool)
+
 # ==================== SIMPLE JWT CONFIG ====================
 
 SIMPLE_JWT = {
@@ -166,8 +264,36 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Caché de usuarios de la autenticación JWT: LRU local por proceso (TTL corto,
+# no se invalida entre procesos) y caché compartida (se invalida al guardar)
+JWT_USER_CACHE_SIZE = 1024
+JWT_USER_CACHE_LOCAL_SECONDS = 5
+JWT_USER_CACHE_SECONDS = 60
+
 # ==================== CORS MANUAL (quitamos corsheaders) ====================
-# No necesitamos configuración aquí, nuestro middleware lo maneja
+# Lo aplica healthcare_system.middleware.CorsMiddleware
+
+# Orígenes permitidos separados por comas ('*' acepta cualquiera)
+CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:3000,http://127.0.0.1:3000', cast=Csv())
+CORS_ALLOW_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS']
+CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization', 'X-Requested-With']
+CORS_EXPOSE_HEADERS = ['Content-Type', 'Authorization']
+# Segundos que el navegador reutiliza un preflight (Chrome limita a 7200)
+CORS_PREFLIGHT_MAX_AGE = config('CORS_PREFLIGHT_MAX_AGE', default=86400, cast=int)
+
+# ==================== MÉTRICAS ====================
+# healthcare_system.metrics; expuestas en /internal/metrics/ (formato Prometheus)
+
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+# IPs que pueden leer /internal/metrics/ y /internal/metrics/slow/
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=Csv())
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Fracción de peticiones que guardan su SQL (0 desactiva el muestreo)
+METRICS_SQL_SAMPLE_RATE = config('METRICS_SQL_SAMPLE_RATE', default=0.0, cast=float)
+# Umbral para conservar la traza SQL de una petición muestreada
+METRICS_SLOW_REQUEST_MS = config('METRICS_SLOW_REQUEST_MS', default=500, cast=int)
+METRICS_SLOW_TRACES = 50
+METRICS_SLOW_TRACE_QUERIES = 100
 
 # Configuración de CSRF para desarrollo
 CSRF_TRUSTED_ORIGINS = [
@@ -0,0 +1,66 @@
+"""
+Utilidades compartidas por los tests de las apps.
+"""
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+
+class QueryBudgetMixin:
+    """
+    Aserciones de presupuesto de consultas SQL para ``TestCase``.
+
+    ``assertQueryBudget`` limita las consultas de una llamada y
+    ``assertConstantQueries`` verifica además que el número de consultas no
+    crezca al aumentar la cantidad de resultados (detecta N+1).
+    """
+
+    def count_queries(self, func, *args, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            result = func(*args, **kwargs)
+        return result, context.captured_queries
+
+    def assertQueryBudget(self, budget, func, *args, **kwargs):
+        result, queries = self.count_queries(func, *args, **kwargs)
+        self.assertLessEqual(
+            len(queries), budget,
+            f"{len(queries)} consultas exceden el presupuesto de {budget}:\n"
+            + "\n".join(query['sql'] for query in queries)
+        )
+        return result
+
+    def assertConstantQueries(self, func, grow, budget=None):
+        """
+        Ejecuta ``func``, llama a ``grow()`` para agregar más datos y vuelve a
+        ejecutar ``func``; ambas ejecuciones deben usar las mismas consultas.
+        """
+        _, before = self.count_queries(func)
+        grow()
+        result, after = self.count_queries(func)
+        self.assertEqual(
+            len(before), len(after),
+            f"Las consultas crecen con el resultado ({len(before)} -> {len(after)}):\n"
+            + "\n".join(query['sql'] for query in after)
+        )
+        if budget is not None:
+            self.assertLessEqual(len(after), budget)
+        return result
+
+
+class AsyncParityMixin:
+    """
+    Compara una vista de ``healthcare_system.async_views`` con su vista
+    síncrona: la misma petición debe dar el mismo estado, headers y cuerpo.
+    """
+
+    def assertSameResponse(self, sync_view, async_view, path, data=None, token=None, **kwargs):
+        factory = APIRequestFactory()
+        extra = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        expected = sync_view(factory.get(path, data, **extra), **kwargs)
+        expected.render()
+        actual = async_to_sync(async_view)(factory.get(path, data, **extra), **kwargs)
+        self.assertEqual(actual.status_code, expected.status_code, actual.content)
+        self.assertEqual(dict(actual.items()), dict(expected.items()))
+        self.assertEqual(actual.content, expected.content)
+        return actual
@@ -0,0 +1,206 @@
+import datetime
+import decimal
+import io
+import logging
+
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from healthcare_system.access_log import RedactTokenFilter, redact_token
+from healthcare_system.metrics import MetricsMiddleware, MetricsRegistry, registry, render_prometheus, slow_traces
+from healthcare_system.middleware import CorsMiddleware
+from healthcare_system.parsers import ORJSONParser
+from healthcare_system.renderers import ORJSONRenderer
+from healthcare_system.testing import QueryBudgetMixin
+from users.models import User
+
+
+@override_settings(CORS_ALLOWED_ORIGINS=['http://localhost:3000'], CORS_PREFLIGHT_MAX_AGE=600)
+class CorsMiddlewareTests(QueryBudgetMixin, TestCase):
+    def preflight(self, origin='http://localhost:3000'):
+        return self.client.options(
+            reverse('appointments-list'),
+            HTTP_ORIGIN=origin,
+            HTTP_ACCESS_CONTROL_REQUEST_METHOD='POST',
+            HTTP_ACCESS_CONTROL_REQUEST_HEADERS='authorization, content-type',
+        )
+
+    def test_preflight_is_answered_without_the_view(self):
+        response = self.assertQueryBudget(0, self.preflight)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Access-Control-Allow-Origin'], 'http://localhost:3000')
+        self.assertEqual(response['Access-Control-Max-Age'], '600')
+        self.assertIn('Authorization', response['Access-Control-Allow-Headers'])
+        self.assertIn('Origin', response['Vary'])
+        # No pasó por la autenticación ni por las sesiones
+        self.assertNotIn('WWW-Authenticate', response)
+        self.assertFalse(response.cookies)
+
+    def test_unknown_origin_gets_no_cors_headers(self):
+        response = self.preflight(origin='http://evil.example.com')
+        self.assertNotIn('Access-Control-Allow-Origin', response)
+        response = self.client.get(reverse('appointments-list'), HTTP_ORIGIN='http://evil.example.com')
+        self.assertNotIn('Access-Control-Allow-Origin', response)
+
+    def test_simple_request_gets_cors_headers(self):
+        response = self.client.get(reverse('appointments-list'), HTTP_ORIGIN='http://localhost:3000')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['Access-Control-Allow-Origin'], 'http://localhost:3000')
+        self.assertEqual(response['Access-Control-Allow-Credentials'], 'true')
+        self.assertNotIn('Access-Control-Max-Age', response)
+
+    @override_settings(CORS_ALLOWED_ORIGINS=['*'])
+    def test_wildcard_allows_any_origin_without_credentials(self):
+        response = self.preflight(origin='http://app.example.com')
+        self.assertEqual(response['Access-Control-Allow-Origin'], '*')
+        self.assertNotIn('Access-Control-Allow-Credentials', response)
+        response = self.client.get(reverse('appointments-list'), HTTP_ORIGIN='http://app.example.com')
+        self.assertEqual(response['Access-Control-Allow-Origin'], '*')
+        self.assertNotIn('Access-Control-Allow-Credentials', response)
+
+
+class ORJSONTests(SimpleTestCase):
+    def test_output_matches_drf_renderer(self):
+        data = {
+            'moment': datetime.datetime(2024, 3, 1, 9, 30, 15, 120000, tzinfo=datetime.timezone.utc),
+            'naive': datetime.datetime(2024, 3, 1, 9, 30),
+            'day': datetime.date(2024, 3, 1),
+            'hour': datetime.time(9, 30),
+            'price': decimal.Decimal('1500.50'),
+            'duration': datetime.timedelta(minutes=30),
+            'label': gettext_lazy('Cita'),
+            'text': 'Atención médica ✓',
+            'items': ({'id': 1}, None, True),
+        }
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(ORJSONRenderer().render(data))),
+                         JSONParser().parse(io.BytesIO(JSONRenderer().render(data))))
+        self.assertEqual(ORJSONRenderer().render(data['moment']), b'"2024-03-01T09:30:15.120000Z"')
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_indent_from_accept_header(self):
+        rendered = ORJSONRenderer().render({'a': 1}, 'application/json; indent=4')
+        self.assertIn(b'\n', rendered)
+
+    def test_invalid_json_raises_parse_error(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"rating": '))
+
+
+class ORJSONApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(
+            email='json@example.com', password=None, first_name='Json', last_name='Paciente', user_type='patient'
+        ))
+
+    def test_api_uses_orjson(self):
+        response = self.client.get(reverse('appointments-list'), {'paginate': 'false'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.json(), [])
+
+    def test_malformed_body_is_400(self):
+        response = self.client.post(
+            reverse('appointments-list'), data='{"notes": ', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        slow_traces.clear()
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user(
+            email='metrics@example.com', password=None, first_name='Metrics', last_name='Paciente', user_type='patient'
+        ))
+
+    def test_requests_are_recorded_by_route(self):
+        self.api.get(reverse('appointments-list'), {'paginate': 'false'})
+        self.api.get(reverse('reviews-professional-stats', args=[12345]))
+        self.api.get('/api/no-existe/')
+
+        snapshot = registry.snapshot()
+        stats = snapshot[('GET', '/api/appointments/', 200)]
+        self.assertEqual(sum(stats.buckets), 1)
+        self.assertGreater(stats.queries, 0)
+        self.assertGreater(stats.response_bytes, 0)
+        routes = {route for _, route, _ in snapshot}
+        self.assertIn('/api/reviews/professional/<professional_id>/stats/', routes)
+        self.assertIn('<unmatched>', routes)
+
+    def test_prometheus_endpoint(self):
+        self.api.get(reverse('appointments-list'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn(
+            'http_request_duration_seconds_count{method="GET",route="/api/appointments/",status="200"} 1', body
+        )
+        self.assertIn('http_request_db_queries_total{method="GET",route="/api/appointments/",status="200"}', body)
+
+    def test_endpoint_is_internal(self):
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.7')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_SQL_SAMPLE_RATE=1.0, METRICS_SLOW_REQUEST_MS=0)
+    def test_slow_requests_keep_sql_trace(self):
+        with self.assertLogs('healthcare_system.metrics', 'WARNING'):
+            self.api.get(reverse('appointments-list'))
+            trace = self.client.get(reverse('metrics-slow')).json()['traces'][0]
+        self.assertEqual(trace['route'], '/api/appointments/')
+        self.assertEqual(len(trace['sql']), trace['queries'])
+        self.assertIn('SELECT', trace['sql'][0]['sql'])
+
+    @override_settings(CORS_ALLOWED_ORIGINS=['http://localhost:3000'])
+    async def test_async_chain_counts_queries_of_the_orm_thread(self):
+        async def view(request):
+            return HttpResponse(str(await User.objects.acount()))
+
+        handler = CorsMiddleware(MetricsMiddleware(view))
+        response = await handler(AsyncRequestFactory().get('/api/x/', headers={'Origin': 'http://localhost:3000'}))
+        self.assertEqual(response.content, b'1')
+        self.assertEqual(response['Access-Control-Allow-Origin'], 'http://localhost:3000')
+        # La consulta corrió en el hilo de sync_to_async, con otra conexión
+        self.assertEqual(registry.snapshot()[('GET', '<unmatched>', 200)].queries, 1)
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = MetricsRegistry(buckets=(0.1, 1.0))
+        for duration in (0.05, 0.5, 0.5, 3.0):
+            metrics.observe('GET', '/x/', 200, duration)
+        body = render_prometheus(metrics)
+        self.assertIn('le="0.1"} 1', body)
+        self.assertIn('le="1.0"} 3', body)
+        self.assertIn('le="+Inf"} 4', body)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="/x/",status="200"} 4', body)
+
+
+class AccessLogTests(SimpleTestCase):
+    def record(self, msg, args):
+        return logging.LogRecord('access', logging.INFO, __file__, 1, msg, args, None)
+
+    def test_redacts_token_only(self):
+        self.assertEqual(
+            redact_token('GET /api/push/?since=5&token=eyJ.abc.def HTTP/1.1'),
+            'GET /api/push/?since=5&token=[redacted] HTTP/1.1',
+        )
+        self.assertEqual(redact_token('GET /api/appointments/?page_size=10'), 'GET /api/appointments/?page_size=10')
+
+    def test_filters_gunicorn_and_uvicorn_records(self):
+        # gunicorn registra con un dict de átomos y uvicorn con una tupla
+        atoms = {'h': '10.0.0.1', 'r': 'GET /api/push/?token=secreto HTTP/1.1', 's': '200'}
+        gunicorn = self.record('%(h)s "%(r)s" %(s)s', (atoms,))
+        uvicorn = self.record('%s - "%s %s HTTP/%s" %d', ('10.0.0.1:5000', 'GET', '/api/push/?token=secreto', '1.1', 200))
+        for record in (gunicorn, uvicorn):
+            self.assertTrue(RedactTokenFilter().filter(record))
+            self.assertNotIn('secreto', record.getMessage())
+            self.assertIn('token=[redacted]', record.getMessage())
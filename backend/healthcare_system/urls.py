@@ -3,6 +3,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .views import metrics_view, slow_requests_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     
@@ -10,6 +12,11 @@ urlpatterns = [
     path('api/', include('users.urls')),
     path('api/appointments/', include('appointments.urls')),
     path('api/reviews/', include('reviews.urls')),
+    path('api/sync/', include('sync.urls')),
+    
+    # Observabilidad interna (restringido por IP, ver METRICS_ALLOWED_IPS)
+    path('internal/metrics/', metrics_view, name='metrics'),
+    path('internal/metrics/slow/', slow_requests_view, name='metrics-slow'),
     
     # Para pruebas directas
     path('api-auth/', include('rest_framework.urls')),
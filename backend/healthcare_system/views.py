@@ -0,0 +1,27 @@
+"""
+Endpoints internos de observabilidad (sin autenticación DRF, solo por IP).
+"""
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+
+from .metrics import render_prometheus, slow_traces
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _check_internal(request):
+    # 404 en vez de 403 para no revelar el endpoint
+    if request.META.get('REMOTE_ADDR') not in getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1']):
+        raise Http404
+
+
+def metrics_view(request):
+    """Métricas de este proceso en formato de texto de Prometheus"""
+    _check_internal(request)
+    return HttpResponse(render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def slow_requests_view(request):
+    """Últimas trazas SQL de peticiones lentas muestreadas (más reciente primero)"""
+    _check_internal(request)
+    return JsonResponse({'traces': list(reversed(slow_traces))})
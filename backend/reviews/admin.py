@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Review
+from .models import ProfessionalRatingSummary, Review
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
@@ -28,4 +28,16 @@ class ReviewAdmin(admin.ModelAdmin):
     appointment_date.short_description = 'Fecha Cita'
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('patient', 'professional', 'appointment')
\ No newline at end of file
+        return super().get_queryset(request).select_related('patient', 'professional', 'appointment')
+
+@admin.register(ProfessionalRatingSummary)
+class ProfessionalRatingSummaryAdmin(admin.ModelAdmin):
+    list_display = ['professional', 'average_rating', 'total_reviews', 'five_stars', 'four_stars', 'three_stars', 'two_stars', 'one_star', 'updated_at']
+    list_select_related = ['professional']
+    
+    # Se mantiene desde las reseñas; usar rebuild_rating_summaries para corregirlo
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.ratings import check_summaries, rebuild_summaries
+
+
+class Command(BaseCommand):
+    """Recalcula o verifica el resumen de calificaciones por profesional"""
+    help = 'Reconstruye los resúmenes de calificaciones desde las reseñas verificadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Solo comparar con el agregado en vivo; falla si hay diferencias'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = check_summaries()
+            for professional_id, expected, stored in mismatches:
+                self.stdout.write(f'❌ Profesional {professional_id}: esperado {expected}, guardado {stored}')
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} resúmenes inconsistentes')
+            self.stdout.write(self.style.SUCCESS('✅ Resúmenes consistentes'))
+            return
+
+        count = rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(f'✅ {count} resúmenes reconstruidos'))
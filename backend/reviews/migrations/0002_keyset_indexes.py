@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['patient', '-created_at', '-id'], name='review_patient_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['professional', '-created_at', '-id'], name='review_prof_keyset_idx'),
+        ),
+    ]
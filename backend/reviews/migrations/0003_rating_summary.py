@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+STAR_FIELDS = {5: 'five_stars', 4: 'four_stars', 3: 'three_stars', 2: 'two_stars', 1: 'one_star'}
+
+
+def backfill_summaries(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    ProfessionalRatingSummary = apps.get_model('reviews', 'ProfessionalRatingSummary')
+    rows = (
+        Review.objects.filter(is_verified=True)
+        .values('professional_id')
+        .annotate(
+            total_reviews=models.Count('id'),
+            rating_sum=models.Sum('rating'),
+            **{field: models.Count('id', filter=models.Q(rating=rating)) for rating, field in STAR_FIELDS.items()}
+        )
+        .order_by()
+    )
+    ProfessionalRatingSummary.objects.bulk_create(
+        [ProfessionalRatingSummary(**row) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('reviews', '0002_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfessionalRatingSummary',
+            fields=[
+                ('professional', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_reviews', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('five_stars', models.PositiveIntegerField(default=0)),
+                ('four_stars', models.PositiveIntegerField(default=0)),
+                ('three_stars', models.PositiveIntegerField(default=0)),
+                ('two_stars', models.PositiveIntegerField(default=0)),
+                ('one_star', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Resumen de calificaciones',
+                'verbose_name_plural': 'Resúmenes de calificaciones',
+                'db_table': 'review_rating_summaries',
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings
 
@@ -47,6 +47,13 @@ class Review(models.Model):
         verbose_name = 'Reseña'
         verbose_name_plural = 'Reseñas'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['patient', '-created_at', '-id'], name='review_patient_keyset_idx'),
+            models.Index(fields=['professional', '-created_at', '-id'], name='review_prof_keyset_idx'),
+            # Cambios desde una marca de agua (sync, GET /api/sync/)
+            models.Index(fields=['patient', 'updated_at', 'id'], name='review_patient_sync_idx'),
+            models.Index(fields=['professional', 'updated_at', 'id'], name='review_prof_sync_idx'),
+        ]
     
     def __str__(self):
         return f"Reseña de {self.patient.get_full_name()} para {self.professional.get_full_name()} - {self.rating}★"
@@ -55,13 +62,82 @@ class Review(models.Model):
         from django.core.exceptions import ValidationError
         
         # Verificar que el paciente tuvo la cita con el profesional
-        if self.appointment.patient != self.patient:
+        # Comparar por id evita cargar paciente y profesional de la cita
+        if self.appointment.patient_id != self.patient_id:
             raise ValidationError("Solo el paciente de la cita puede dejar reseña")
-        if self.appointment.professional != self.professional:
+        if self.appointment.professional_id != self.professional_id:
             raise ValidationError("La reseña debe ser para el profesional de la cita")
         
         # Verificar que la cita está completada (Finalizada)
         if self.appointment.status != 'completed':
             raise ValidationError("Solo se pueden dejar reseñas para citas finalizadas")
             
-        super().save(*args, **kwargs)
\ No newline at end of file
+        # Atómico junto con la actualización del resumen de calificaciones
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+        self._counted = self.rating_contribution()
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counted = instance.rating_contribution()
+        return instance
+    
+    def rating_contribution(self):
+        """(profesional, calificación) que aporta al resumen, o None si no está verificada"""
+        fields = self.__dict__
+        if not all(name in fields for name in ('is_verified', 'rating', 'professional_id')):
+            return None
+        if not self.is_verified:
+            return None
+        return (self.professional_id, self.rating)
+    
+    @property
+    def counted_contribution(self):
+        """Aporte al resumen según el último estado guardado (None si es nueva)"""
+        return getattr(self, '_counted', None)
+
+
+class ProfessionalRatingSummary(models.Model):
+    """
+    Resumen de calificaciones verificadas por profesional, mantenido de forma
+    incremental por ``reviews.signals`` (ver ``reviews.ratings``).
+    """
+    
+    # Calificación -> columna del contador
+    STAR_FIELDS = {
+        5: 'five_stars',
+        4: 'four_stars',
+        3: 'three_stars',
+        2: 'two_stars',
+        1: 'one_star',
+    }
+    
+    professional = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rating_summary'
+    )
+    total_reviews = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    five_stars = models.PositiveIntegerField(default=0)
+    four_stars = models.PositiveIntegerField(default=0)
+    three_stars = models.PositiveIntegerField(default=0)
+    two_stars = models.PositiveIntegerField(default=0)
+    one_star = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'review_rating_summaries'
+        verbose_name = 'Resumen de calificaciones'
+        verbose_name_plural = 'Resúmenes de calificaciones'
+    
+    def __str__(self):
+        return f"Calificaciones del profesional {self.professional_id}: {self.average_rating}★ ({self.total_reviews})"
+    
+    @property
+    def average_rating(self):
+        if not self.total_reviews:
+            return 0
+        return round(self.rating_sum / self.total_reviews, 1)
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Mantenimiento del resumen de calificaciones por profesional.
+
+``apply_delta`` suma o resta una reseña verificada con un único ``UPDATE``
+sobre contadores (``F()``), así que las escrituras concurrentes no pierden
+incrementos. ``rebuild_summaries`` recalcula todo desde ``Review`` y
+``check_summaries`` compara el resumen con el agregado en vivo.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import ProfessionalRatingSummary, Review
+
+STAR_FIELDS = ProfessionalRatingSummary.STAR_FIELDS
+SUMMARY_FIELDS = ('total_reviews', 'rating_sum', *STAR_FIELDS.values())
+
+
+def apply_delta(professional_id, rating, delta):
+    """Suma (``delta=1``) o resta (``delta=-1``) una reseña al resumen del profesional"""
+    changes = {
+        'total_reviews': F('total_reviews') + delta,
+        'rating_sum': F('rating_sum') + delta * rating,
+        STAR_FIELDS[rating]: F(STAR_FIELDS[rating]) + delta,
+    }
+    summaries = ProfessionalRatingSummary.objects.filter(professional_id=professional_id)
+    if summaries.update(**changes) or delta < 0:
+        return
+    # Primera reseña del profesional: crear la fila (tolerando otra creación concurrente)
+    ProfessionalRatingSummary.objects.bulk_create(
+        [ProfessionalRatingSummary(professional_id=professional_id)], ignore_conflicts=True
+    )
+    summaries.update(**changes)
+
+
+def sync_review(review, deleted=False):
+    """Aplica al resumen la diferencia entre el aporte guardado y el actual de la reseña"""
+    before = review.counted_contribution
+    after = None if deleted else review.rating_contribution()
+    if before == after:
+        return
+    if before is not None:
+        apply_delta(*before, delta=-1)
+    if after is not None:
+        apply_delta(*after, delta=1)
+
+
+def live_summaries():
+    """Agregado en vivo ``{professional_id: {campo: valor}}`` de las reseñas verificadas"""
+    rows = (
+        Review.objects.filter(is_verified=True)
+        .values('professional_id')
+        .annotate(
+            total_reviews=Count('id'),
+            rating_sum=Sum('rating'),
+            **{field: Count('id', filter=Q(rating=rating)) for rating, field in STAR_FIELDS.items()}
+        )
+        .order_by()
+    )
+    return {row.pop('professional_id'): row for row in rows}
+
+
+def rebuild_summaries():
+    """Reemplaza todos los resúmenes por el agregado en vivo. Devuelve cuántos se crearon"""
+    summaries = [
+        ProfessionalRatingSummary(professional_id=professional_id, **values)
+        for professional_id, values in live_summaries().items()
+    ]
+    with transaction.atomic():
+        ProfessionalRatingSummary.objects.all().delete()
+        ProfessionalRatingSummary.objects.bulk_create(summaries, batch_size=1000)
+    return len(summaries)
+
+
+def check_summaries():
+    """
+    Compara el resumen con el agregado en vivo. Devuelve una lista de
+    ``(professional_id, esperado, guardado)`` con las diferencias; los
+    resúmenes en cero equivalen a no tener fila.
+    """
+    empty = dict.fromkeys(SUMMARY_FIELDS, 0)
+    expected = live_summaries()
+    stored = {
+        row.pop('professional_id'): row
+        for row in ProfessionalRatingSummary.objects.values('professional_id', *SUMMARY_FIELDS)
+    }
+    mismatches = []
+    for professional_id in sorted(expected.keys() | stored.keys()):
+        live = expected.get(professional_id, empty)
+        saved = stored.get(professional_id, empty)
+        if live != saved:
+            mismatches.append((professional_id, live, saved))
+    return mismatches
@@ -26,12 +26,14 @@ class ReviewCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ['appointment', 'rating', 'comment']
+        # La unicidad se valida en validate_appointment con mensaje propio
+        extra_kwargs = {'appointment': {'validators': []}}
     
     def validate_appointment(self, value):
         request = self.context.get('request')
         
         # Verificar que la cita existe y pertenece al usuario
-        if value.patient != request.user:
+        if value.patient_id != request.user.id:
             raise serializers.ValidationError("No tienes permiso para reseñar esta cita")
         
         # Verificar que la cita está finalizada
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Review
+from .ratings import sync_review
+
+
+@receiver(post_save, sender=Review, dispatch_uid='reviews_rating_summary_save')
+def review_saved(sender, instance, raw=False, **kwargs):
+    """Actualiza el resumen al crear una reseña o cambiar su verificación o calificación"""
+    if raw:
+        return
+    sync_review(instance)
+
+
+@receiver(post_delete, sender=Review, dispatch_uid='reviews_rating_summary_delete')
+def review_deleted(sender, instance, **kwargs):
+    """Resta la reseña del resumen (también en borrados en cascada)"""
+    sync_review(instance, deleted=True)
@@ -0,0 +1,216 @@
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment, Service
+from healthcare_system.testing import AsyncParityMixin, QueryBudgetMixin
+from users.authentication import tokens_for_user
+from users.models import User
+from .models import ProfessionalRatingSummary, Review
+from .ratings import check_summaries
+from .views import ReviewViewSet, professional_stats_async_view
+
+
+class ReviewEndpointQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.service = Service.objects.create(name='Consulta General', duration=30)
+        cls.review = cls.add_reviews(1)[0]
+
+    @classmethod
+    def completed_appointment(cls, patient=None):
+        index = Appointment.objects.count()
+        return Appointment.objects.create(
+            patient=patient or cls.patient, professional=cls.professional, service=cls.service,
+            appointment_date=date(2025, 1, 6) + timedelta(days=index), appointment_time=time(9, 0),
+            status='completed'
+        )
+
+    @classmethod
+    def add_reviews(cls, count):
+        reviews = []
+        for _ in range(count):
+            appointment = cls.completed_appointment()
+            reviews.append(Review.objects.create(
+                patient=cls.patient, professional=cls.professional, appointment=appointment,
+                rating=5, is_verified=True
+            ))
+        return reviews
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.patient)
+
+    def test_list_is_constant(self):
+        url = reverse('reviews-list')
+        self.assertConstantQueries(lambda: self.client.get(url), lambda: self.add_reviews(5), budget=1)
+
+    def test_my_reviews_is_constant(self):
+        url = reverse('reviews-my-reviews')
+        self.assertConstantQueries(lambda: self.client.get(url), lambda: self.add_reviews(5), budget=1)
+
+    def test_professional_reviews_is_constant(self):
+        url = reverse('reviews-professional-reviews', args=[self.professional.id])
+        self.assertConstantQueries(lambda: self.client.get(url), lambda: self.add_reviews(5), budget=1)
+
+    def test_professional_reviews_as_professional_is_constant(self):
+        self.client.force_authenticate(self.professional)
+        url = reverse('reviews-list')
+        self.assertConstantQueries(lambda: self.client.get(url), lambda: self.add_reviews(5), budget=1)
+
+    def test_professional_stats_is_constant(self):
+        url = reverse('reviews-professional-stats', args=[self.professional.id])
+        self.assertConstantQueries(lambda: self.client.get(url), lambda: self.add_reviews(5), budget=1)
+
+    def test_detail_budget(self):
+        url = reverse('reviews-detail', args=[self.review.id])
+        response = self.assertQueryBudget(1, self.client.get, url)
+        self.assertEqual(response.data['professional_name'], self.professional.get_full_name())
+
+    def test_report_review_budget(self):
+        url = reverse('reviews-report-review', args=[self.review.id])
+        response = self.assertQueryBudget(1, self.client.post, url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_budget(self):
+        appointment = self.completed_appointment()
+        response = self.assertQueryBudget(3, self.client.post, reverse('reviews-list'), {
+            'appointment': appointment.id, 'rating': 4, 'comment': 'Muy bien',
+        })
+        self.assertEqual(response.status_code, 201)
+
+
+class RatingSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.service = Service.objects.create(name='Consulta General', duration=30)
+
+    def add_review(self, rating, is_verified=True):
+        index = Appointment.objects.count()
+        appointment = Appointment.objects.create(
+            patient=self.patient, professional=self.professional, service=self.service,
+            appointment_date=date(2025, 1, 6) + timedelta(days=index), appointment_time=time(9, 0),
+            status='completed'
+        )
+        return Review.objects.create(
+            patient=self.patient, professional=self.professional, appointment=appointment,
+            rating=rating, is_verified=is_verified
+        )
+
+    def summary(self):
+        return ProfessionalRatingSummary.objects.get(professional=self.professional)
+
+    def test_verified_reviews_are_counted(self):
+        self.add_review(5)
+        self.add_review(3)
+        self.add_review(1, is_verified=False)
+        summary = self.summary()
+        self.assertEqual((summary.total_reviews, summary.rating_sum), (2, 8))
+        self.assertEqual((summary.five_stars, summary.three_stars, summary.one_star), (1, 1, 0))
+        self.assertEqual(summary.average_rating, 4.0)
+        self.assertEqual(check_summaries(), [])
+
+    def test_verification_rating_and_delete_update_summary(self):
+        review = self.add_review(4, is_verified=False)
+        self.assertFalse(ProfessionalRatingSummary.objects.exists())
+
+        review.is_verified = True
+        review.save()
+        review = Review.objects.get(id=review.id)
+        review.rating = 2
+        review.save()
+        self.assertEqual((self.summary().four_stars, self.summary().two_stars), (0, 1))
+
+        review.is_verified = False
+        review.save()
+        self.assertEqual(self.summary().total_reviews, 0)
+
+        review.is_verified = True
+        review.save()
+        review.appointment.delete()  # Borra la reseña en cascada
+        self.assertEqual((self.summary().total_reviews, self.summary().rating_sum), (0, 0))
+        self.assertEqual(check_summaries(), [])
+
+    def test_admin_list_editable_updates_summary(self):
+        admin_user = User.objects.create_superuser(email='admin@test.com', password='x')
+        review = self.add_review(5, is_verified=False)
+        self.client.force_login(admin_user)
+        response = self.client.post(reverse('admin:reviews_review_changelist'), {
+            'form-TOTAL_FORMS': '1', 'form-INITIAL_FORMS': '1',
+            'form-0-id': review.id, 'form-0-is_verified': 'on', '_save': 'Guardar',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.summary().five_stars, 1)
+
+    def test_stats_read_summary(self):
+        self.add_review(5)
+        self.add_review(4)
+        client = APIClient()
+        client.force_authenticate(self.patient)
+        url = reverse('reviews-professional-stats', args=[self.professional.id])
+        with self.assertNumQueries(1):
+            response = client.get(url)
+        self.assertEqual(response.data['average_rating'], 4.5)
+        self.assertEqual(response.data['total_reviews'], 2)
+        self.assertEqual(response.data['rating_distribution']['5_estrellas'], 50.0)
+
+    def test_rebuild_and_check_command(self):
+        self.add_review(5)
+        self.add_review(2)
+        ProfessionalRatingSummary.objects.update(total_reviews=7)
+        self.assertEqual(len(check_summaries()), 1)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_rating_summaries', '--check', stdout=StringIO())
+
+        call_command('rebuild_rating_summaries', stdout=StringIO())
+        self.assertEqual(check_summaries(), [])
+        self.assertEqual(self.summary().total_reviews, 2)
+
+
+class AsyncStatsViewTests(AsyncParityMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        service = Service.objects.create(name='Consulta General', duration=30)
+        for index, rating in enumerate((5, 4, 4)):
+            appointment = Appointment.objects.create(
+                patient=cls.patient, professional=cls.professional, service=service,
+                appointment_date=date(2025, 1, 6) + timedelta(days=index), appointment_time=time(9, 0),
+                status='completed'
+            )
+            Review.objects.create(
+                patient=cls.patient, professional=cls.professional, appointment=appointment,
+                rating=rating, is_verified=True
+            )
+        cls.token = str(tokens_for_user(cls.patient).access_token)
+
+    def test_stats_match_sync_view(self):
+        sync_view = ReviewViewSet.as_view({'get': 'professional_stats'}, basename='reviews', detail=False)
+        # Con resumen, sin reseñas y sin autenticación
+        for professional_id, token in ((self.professional.pk, self.token), (999999, self.token), (self.professional.pk, None)):
+            with self.subTest(professional_id=professional_id, token=token):
+                path = f'/api/reviews/professional/{professional_id}/stats/'
+                self.assertSameResponse(
+                    sync_view, professional_stats_async_view, path, token=token, professional_id=str(professional_id)
+                )
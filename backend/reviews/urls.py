@@ -1,6 +1,7 @@
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
-from .views import ReviewViewSet
+from .views import ReviewViewSet, professional_stats_async_view
 
 router = DefaultRouter()
 router.register('', ReviewViewSet, basename='reviews')
@@ -9,6 +10,14 @@ urlpatterns = [
     path('', include(router.urls)),
 ]
 
+# Bajo ASGI las estadísticas se leen con la vista async (ver ASYNC_READ_VIEWS);
+# va antes que la ruta del router, que sigue atendiendo el resto
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns.insert(0, re_path(
+        r'^professional/(?P<professional_id>\d+)/stats/$',
+        professional_stats_async_view, name='reviews-professional-stats'
+    ))
+
 # URLs disponibles:
 # GET/POST /api/reviews/ - Listar y crear reseñas
 # GET/PUT/DELETE /api/reviews/{id}/ - Detalle de reseña
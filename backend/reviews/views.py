@@ -2,22 +2,28 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Avg, Count, Q
-from .models import Review
+from healthcare_system.async_views import async_read_view
+from healthcare_system.pagination import KeysetPagination
+from users.authentication import ClaimsJWTAuthentication
+from .models import ProfessionalRatingSummary, Review
 from .serializers import ReviewSerializer, ReviewCreateSerializer, ProfessionalReviewStatsSerializer
 
 class ReviewViewSet(viewsets.ModelViewSet):
+    # Las lecturas solo usan id y user_type del token
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         user = self.request.user
         
         if user.user_type == 'patient':
             # Pacientes ven sus reseñas dadas
-            return Review.objects.filter(patient=user).select_related('professional', 'appointment')
+            return Review.objects.filter(patient_id=user.pk).select_related('patient', 'professional', 'appointment')
         elif user.user_type == 'professional':
             # Profesionales ven reseñas recibidas
-            return Review.objects.filter(professional=user, is_verified=True).select_related('patient', 'appointment')
+            return Review.objects.filter(professional_id=user.pk, is_verified=True).select_related('patient', 'professional', 'appointment')
         else:
             return Review.objects.none()
     
@@ -31,13 +37,19 @@ class ReviewViewSet(viewsets.ModelViewSet):
         appointment = serializer.validated_data['appointment']
         serializer.save(
             patient=self.request.user,
-            professional=appointment.professional
+            professional_id=appointment.professional_id
         )
     
     @action(detail=False, methods=['get'])
     def my_reviews(self, request):
         """Reseñas del usuario actual"""
         reviews = self.get_queryset()
+        
+        page = self.paginate_queryset(reviews)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
         serializer = self.get_serializer(reviews, many=True)
         return Response(serializer.data)
     
@@ -47,7 +59,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
         reviews = Review.objects.filter(
             professional_id=professional_id, 
             is_verified=True
-        ).select_related('patient')
+        ).select_related('patient', 'professional', 'appointment')
         
         page = self.paginate_queryset(reviews)
         if page is not None:
@@ -60,33 +72,28 @@ class ReviewViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='professional/(?P<professional_id>\d+)/stats')
     def professional_stats(self, request, professional_id=None):
         """Estadísticas de reseñas de un profesional"""
-        stats = Review.objects.filter(
-            professional_id=professional_id, 
-            is_verified=True
-        ).aggregate(
-            average_rating=Avg('rating'),
-            total_reviews=Count('id'),
-            five_stars=Count('id', filter=Q(rating=5)),
-            four_stars=Count('id', filter=Q(rating=4)),
-            three_stars=Count('id', filter=Q(rating=3)),
-            two_stars=Count('id', filter=Q(rating=2)),
-            one_star=Count('id', filter=Q(rating=1))
-        )
+        # Una lectura por clave primaria del resumen mantenido en reviews.ratings
+        summary = ProfessionalRatingSummary.objects.filter(professional_id=professional_id).first()
+        return self.stats_response(professional_id, summary)
+    
+    def stats_response(self, professional_id, summary):
+        if summary is None:
+            summary = ProfessionalRatingSummary(professional_id=professional_id)
         
         # Calcular distribución porcentual
-        total = stats['total_reviews'] or 1  # Evitar división por cero
+        total = summary.total_reviews or 1  # Evitar división por cero
         rating_distribution = {
-            '5_estrellas': round((stats['five_stars'] / total) * 100, 1),
-            '4_estrellas': round((stats['four_stars'] / total) * 100, 1),
-            '3_estrellas': round((stats['three_stars'] / total) * 100, 1),
-            '2_estrellas': round((stats['two_stars'] / total) * 100, 1),
-            '1_estrella': round((stats['one_star'] / total) * 100, 1),
+            '5_estrellas': round((summary.five_stars / total) * 100, 1),
+            '4_estrellas': round((summary.four_stars / total) * 100, 1),
+            '3_estrellas': round((summary.three_stars / total) * 100, 1),
+            '2_estrellas': round((summary.two_stars / total) * 100, 1),
+            '1_estrella': round((summary.one_star / total) * 100, 1),
         }
         
         data = {
             'professional_id': professional_id,
-            'average_rating': round(stats['average_rating'] or 0, 1),
-            'total_reviews': stats['total_reviews'],
+            'average_rating': summary.average_rating,
+            'total_reviews': summary.total_reviews,
             'rating_distribution': rating_distribution
         }
         
@@ -101,4 +108,12 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return Response({
             'message': 'Reseña reportada para revisión',
             'review_id': review.id
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_200_OK)
+
+
+# Mismos initkwargs que les pasa el router a la acción
+@async_read_view(ReviewViewSet.as_view({'get': 'professional_stats'}, basename='reviews', detail=False))
+async def professional_stats_async_view(view, request, professional_id):
+    """GET de ``ReviewViewSet.professional_stats`` con el ORM async"""
+    summary = await ProfessionalRatingSummary.objects.filter(professional_id=professional_id).afirst()
+    return view.stats_response(professional_id, summary)
@@ -0,0 +1,132 @@
+"""
+Cambios de citas y reseñas desde una marca de agua (``GET /api/sync/``).
+
+La marca es un instante de ``updated_at``: el cliente envía la última que
+recibió y obtiene las filas creadas o modificadas (las canceladas incluidas,
+son un cambio de estado) con ``since < updated_at <= marca nueva``, más los ids
+borrados desde entonces (``Tombstone``). Cada tipo se lee con una consulta
+sobre los índices (dueño, updated_at, id).
+
+La marca nueva queda ``SYNC_WATERMARK_LAG_SECONDS`` por detrás del reloj, para
+que una transacción que guardó antes pero confirma después caiga en la
+siguiente ventana. Si algún tipo supera ``SYNC_MAX_CHANGES`` filas la
+respuesta se corta (``has_more``) en un instante en el que todos los tipos
+están completos, sin repartir entre dos respuestas filas con el mismo
+``updated_at``.
+
+Sin marca, o con una más vieja que la retención de borrados
+(``SYNC_TOMBSTONE_DAYS``), la respuesta es una copia completa (``reset``):
+el cliente descarta lo que tenía y sigue desde la marca recibida.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from appointments.models import Appointment
+from reviews.models import Review
+from .models import Tombstone
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _owner(user):
+    """Filtro por dueño según el tipo de usuario (None si no ve citas ni reseñas)"""
+    if user.user_type == 'patient':
+        return {'patient_id': user.pk}
+    elif user.user_type == 'professional':
+        return {'professional_id': user.pk}
+    return None
+
+
+def _window(queryset, field, since, until, limit):
+    """
+    Hasta ``limit`` filas con ``since < field <= until`` en orden (field, id)
+    y el instante hasta el que quedaron completas. Si hay más, se descartan
+    las del último instante leído a medias; si todas comparten ese instante
+    se devuelven completas aunque pasen de ``limit``.
+    """
+    queryset = queryset.filter(**{f'{field}__lte': until}).order_by(field, 'id')
+    if since is not None:
+        queryset = queryset.filter(**{f'{field}__gt': since})
+    rows = list(queryset[:limit + 1])
+    if len(rows) <= limit:
+        return rows, until
+
+    boundary = getattr(rows[limit], field)
+    rows = [row for row in rows[:limit] if getattr(row, field) < boundary]
+    if rows:
+        return rows, getattr(rows[-1], field)
+    return list(queryset.filter(**{field: boundary})), boundary
+
+
+def changes_since(user, since=None, now=None, limit=None):
+    """
+    Cambios visibles para ``user`` desde ``since``:
+
+        {'watermark', 'has_more', 'reset', 'appointments': [Appointment],
+         'reviews': [Review], 'deleted': {'appointments': [id], 'reviews': [id]}}
+
+    Para un profesional, las reseñas que dejaron de estar verificadas se
+    informan como borradas (no las ve en ``/api/reviews/``).
+    """
+    now = now or timezone.now()
+    limit = limit or _setting('SYNC_MAX_CHANGES', 500)
+    until = now - timedelta(seconds=_setting('SYNC_WATERMARK_LAG_SECONDS', 5))
+    reset = since is None or since < now - timedelta(days=_setting('SYNC_TOMBSTONE_DAYS', 30))
+    if reset:
+        since = None
+
+    changes = {
+        'watermark': until, 'has_more': False, 'reset': reset,
+        'appointments': [], 'reviews': [], 'deleted': {'appointments': [], 'reviews': []},
+    }
+    owner = _owner(user)
+    if owner is None:
+        return changes
+    if since is not None and since >= until:
+        changes['watermark'] = since
+        return changes
+
+    reviews = Review.objects.filter(**owner).select_related('patient', 'professional', 'appointment')
+    if reset and user.user_type == 'professional':
+        reviews = reviews.filter(is_verified=True)
+    windows = [
+        _window(
+            Appointment.objects.for_user(user).with_related().with_flags(now),
+            'updated_at', since, until, limit,
+        ),
+        _window(reviews, 'updated_at', since, until, limit),
+    ]
+    if not reset:
+        windows.append(_window(Tombstone.objects.filter(**owner), 'deleted_at', since, until, limit))
+
+    # Todos los tipos están completos hasta el menor de los instantes
+    watermark = min(bound for _, bound in windows)
+    changes['watermark'] = watermark
+    changes['has_more'] = watermark < until
+
+    appointments, reviews = windows[0][0], windows[1][0]
+    changes['appointments'] = [row for row in appointments if row.updated_at <= watermark]
+    for review in reviews:
+        if review.updated_at > watermark:
+            continue
+        if user.user_type == 'professional' and not review.is_verified:
+            changes['deleted']['reviews'].append(review.pk)
+        else:
+            changes['reviews'].append(review)
+    if not reset:
+        for tombstone in windows[2][0]:
+            if tombstone.deleted_at <= watermark:
+                changes['deleted'][f'{tombstone.kind}s'].append(tombstone.object_id)
+    return changes
+
+
+def prune_tombstones(now=None):
+    """Borra los registros de borrado más viejos que la retención; devuelve cuántos"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=_setting('SYNC_TOMBSTONE_DAYS', 30))
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
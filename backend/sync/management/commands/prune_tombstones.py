@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from sync.changes import prune_tombstones
+
+
+class Command(BaseCommand):
+    """Depura los registros de borrado vencidos (pensado para un cron diario)"""
+    help = 'Borra los Tombstone más viejos que SYNC_TOMBSTONE_DAYS'
+
+    def handle(self, *args, **options):
+        total = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} registros de borrado depurados'))
@@ -0,0 +1,28 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sync.pubsub import Broker, parse_address
+
+
+class Command(BaseCommand):
+    """Broker local que comparte los eventos de /api/push/ entre los workers ASGI"""
+    help = 'Retransmite los eventos publicados a todos los workers (ver sync.pubsub)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--address', default=settings.PUSH_BROKER_ADDRESS or '127.0.0.1:8765',
+            help='host:puerto donde escuchar (por defecto PUSH_BROKER_ADDRESS)'
+        )
+        parser.add_argument('--max-buffer', type=int, default=1024 * 1024,
+                            help='Bytes pendientes que se toleran por suscriptor')
+
+    def handle(self, *args, **options):
+        host, port = parse_address(options['address'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Broker de eventos en {host}:{port}'))
+        broker = Broker(host, port, max_buffer=options['max_buffer'])
+        try:
+            asyncio.run(broker.serve_forever())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:36
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('appointment', 'Cita'), ('review', 'Reseña')], max_length=20, verbose_name='Tipo')),
+                ('object_id', models.BigIntegerField(verbose_name='Id borrado')),
+                ('patient_id', models.BigIntegerField(verbose_name='Paciente')),
+                ('professional_id', models.BigIntegerField(verbose_name='Profesional')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Borrado')),
+            ],
+            options={
+                'verbose_name': 'Borrado',
+                'verbose_name_plural': 'Borrados',
+                'ordering': ['deleted_at', 'id'],
+                'indexes': [models.Index(fields=['patient_id', 'deleted_at', 'id'], name='tombstone_patient_idx'), models.Index(fields=['professional_id', 'deleted_at', 'id'], name='tombstone_prof_idx')],
+            },
+        ),
+    ]
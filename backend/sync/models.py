@@ -0,0 +1,36 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    Registro de una cita o reseña borrada, para que ``GET /api/sync/`` pueda
+    informar el borrado a los clientes que ya tenían la fila.
+
+    Guarda los ids de paciente y profesional sin clave foránea: el usuario
+    puede haberse borrado junto con la fila. Se depuran con
+    ``prune_tombstones`` pasados ``SYNC_TOMBSTONE_DAYS``.
+    """
+
+    KIND_CHOICES = (
+        ('appointment', 'Cita'),
+        ('review', 'Reseña'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name='Tipo')
+    object_id = models.BigIntegerField(verbose_name='Id borrado')
+    patient_id = models.BigIntegerField(verbose_name='Paciente')
+    professional_id = models.BigIntegerField(verbose_name='Profesional')
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name='Borrado')
+
+    class Meta:
+        verbose_name = 'Borrado'
+        verbose_name_plural = 'Borrados'
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['patient_id', 'deleted_at', 'id'], name='tombstone_patient_idx'),
+            models.Index(fields=['professional_id', 'deleted_at', 'id'], name='tombstone_prof_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} borrado {self.deleted_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,309 @@
+"""
+Publicación de eventos hacia las conexiones abiertas de ``/api/push/``.
+
+``hub`` reparte, dentro del proceso, cada mensaje a las suscripciones de su
+canal (``professional:<id>``, ``patient:<id>``). Cada conexión tiene una cola
+acotada (``PUSH_QUEUE_SIZE``): si el cliente no la vacía a tiempo (su socket
+no acepta más datos) se descartan sus pendientes y recibe un único
+``resync`` para que recargue por HTTP. Un cliente lento nunca frena al que
+publica ni hace crecer la memoria.
+
+Con varios workers, ``publish`` envía el mensaje (desde un hilo de fondo, sin
+bloquear la petición) al ``Broker`` local (``PUSH_BROKER_ADDRESS``, ver
+``run_push_broker``), que lo retransmite a todos los procesos suscritos;
+cada uno lo reparte con su ``hub``. Es un sustituto
+mínimo de un pub/sub externo: solo escucha en la máquina, no persiste nada y
+un mensaje perdido se cubre con el ``resync`` que se envía al reconectar.
+
+Protocolo del broker: la primera línea de la conexión es ``PUB`` o ``SUB`` y
+cada mensaje es una línea ``<canal>\\t<json>``.
+"""
+import asyncio
+import logging
+import queue
+import socket
+import threading
+
+import orjson
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RESYNC = b'{"event":"resync"}'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def parse_address(value):
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+# ==================== HUB EN PROCESO ====================
+
+class Subscription:
+    """Cola acotada de una conexión y los canales que escucha"""
+
+    __slots__ = ('channels', 'queue', 'dropped')
+
+    def __init__(self, channels, size):
+        self.channels = tuple(channels)
+        self.queue = asyncio.Queue(size)
+        self.dropped = 0
+
+    def offer(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Cliente lento: se descartan sus pendientes y el mensaje nuevo y
+            # se le pide recargar
+            while not self.queue.empty():
+                if self.queue.get_nowait() is not RESYNC:
+                    self.dropped += 1
+            self.dropped += 1
+            self.queue.put_nowait(RESYNC)
+
+
+class Hub:
+    """
+    Suscripciones por canal del proceso. Todo se ejecuta en el event loop
+    del servidor ASGI; desde otros hilos se publica con ``publish_threadsafe``.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.loop = None
+        self._channels = {}
+
+    @property
+    def connections(self):
+        return len({subscription for subscriptions in self._channels.values() for subscription in subscriptions})
+
+    def subscribe(self, channels):
+        self.loop = asyncio.get_running_loop()
+        subscription = Subscription(channels, self.queue_size)
+        for channel in subscription.channels:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        for channel in subscription.channels:
+            subscriptions = self._channels.get(channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._channels[channel]
+
+    def dispatch(self, channel, message):
+        for subscription in self._channels.get(channel, ()):
+            subscription.offer(message)
+
+    def dispatch_all(self, message):
+        for subscription in {subscription for subscriptions in self._channels.values() for subscription in subscriptions}:
+            subscription.offer(message)
+
+    def publish_threadsafe(self, channel, message):
+        loop = self.loop
+        if loop is None or not self._channels:
+            return
+        try:
+            loop.call_soon_threadsafe(self.dispatch, channel, message)
+        except RuntimeError:
+            # El loop ya terminó (proceso apagándose)
+            pass
+
+
+hub = Hub(_setting('PUSH_QUEUE_SIZE', 100))
+
+
+# ==================== PUBLICACIÓN ====================
+
+class BrokerPublisher:
+    """
+    Publica en el broker desde un hilo propio. ``send`` solo encola: se llama
+    desde ``transaction.on_commit`` en el hilo de la petición, que nunca
+    espera a la red aunque el broker esté caído. Si la cola se llena (broker
+    caído durante mucho tiempo) los mensajes se descartan; los clientes los
+    recuperan con el ``resync`` al reconectarse el enlace.
+    """
+
+    def __init__(self, max_pending=1000):
+        self._queue = queue.Queue(max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._sock = None
+        self._sock_address = None
+
+    def send(self, address, line):
+        """Encola ``line`` para ``address``; False si se descartó (nunca lanza excepciones)"""
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((address, line))
+        except queue.Full:
+            logger.warning('Cola de publicación al broker %s llena; mensaje descartado', address)
+            return False
+        return True
+
+    def _ensure_thread(self):
+        # Tras un fork el hilo del padre no existe en el hijo: se crea de nuevo
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._sock = None
+                self._thread = threading.Thread(target=self._run, name='push-publisher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            address, line = self._queue.get()
+            self._deliver(address, line)
+
+    def _deliver(self, address, line):
+        if address != self._sock_address and self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        for _ in range(2):
+            sock = self._sock
+            try:
+                if sock is None:
+                    sock = socket.create_connection(parse_address(address), timeout=1)
+                    sock.sendall(b'PUB\n')
+                    self._sock, self._sock_address = sock, address
+                sock.sendall(line)
+                return True
+            except OSError:
+                if sock is not None:
+                    sock.close()
+                self._sock = None
+        logger.warning('No se pudo publicar en el broker %s', address)
+        return False
+
+
+publisher = BrokerPublisher()
+
+
+def publish(channels, data):
+    """
+    Publica ``data`` (serializable a JSON) en ``channels``. Se llama con la
+    transacción ya confirmada (``transaction.on_commit``).
+    """
+    message = orjson.dumps(data)
+    address = _setting('PUSH_BROKER_ADDRESS', '')
+    for channel in channels:
+        if address:
+            publisher.send(address, channel.encode() + b'\t' + message + b'\n')
+        else:
+            hub.publish_threadsafe(channel, message)
+
+
+# ==================== BROKER LOCAL ====================
+
+class BrokerLink:
+    """
+    Conexión ``SUB`` del proceso al broker, dentro del event loop. Reconecta
+    con espera creciente y, como pudo perder mensajes, envía ``resync`` a
+    todas las conexiones al recuperar el enlace.
+    """
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.task = None
+
+    def ensure_started(self, address):
+        loop = asyncio.get_running_loop()
+        if address and (self.task is None or self.task.done() or self.task.get_loop() is not loop):
+            self.task = loop.create_task(self.run(address))
+
+    async def run(self, address):
+        delay = 0.5
+        connected_before = False
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(*parse_address(address))
+            except OSError:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5)
+                continue
+            delay = 0.5
+            try:
+                writer.write(b'SUB\n')
+                await writer.drain()
+                if connected_before:
+                    self.hub.dispatch_all(RESYNC)
+                connected_before = True
+                async for line in reader:
+                    channel, _, message = line.rstrip(b'\n').partition(b'\t')
+                    self.hub.dispatch(channel.decode(), message)
+            except (OSError, ValueError):
+                pass
+            finally:
+                writer.close()
+            logger.warning('Enlace con el broker %s perdido; reconectando', address)
+
+
+link = BrokerLink(hub)
+
+
+class Broker:
+    """
+    Retransmite cada línea publicada a todos los suscriptores. Un suscriptor
+    con más de ``max_buffer`` bytes sin enviar se desconecta (reconectará y
+    sus clientes recibirán ``resync``) en lugar de acumular memoria.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, max_buffer=1024 * 1024):
+        self.host = host
+        self.port = port
+        self.max_buffer = max_buffer
+        self.subscribers = set()
+        self.server = None
+        self._connections = {}
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        return self.server
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Deja de aceptar conexiones y cierra las abiertas esperando a sus handlers"""
+        self.server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await asyncio.gather(*self._connections.values(), return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self._connections[writer] = asyncio.current_task()
+        try:
+            role = await reader.readline()
+            if role == b'SUB\n':
+                self.subscribers.add(writer)
+                # No se espera nada del suscriptor: solo detectar el cierre
+                await reader.read()
+            elif role == b'PUB\n':
+                async for line in reader:
+                    self.relay(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            self._connections.pop(writer, None)
+            writer.close()
+
+    def relay(self, line):
+        for writer in list(self.subscribers):
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                logger.warning('Suscriptor lento del broker desconectado')
+                self.subscribers.discard(writer)
+                writer.close()
+            else:
+                writer.write(line)
@@ -0,0 +1,198 @@
+"""
+Canal de eventos en vivo (``/api/push/``) para el servidor ASGI.
+
+``PushApplication`` envuelve la aplicación ASGI de Django y atiende ella
+misma esa ruta, sin pasar por el stack de Django: Django 4.2 no informa la
+desconexión de un cliente durante una respuesta en streaming ni maneja
+WebSocket, y una conexión que puede durar horas no debe ocupar un hilo.
+
+- ``GET /api/push/`` responde Server-Sent Events (``text/event-stream``).
+- Un WebSocket a la misma ruta recibe los mismos mensajes como texto.
+
+Autenticación con el access token en ``Authorization: Bearer`` o, para
+``EventSource`` y WebSocket del navegador (que no envían headers propios),
+en ``?token=`` (el log de accesos de gunicorn lo oculta, ver
+``healthcare_system.access_log``). Cada usuario escucha su canal: ``professional:<id>`` o
+``patient:<id>``. Los mensajes son JSON con ``event`` (``created``,
+``updated``, ``deleted`` o ``resync``); ante ``resync`` el cliente debe
+recargar por HTTP lo que muestra. La conexión se cierra al vencer el token
+(``exp``): el cliente vuelve a conectarse con uno renovado.
+"""
+import asyncio
+import time
+from urllib.parse import parse_qs
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from users.authentication import ClaimsJWTAuthentication
+from .pubsub import hub, link
+
+PUSH_PATH = '/api/push/'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def user_channels(user):
+    """Canales que escucha el usuario"""
+    if user.user_type in ('patient', 'professional'):
+        return [f'{user.user_type}:{user.id}']
+    return []
+
+
+def _header(scope, name):
+    for key, value in scope.get('headers', ()):
+        if key == name:
+            return value
+    return None
+
+
+def _token(scope):
+    authorization = _header(scope, b'authorization') or b''
+    scheme, _, token = authorization.partition(b' ')
+    if scheme.lower() == b'bearer' and token:
+        return token
+    values = parse_qs(scope.get('query_string', b'').decode()).get('token')
+    return values[0].encode() if values else None
+
+
+def authenticate(token):
+    """``(usuario solo claims, exp)`` del access token, o ``(None, None)`` si no es válido"""
+    backend = ClaimsJWTAuthentication()
+    backend.claims_only = True
+    try:
+        validated_token = backend.get_validated_token(token)
+        return backend.get_user(validated_token), validated_token.get('exp', float('inf'))
+    except (InvalidToken, AuthenticationFailed):
+        return None, None
+
+
+class PushApplication:
+    """Atiende ``PUSH_PATH`` y delega todo lo demás en ``app``"""
+
+    def __init__(self, app):
+        self.app = app
+        self.heartbeat = _setting('PUSH_HEARTBEAT_SECONDS', 15)
+        origins = _setting('CORS_ALLOWED_ORIGINS', ['http://localhost:3000'])
+        self.allow_all_origins = '*' in origins
+        self.allowed_origins = frozenset(origin.rstrip('/').encode() for origin in origins)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == PUSH_PATH and scope['method'] == 'GET':
+            return await self.event_stream(scope, receive, send)
+        if scope['type'] == 'websocket':
+            if scope['path'] == PUSH_PATH:
+                return await self.websocket(scope, receive, send)
+            await receive()
+            return await send({'type': 'websocket.close', 'code': 4404})
+        # Incluye los preflight de CORS, que responde CorsMiddleware
+        return await self.app(scope, receive, send)
+
+    async def user_for(self, scope):
+        """``(usuario, exp)`` de la conexión; ``(None, None)`` sin token válido"""
+        token = _token(scope)
+        if not token:
+            return None, None
+        # Puede tocar la caché o, sin claim user_type, la base de datos
+        return await sync_to_async(authenticate)(token)
+
+    def cors_headers(self, scope):
+        origin = _header(scope, b'origin')
+        if origin is None or not (self.allow_all_origins or origin in self.allowed_origins):
+            return []
+        if self.allow_all_origins:
+            # Igual que CorsMiddleware: comodín literal y sin credenciales
+            return [(b'access-control-allow-origin', b'*')]
+        return [(b'access-control-allow-origin', origin), (b'access-control-allow-credentials', b'true')]
+
+    async def serve(self, subscription, stream, receive, disconnect_type):
+        """Ejecuta ``stream`` hasta que termine o el cliente se desconecte"""
+        async def disconnected():
+            while (await receive())['type'] != disconnect_type:
+                pass
+
+        tasks = [asyncio.ensure_future(stream), asyncio.ensure_future(disconnected())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            hub.unsubscribe(subscription)
+            for task in tasks:
+                task.cancel()
+
+    # ==================== SERVER-SENT EVENTS ====================
+
+    async def event_stream(self, scope, receive, send):
+        user, expires = await self.user_for(scope)
+        channels = user_channels(user) if user is not None else []
+        if not channels:
+            status = 401 if user is None else 403
+            body = orjson.dumps({'detail': 'No autorizado'})
+            await send({'type': 'http.response.start', 'status': status, 'headers': [
+                (b'content-type', b'application/json'), *self.cors_headers(scope),
+            ]})
+            return await send({'type': 'http.response.body', 'body': body})
+
+        subscription = hub.subscribe(channels)
+        link.ensure_started(_setting('PUSH_BROKER_ADDRESS', ''))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            # Sin buffering en nginx/ingress
+            (b'x-accel-buffering', b'no'),
+            *self.cors_headers(scope),
+        ]})
+        await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+        await self.serve(subscription, self.sse_messages(subscription, send, expires), receive, 'http.disconnect')
+
+    async def sse_messages(self, subscription, send, expires):
+        queue = subscription.queue
+        while True:
+            remaining = expires - time.time()
+            if remaining <= 0:
+                # Token vencido: fin del stream (EventSource reconecta y recibe 401)
+                return await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            try:
+                message = await asyncio.wait_for(queue.get(), min(self.heartbeat, remaining))
+            except asyncio.TimeoutError:
+                if time.time() < expires:
+                    # Comentario SSE: mantiene viva la conexión en proxies
+                    await send({'type': 'http.response.body', 'body': b': ping\n\n', 'more_body': True})
+                continue
+            # Lo acumulado mientras se esperaba al socket sale en un solo envío
+            chunks = [b'data: ', message, b'\n\n']
+            while not queue.empty():
+                chunks += [b'data: ', queue.get_nowait(), b'\n\n']
+            # Con el socket lleno ``send`` espera; mientras tanto la cola se llena
+            await send({'type': 'http.response.body', 'body': b''.join(chunks), 'more_body': True})
+
+    # ==================== WEBSOCKET ====================
+
+    async def websocket(self, scope, receive, send):
+        if (await receive())['type'] != 'websocket.connect':
+            return
+        user, expires = await self.user_for(scope)
+        channels = user_channels(user) if user is not None else []
+        if not channels:
+            return await send({'type': 'websocket.close', 'code': 4401 if user is None else 4403})
+
+        subscription = hub.subscribe(channels)
+        link.ensure_started(_setting('PUSH_BROKER_ADDRESS', ''))
+        await send({'type': 'websocket.accept'})
+        await self.serve(
+            subscription, self.websocket_messages(subscription, send, expires), receive, 'websocket.disconnect'
+        )
+
+    async def websocket_messages(self, subscription, send, expires):
+        while True:
+            remaining = expires - time.time()
+            if remaining <= 0:
+                return await send({'type': 'websocket.close', 'code': 4401})
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), min(self.heartbeat, remaining))
+            except asyncio.TimeoutError:
+                continue
+            await send({'type': 'websocket.send', 'text': message.decode()})
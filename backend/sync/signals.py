@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from appointments.models import Appointment
+from reviews.models import Review
+from .models import Tombstone
+from .pubsub import publish
+
+
+def record_tombstone(kind, instance):
+    Tombstone.objects.create(
+        kind=kind, object_id=instance.pk,
+        patient_id=instance.patient_id, professional_id=instance.professional_id,
+    )
+
+
+def appointment_event(instance, event):
+    """Mensaje de ``/api/push/``: lo justo para que la agenda decida si recargar"""
+    return {
+        'event': event,
+        'appointment': {
+            'id': instance.pk,
+            'date': instance.appointment_date.isoformat(),
+            'time': instance.appointment_time.strftime('%H:%M'),
+            'duration': instance.duration,
+            'status': instance.status,
+            'patient': instance.patient_id,
+            'professional': instance.professional_id,
+            'service': instance.service_id,
+        },
+    }
+
+
+def push_appointment(instance, event):
+    """Publica el evento en los canales del paciente y del profesional al confirmar"""
+    data = appointment_event(instance, event)
+    channels = [f'patient:{instance.patient_id}', f'professional:{instance.professional_id}']
+    transaction.on_commit(lambda: publish(channels, data))
+
+
+@receiver(post_save, sender=Appointment, dispatch_uid='sync_appointment_push')
+def appointment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    push_appointment(instance, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=Appointment, dispatch_uid='sync_appointment_tombstone')
+def appointment_deleted(sender, instance, **kwargs):
+    """Deja constancia del borrado (también en borrados en cascada)"""
+    record_tombstone('appointment', instance)
+    push_appointment(instance, 'deleted')
+
+
+@receiver(post_delete, sender=Review, dispatch_uid='sync_review_tombstone')
+def review_deleted(sender, instance, **kwargs):
+    record_tombstone('review', instance)
@@ -0,0 +1,327 @@
+import asyncio
+import threading
+import time as time_module
+from datetime import date, time, timedelta
+from unittest import mock
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment, Service
+from healthcare_system.testing import QueryBudgetMixin
+from reviews.models import Review
+from users.authentication import tokens_for_user
+from users.models import User
+from .changes import changes_since, prune_tombstones
+from .models import Tombstone
+from .pubsub import RESYNC, Broker, BrokerLink, Hub, Subscription, hub, publish
+from .push import PUSH_PATH, PushApplication
+
+
+@override_settings(SYNC_WATERMARK_LAG_SECONDS=0, SYNC_TOMBSTONE_DAYS=30)
+class ChangesTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.other = User.objects.create_user(
+            email='otro@test.com', password='x', first_name='Luis', last_name='Díaz', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.general = Service.objects.create(name='Consulta General', duration=30)
+        cls.past = date.today() - timedelta(days=10)
+        cls.appointments = [
+            Appointment.objects.create(
+                patient=patient, professional=cls.professional, service=cls.general,
+                appointment_date=cls.past, appointment_time=start, status='completed'
+            )
+            for patient, start in ((cls.patient, time(9, 0)), (cls.patient, time(10, 0)), (cls.other, time(11, 0)))
+        ]
+        cls.review = Review.objects.create(
+            patient=cls.patient, professional=cls.professional, appointment=cls.appointments[0],
+            rating=5, is_verified=True
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.patient)
+        self.url = reverse('sync-changes')
+
+    def sync(self, since=None):
+        response = self.client.get(self.url, {'since': since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_sync_is_full_snapshot(self):
+        response = self.assertQueryBudget(2, self.client.get, self.url)
+        data = response.json()
+        self.assertTrue(data['reset'])
+        self.assertFalse(data['has_more'])
+        self.assertEqual(
+            sorted(row['id'] for row in data['appointments']),
+            [self.appointments[0].pk, self.appointments[1].pk]
+        )
+        self.assertEqual([row['id'] for row in data['reviews']], [self.review.pk])
+        self.assertEqual(data['appointments'][0]['patient_name'], 'Ana López')
+
+    def test_delta_returns_only_changes_and_deletions(self):
+        watermark = self.sync()['watermark']
+        data = self.assertQueryBudget(3, self.client.get, self.url, {'since': watermark}).json()
+        self.assertFalse(data['reset'])
+        self.assertEqual((data['appointments'], data['reviews']), ([], []))
+        self.assertEqual(data['deleted'], {'appointments': [], 'reviews': []})
+
+        cancelled = self.appointments[1]
+        cancelled.status = 'cancelled'
+        cancelled.save()
+        # Borrar la cita borra su reseña en cascada: ambas quedan registradas
+        deleted_id = self.appointments[0].pk
+        Appointment.objects.get(pk=deleted_id).delete()
+
+        data = self.sync(data['watermark'])
+        self.assertEqual([(row['id'], row['status']) for row in data['appointments']], [(cancelled.pk, 'cancelled')])
+        self.assertEqual(data['reviews'], [])
+        self.assertEqual(data['deleted'], {'appointments': [deleted_id], 'reviews': [self.review.pk]})
+
+        data = self.sync(data['watermark'])
+        self.assertEqual((data['appointments'], data['deleted']['appointments']), ([], []))
+
+    def test_professional_sees_unverified_reviews_as_deleted(self):
+        self.client.force_authenticate(self.professional)
+        data = self.sync()
+        self.assertEqual(len(data['appointments']), 3)
+        self.assertEqual([row['id'] for row in data['reviews']], [self.review.pk])
+
+        self.review.is_verified = False
+        self.review.save()
+        data = self.sync(data['watermark'])
+        self.assertEqual(data['reviews'], [])
+        self.assertEqual(data['deleted']['reviews'], [self.review.pk])
+
+        self.assertEqual(self.sync()['reviews'], [])
+
+    def test_pages_do_not_split_rows_with_same_timestamp(self):
+        base = timezone.now() - timedelta(minutes=5)
+        for appointment, offset in zip(self.appointments, (1, 2, 2)):
+            Appointment.objects.filter(pk=appointment.pk).update(updated_at=base + timedelta(seconds=offset))
+        Review.objects.filter(pk=self.review.pk).update(updated_at=base + timedelta(seconds=3))
+
+        first = changes_since(self.professional, base, limit=1)
+        self.assertTrue(first['has_more'])
+        self.assertEqual(first['watermark'], base + timedelta(seconds=1))
+        self.assertEqual([row.pk for row in first['appointments']], [self.appointments[0].pk])
+        # La reseña es posterior a la marca: va en la página siguiente
+        self.assertEqual(first['reviews'], [])
+
+        second = changes_since(self.professional, first['watermark'], limit=1)
+        self.assertEqual(
+            [row.pk for row in second['appointments']], [self.appointments[1].pk, self.appointments[2].pk]
+        )
+        self.assertTrue(second['has_more'])
+
+        third = changes_since(self.professional, second['watermark'], limit=1)
+        self.assertEqual([row.pk for row in third['reviews']], [self.review.pk])
+        self.assertFalse(third['has_more'])
+
+    def test_stale_or_invalid_watermark(self):
+        stale = (timezone.now() - timedelta(days=31)).isoformat()
+        self.assertTrue(self.sync(stale)['reset'])
+
+        response = self.client.get(self.url, {'since': 'ayer'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_prune_expired_tombstones(self):
+        self.appointments[2].delete()
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=31))
+        kept_id = self.appointments[1].pk
+        self.appointments[1].delete()
+
+        self.assertEqual(prune_tombstones(), 1)
+        self.assertEqual(list(Tombstone.objects.values_list('object_id', flat=True)), [kept_id])
+
+
+class FakeConnection:
+    """Lado cliente de una conexión ASGI: mensajes enviados y desconexión a demanda"""
+
+    def __init__(self, connect=None):
+        self.incoming = asyncio.Queue()
+        self.sent = []
+        self.changed = asyncio.Event()
+        if connect:
+            self.incoming.put_nowait({'type': connect})
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send(self, message):
+        self.sent.append(message)
+        self.changed.set()
+
+    async def wait_for(self, predicate, timeout=5):
+        async def poll():
+            while not predicate():
+                self.changed.clear()
+                await self.changed.wait()
+        await asyncio.wait_for(poll(), timeout)
+
+    @property
+    def body(self):
+        return b''.join(message.get('body', b'') for message in self.sent)
+
+
+def scope(path=PUSH_PATH, token=None, kind='http', query=b''):
+    headers = [(b'origin', b'http://localhost:3000')]
+    if token:
+        headers.append((b'authorization', f'Bearer {token}'.encode()))
+    return {'type': kind, 'path': path, 'method': 'GET', 'headers': headers, 'query_string': query}
+
+
+@override_settings(PUSH_BROKER_ADDRESS='', CORS_ALLOWED_ORIGINS=['http://localhost:3000'])
+class PushTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.general = Service.objects.create(name='Consulta General', duration=30)
+        cls.token = str(tokens_for_user(cls.professional).access_token)
+
+    def setUp(self):
+        self.passed = []
+
+        async def django_app(scope, receive, send):
+            self.passed.append(scope['path'])
+
+        self.app = PushApplication(django_app)
+
+    def book(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Appointment.objects.create(
+                patient=self.patient, professional=self.professional, service=self.general,
+                appointment_date=date.today() + timedelta(days=3), appointment_time=time(9, 0)
+            )
+
+    async def test_event_stream_pushes_committed_bookings(self):
+        connection = FakeConnection()
+        task = asyncio.ensure_future(self.app(scope(token=self.token), connection.receive, connection.send))
+        await connection.wait_for(lambda: b'retry:' in connection.body)
+        start = connection.sent[0]
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream'), start['headers'])
+        self.assertIn((b'access-control-allow-origin', b'http://localhost:3000'), start['headers'])
+
+        appointment = await sync_to_async(self.book)()
+        await connection.wait_for(lambda: b'data: ' in connection.body)
+        event = orjson.loads(connection.body.split(b'data: ')[1].split(b'\n\n')[0])
+        self.assertEqual(event['event'], 'created')
+        self.assertEqual(event['appointment']['id'], appointment.pk)
+        self.assertEqual(event['appointment']['time'], '09:00')
+
+        connection.incoming.put_nowait({'type': 'http.disconnect'})
+        await asyncio.wait_for(task, 5)
+        self.assertEqual(hub.connections, 0)
+
+    async def test_rejects_missing_or_invalid_token(self):
+        for token in (None, 'no-es-un-token'):
+            connection = FakeConnection()
+            await self.app(scope(token=token), connection.receive, connection.send)
+            self.assertEqual(connection.sent[0]['status'], 401)
+        self.assertEqual(hub.connections, 0)
+
+    async def test_websocket_with_query_token(self):
+        connection = FakeConnection(connect='websocket.connect')
+        query = f'token={self.token}'.encode()
+        task = asyncio.ensure_future(self.app(scope(kind='websocket', query=query), connection.receive, connection.send))
+        await connection.wait_for(lambda: connection.sent)
+        self.assertEqual(connection.sent[0], {'type': 'websocket.accept'})
+
+        publish([f'professional:{self.professional.pk}', f'patient:{self.patient.pk}'], {'event': 'updated'})
+        await connection.wait_for(lambda: len(connection.sent) == 2)
+        self.assertEqual(connection.sent[1], {'type': 'websocket.send', 'text': '{"event":"updated"}'})
+
+        connection.incoming.put_nowait({'type': 'websocket.disconnect'})
+        await asyncio.wait_for(task, 5)
+        self.assertEqual(hub.connections, 0)
+
+    async def test_streams_close_when_token_expires(self):
+        token = tokens_for_user(self.professional).access_token
+        token.set_exp(lifetime=timedelta(seconds=1))
+        self.app.heartbeat = 0.2
+        sse = FakeConnection()
+        websocket = FakeConnection(connect='websocket.connect')
+        await asyncio.wait_for(asyncio.gather(
+            self.app(scope(token=str(token)), sse.receive, sse.send),
+            self.app(scope(kind='websocket', query=f'token={token}'.encode()), websocket.receive, websocket.send),
+        ), 5)
+
+        self.assertEqual(sse.sent[0]['status'], 200)
+        self.assertEqual(sse.sent[-1], {'type': 'http.response.body', 'body': b'', 'more_body': False})
+        self.assertEqual(websocket.sent[0], {'type': 'websocket.accept'})
+        self.assertEqual(websocket.sent[-1], {'type': 'websocket.close', 'code': 4401})
+        self.assertEqual(hub.connections, 0)
+
+    async def test_other_paths_go_to_django(self):
+        await self.app(scope(path='/api/appointments/'), FakeConnection().receive, FakeConnection().send)
+        self.assertEqual(self.passed, ['/api/appointments/'])
+
+    def test_slow_subscriber_gets_resync_instead_of_unbounded_queue(self):
+        subscription = Subscription(['professional:1'], size=2)
+        for index in range(5):
+            subscription.offer(str(index).encode())
+        # 0 y 1 encolados; 2 desborda -> [resync]; 3 se encola; 4 desborda -> [resync]
+        self.assertEqual(subscription.dropped, 5)
+        self.assertEqual(subscription.queue.qsize(), 1)
+        self.assertIs(subscription.queue.get_nowait(), RESYNC)
+
+    def test_publish_does_not_wait_for_a_down_broker(self):
+        connecting = threading.Event()
+        release = threading.Event()
+
+        def hanging_connect(*args, **kwargs):
+            connecting.set()
+            release.wait(5)
+            raise OSError('broker caído')
+
+        connect = mock.patch('sync.pubsub.socket.create_connection', side_effect=hanging_connect)
+        with connect, self.assertLogs('sync.pubsub', 'WARNING') as logs:
+            start = time_module.monotonic()
+            with override_settings(PUSH_BROKER_ADDRESS='127.0.0.1:9'):
+                publish(['patient:7'], {'event': 'deleted'})
+            # La conexión queda colgada en el hilo de fondo, no en quien publica
+            self.assertLess(time_module.monotonic() - start, 1)
+            self.assertTrue(connecting.wait(5))
+            release.set()
+            # El aviso lo registra el hilo de fondo al agotar los intentos
+            deadline = time_module.monotonic() + 5
+            while not logs.records and time_module.monotonic() < deadline:
+                time_module.sleep(0.01)
+        self.assertIn('No se pudo publicar en el broker 127.0.0.1:9', logs.output[0])
+
+    async def test_broker_shares_events_between_processes(self):
+        broker = Broker(port=0)
+        server = await broker.start()
+        address = '127.0.0.1:%d' % server.sockets[0].getsockname()[1]
+        link = BrokerLink(Hub())
+        try:
+            subscription = link.hub.subscribe(['patient:7'])
+            link.ensure_started(address)
+            while not broker.subscribers:
+                await asyncio.sleep(0.01)
+            with override_settings(PUSH_BROKER_ADDRESS=address):
+                await asyncio.to_thread(publish, ['patient:7', 'patient:8'], {'event': 'deleted'})
+            message = await asyncio.wait_for(subscription.queue.get(), 5)
+            self.assertEqual(message, b'{"event":"deleted"}')
+            self.assertTrue(subscription.queue.empty())
+        finally:
+            link.task.cancel()
+            await broker.close()
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import changes_view
+
+urlpatterns = [
+    path('', changes_view, name='sync-changes'),
+]
@@ -0,0 +1,47 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.response import Response
+from appointments.serializers import AppointmentSerializer
+from reviews.serializers import ReviewSerializer
+from users.authentication import ClaimsJWTAuthentication
+from .changes import changes_since
+
+
+@api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
+@permission_classes([permissions.IsAuthenticated])
+def changes_view(request):
+    """
+    Citas y reseñas cambiadas desde la marca de agua del cliente.
+
+    GET ?since=<watermark>
+        -> {"watermark", "has_more", "reset", "appointments": [...], "reviews": [...],
+            "deleted": {"appointments": [id, ...], "reviews": [id, ...]}}
+
+    El cliente aplica los cambios, borra los ids de ``deleted`` y repite con
+    ``since=watermark`` mientras ``has_more`` sea true. Con ``reset`` true la
+    respuesta es una copia completa que reemplaza los datos locales.
+    """
+    since = request.query_params.get('since') or None
+    if since is not None:
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            since = None
+        if since is None:
+            return Response({'error': 'Marca de agua inválida'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+
+    changes = changes_since(request.user, since)
+    context = {'request': request}
+    return Response({
+        'watermark': changes['watermark'],
+        'has_more': changes['has_more'],
+        'reset': changes['reset'],
+        'appointments': AppointmentSerializer(changes['appointments'], many=True, context=context).data,
+        'reviews': ReviewSerializer(changes['reviews'], many=True, context=context).data,
+        'deleted': changes['deleted'],
+    })
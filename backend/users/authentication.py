@@ -0,0 +1,287 @@
+"""
+Autenticación: verificación de credenciales del login y resolución del
+usuario de las peticiones con JWT.
+
+``check_credentials`` hace exactamente una búsqueda del usuario y un cálculo
+de hash por intento. Para emails inexistentes se calcula igualmente el hash
+de la contraseña recibida, de modo que el tiempo de respuesta no revela qué
+cuentas existen.
+
+``CachedJWTAuthentication`` resuelve el usuario del token desde un LRU local
+con TTL corto y, si no está, desde la caché compartida, antes de ir a la base
+de datos. ``ClaimsJWTAuthentication`` además atiende las lecturas (GET/HEAD/
+OPTIONS) solo con los claims ``user_id`` y ``user_type`` del token; como no
+lee al usuario, una desactivación solo se conoce por la marca que
+``invalidate_user`` deja en la caché compartida.
+
+Ambos niveles dependen de que la invalidación llegue a todos los procesos:
+con una caché local (``SHARED_CACHE = False``, p. ej. ``LocMemCache``) no se
+usa el nivel compartido ni el modo solo-claims, y un cambio en otro worker se
+ve a más tardar al vencer el LRU local (``JWT_USER_CACHE_LOCAL_SECONDS``).
+Ambos tienen una variante ``aauthenticate`` para las vistas async
+(``healthcare_system.async_views``) que solo sale del event loop si hay que
+ir a la base de datos.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+
+
+def check_credentials(email, password):
+    """
+    Devuelve el usuario si la contraseña es correcta (aunque esté inactivo,
+    para que la vista pueda informarlo) o None si las credenciales no son válidas.
+    """
+    try:
+        user = User._default_manager.get_by_natural_key(email)
+    except User.DoesNotExist:
+        # Mismo costo que una contraseña incorrecta (igual que ModelBackend)
+        User().set_password(password)
+        return None
+    if not user.check_password(password):
+        return None
+    return user
+
+
+def tokens_for_user(user):
+    """Refresh token (y su access token) con el claim ``user_type``"""
+    refresh = RefreshToken.for_user(user)
+    refresh['user_type'] = user.user_type
+    return refresh
+
+
+# ==================== CACHÉ DE USUARIOS ====================
+
+# Origen de cada resolución; todo lo que no es 'db' es una consulta ahorrada
+stats = Counter()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class LocalUserCache:
+    """LRU acotado y con TTL, local al proceso y seguro entre hilos"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires, values = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return values
+
+    def set(self, user_id, values):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalUserCache(
+    max_size=_setting('JWT_USER_CACHE_SIZE', 1024),
+    ttl=_setting('JWT_USER_CACHE_LOCAL_SECONDS', 5),
+)
+
+FIELD_NAMES = [field.attname for field in User._meta.concrete_fields]
+
+
+def shared_cache():
+    """Si la caché por defecto la comparten todos los procesos (``settings.SHARED_CACHE``)"""
+    return _setting('SHARED_CACHE', False)
+
+
+def _user_key(user_id):
+    """Id normalizado al tipo de la pk (el claim puede llegar como str)"""
+    return User._meta.pk.to_python(user_id)
+
+
+def _shared_key(user_id):
+    return f'jwt:user:{user_id}'
+
+
+def _inactive_key(user_id):
+    return f'jwt:inactive:{user_id}'
+
+
+def resolve_user(user_id):
+    """
+    Usuario por id desde el LRU local, la caché compartida (si
+    ``shared_cache()``) o la base de datos (en ese orden). Devuelve una instancia nueva en cada llamada para que una
+    petición no modifique el objeto de otra. Lanza ``User.DoesNotExist``.
+    """
+    user_id = _user_key(user_id)
+    source = 'local'
+    values = local_cache.get(user_id)
+    shared = shared_cache()
+    if values is None and shared:
+        source = 'shared'
+        values = cache.get(_shared_key(user_id))
+    if values is None:
+        source = 'db'
+        user = User.objects.get(pk=user_id)
+        values = [getattr(user, name) for name in FIELD_NAMES]
+        if shared:
+            cache.set(_shared_key(user_id), values, _setting('JWT_USER_CACHE_SECONDS', 60))
+    if source != 'local':
+        local_cache.set(user_id, values)
+    stats[source] += 1
+    return User.from_db('default', FIELD_NAMES, values)
+
+
+async def aresolve_user(user_id):
+    """``resolve_user`` para vistas async: un acierto del LRU local no sale del event loop"""
+    user_id = _user_key(user_id)
+    values = local_cache.get(user_id)
+    if values is None:
+        return await sync_to_async(resolve_user)(user_id)
+    stats['local'] += 1
+    return User.from_db('default', FIELD_NAMES, values)
+
+
+def invalidate_user(user):
+    """Descarta el usuario de ambas cachés (llamado al guardar o borrar un User)"""
+    user_id = _user_key(user.pk)
+    local_cache.discard(user_id)
+    cache.delete(_shared_key(user_id))
+    # Los tokens ya emitidos siguen siendo válidos: marcar la desactivación
+    # para el modo solo-claims, que no consulta al usuario
+    if user.is_active:
+        cache.delete(_inactive_key(user_id))
+    else:
+        cache.set(_inactive_key(user_id), True, api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+
+def user_cache_stats():
+    """Resoluciones por origen y consultas ahorradas desde el arranque del proceso"""
+    data = dict(stats)
+    data['queries_saved'] = sum(count for source, count in stats.items() if source != 'db')
+    return data
+
+
+# ==================== BACKENDS DE AUTENTICACIÓN ====================
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` que resuelve el usuario con ``resolve_user``"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('El token no contiene identificación de usuario')
+
+        try:
+            user = resolve_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed('Usuario no encontrado', code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed('Usuario inactivo', code='user_inactive')
+        return user
+
+    async def aauthenticate(self, request):
+        """``authenticate`` para vistas async (mismo resultado y excepciones)"""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('El token no contiene identificación de usuario')
+
+        try:
+            user = await aresolve_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed('Usuario no encontrado', code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed('Usuario inactivo', code='user_inactive')
+        return user
+
+
+class ClaimsUser(TokenUser):
+    """Usuario sin consultas construido con los claims del token"""
+
+    @property
+    def is_patient(self):
+        return self.user_type == 'patient'
+
+    @property
+    def is_professional(self):
+        return self.user_type == 'professional'
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    Para vistas cuyas lecturas solo necesitan ``id`` y ``user_type``: en
+    métodos seguros devuelve un ``ClaimsUser`` sin tocar la base de datos.
+    Las escrituras y los tokens sin ``user_type`` usan el camino cacheado.
+
+    Un usuario desactivado se rechaza por la marca ``jwt:inactive:<id>`` de la
+    caché compartida; sin ``shared_cache()`` esa marca no llega a los demás
+    procesos, así que todo va por el camino cacheado.
+    """
+
+    def authenticate(self, request):
+        self.claims_only = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def use_claims(self, validated_token):
+        return self.claims_only and 'user_type' in validated_token and shared_cache()
+
+    def get_user(self, validated_token):
+        if not self.use_claims(validated_token):
+            return super().get_user(validated_token)
+        user = ClaimsUser(validated_token)
+        if cache.get(_inactive_key(_user_key(user.id))):
+            raise AuthenticationFailed('Usuario inactivo', code='user_inactive')
+        stats['claims'] += 1
+        return user
+
+    async def aauthenticate(self, request):
+        self.claims_only = request.method in SAFE_METHODS
+        return await super().aauthenticate(request)
+
+    async def aget_user(self, validated_token):
+        if not self.use_claims(validated_token):
+            return await super().aget_user(validated_token)
+        # Sin consultas: get_user solo lee los claims y la caché
+        return self.get_user(validated_token)
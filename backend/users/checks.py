@@ -0,0 +1,22 @@
+"""
+Verificaciones de despliegue (``manage.py check --deploy``).
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register(deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Sin caché compartida la autenticación JWT desactiva el modo solo-claims y
+    el nivel compartido de usuarios (ver ``users.authentication``): es correcto
+    con varios workers, pero cada lectura vuelve a consultar al usuario.
+    """
+    if getattr(settings, 'SHARED_CACHE', False):
+        return []
+    return [Warning(
+        'La caché por defecto es local al proceso: las lecturas autenticadas '
+        'consultan al usuario en la base de datos en lugar de usar los claims del token.',
+        hint='Configure REDIS_URL (o CACHE_BACKEND/CACHE_LOCATION) con un backend compartido.',
+        id='users.W001',
+    )]
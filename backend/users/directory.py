@@ -0,0 +1,117 @@
+"""
+Directorio de profesionales: búsqueda, proyección con ``.values()`` y caché
+versionada.
+
+Cada página se guarda bajo una clave que incluye el número de versión del
+directorio. Guardar un profesional solo incrementa la versión (``bump``), con
+lo que todas las páginas anteriores quedan huérfanas y expiran solas.
+
+Con caché compartida (``settings.SHARED_CACHE``) la versión vive en la caché;
+si se pierde (desalojo o reinicio) se vuelve a sembrar con el reloj en
+nanosegundos, nunca con un número ya usado. Con una caché local por proceso
+un ``bump`` no llegaría a los demás workers, así que la versión se lee de
+``DirectoryVersion`` (una consulta por clave primaria por petición).
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+
+from .models import DirectoryVersion, User
+
+VERSION_KEY = 'professionals:version'
+
+# Columnas leídas de la base de datos (sin instanciar modelos)
+PROFESSIONAL_FIELDS = ('id', 'first_name', 'last_name', 'email', 'specialty', 'license_number', 'phone')
+
+# Orden del directorio; termina en id para la paginación keyset
+DIRECTORY_ORDERING = ('last_name', 'first_name', 'id')
+
+
+def search_professionals(search='', specialty=''):
+    """
+    Profesionales activos filtrados por texto libre (cada palabra debe
+    aparecer en nombre, apellido o especialidad) y prefijo de especialidad.
+    En PostgreSQL los ``icontains`` usan los índices trigram de la migración 0002.
+    """
+    queryset = User.objects.filter(user_type='professional', is_active=True)
+    for term in search.split():
+        queryset = queryset.filter(
+            Q(first_name__icontains=term) | Q(last_name__icontains=term) | Q(specialty__icontains=term)
+        )
+    if specialty:
+        queryset = queryset.filter(specialty__istartswith=specialty)
+    return queryset.values(*PROFESSIONAL_FIELDS)
+
+
+def professional_payload(row):
+    """Formato de respuesta compatible con el frontend actual"""
+    return {
+        'id': row['id'],
+        'first_name': row['first_name'],
+        'last_name': row['last_name'],
+        'email': row['email'],
+        'specialty': row['specialty'],
+        'license_number': row['license_number'],
+        'phone_number': row['phone'],
+        'user_type': 'professional',
+        'username': row['email'].split('@')[0]  # Para compatibilidad
+    }
+
+
+# ==================== CACHÉ VERSIONADA ====================
+
+def shared_cache():
+    return getattr(settings, 'SHARED_CACHE', False)
+
+
+def _cached_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        seed = time.time_ns()
+        cache.add(VERSION_KEY, seed, timeout=None)
+        version = cache.get(VERSION_KEY, seed)
+    return version
+
+
+def directory_version():
+    """Versión actual del directorio (forma parte de la clave de cada página)"""
+    if shared_cache():
+        return _cached_version()
+    return f"db{DirectoryVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0}"
+
+
+async def adirectory_version():
+    """``directory_version`` con el ORM async"""
+    if shared_cache():
+        return _cached_version()
+    return f"db{await DirectoryVersion.objects.filter(pk=1).values_list('version', flat=True).afirst() or 0}"
+
+
+def bump_directory_version():
+    """Invalida todas las páginas cacheadas del directorio"""
+    # La fila se actualiza siempre, para que cambiar de backend de caché no
+    # deje visible una versión vieja
+    if not DirectoryVersion.objects.filter(pk=1).update(version=F('version') + 1):
+        DirectoryVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+    if not shared_cache():
+        return
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Sin versión previa: sembrar con un valor que no puede repetir una anterior
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def page_cache_key(params, version):
+    """Clave de la página: versión + parámetros de consulta normalizados"""
+    normalized = json.dumps(sorted(params.items()), separators=(',', ':'))
+    digest = hashlib.md5(normalized.encode()).hexdigest()
+    return f'professionals:v{version}:{digest}'
+
+
+def cache_timeout():
+    return getattr(settings, 'PROFESSIONALS_CACHE_SECONDS', 300)
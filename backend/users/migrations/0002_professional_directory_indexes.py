@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:15
+
+from django.db import migrations, models
+
+# Índices trigram para los icontains/istartswith del directorio. Django
+# compara UPPER(col::text), así que se indexa esa misma expresión.
+SEARCH_COLUMNS = ('first_name', 'last_name', 'specialty')
+
+
+def add_trigram_indexes(apps, schema_editor):
+    # pg_trgm solo existe en PostgreSQL; en otros motores la búsqueda recorre
+    # el índice parcial de profesionales
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS user_professional_{column}_trgm ON users_user '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops) '
+            f"WHERE user_type = 'professional' AND is_active"
+        )
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS user_professional_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_active', True), ('user_type', 'professional')), fields=['last_name', 'first_name', 'id'], name='user_professional_dir_idx'),
+        ),
+        migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+    ]
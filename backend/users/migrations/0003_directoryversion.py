@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    DirectoryVersion = apps.get_model('users', 'DirectoryVersion')
+    DirectoryVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_professional_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirectoryVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Versión del directorio',
+                'verbose_name_plural': 'Versiones del directorio',
+            },
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
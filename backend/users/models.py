@@ -62,6 +62,15 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         verbose_name = 'Usuario'
         verbose_name_plural = 'Usuarios'
+        indexes = [
+            # Orden y paginación del directorio de profesionales (users.directory);
+            # la búsqueda por texto usa índices trigram (migración 0002, solo PostgreSQL)
+            models.Index(
+                fields=['last_name', 'first_name', 'id'],
+                condition=models.Q(user_type='professional', is_active=True),
+                name='user_professional_dir_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.get_full_name()} ({self.get_user_type_display()})"
@@ -78,4 +87,17 @@ class User(AbstractBaseUser, PermissionsMixin):
     
     @property
     def is_professional(self):
-        return self.user_type == 'professional'
\ No newline at end of file
+        return self.user_type == 'professional'
+
+
+class DirectoryVersion(models.Model):
+    """
+    Versión del directorio de profesionales guardada en la base de datos (una
+    sola fila, pk=1). Con una caché local por proceso es lo que invalida las
+    páginas cacheadas en todos los workers (ver ``users.directory``).
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Versión del directorio'
+        verbose_name_plural = 'Versiones del directorio'
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+from .directory import bump_directory_version
+from .models import User
+
+
+@receiver(post_save, sender=User, dispatch_uid='users_jwt_cache_save')
+@receiver(post_delete, sender=User, dispatch_uid='users_jwt_cache_delete')
+def user_changed(sender, instance, **kwargs):
+    """Descarta el usuario cacheado por la autenticación JWT"""
+    invalidate_user(instance)
+
+
+@receiver(post_save, sender=User, dispatch_uid='users_directory_save')
+def professional_saved(sender, instance, update_fields=None, **kwargs):
+    """Invalida el directorio cacheado cuando cambia un profesional"""
+    if instance.user_type != 'professional':
+        return
+    # El login solo actualiza last_login, que no aparece en el directorio
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_directory_version()
+
+
+@receiver(post_delete, sender=User, dispatch_uid='users_directory_delete')
+def professional_deleted(sender, instance, **kwargs):
+    if instance.user_type == 'professional':
+        bump_directory_version()
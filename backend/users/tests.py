@@ -1,3 +1,349 @@
-from django.test import TestCase
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from healthcare_system.testing import AsyncParityMixin, QueryBudgetMixin
+from .authentication import local_cache, resolve_user, tokens_for_user, user_cache_stats
+from .directory import VERSION_KEY, bump_directory_version, directory_version
+from .models import DirectoryVersion, User
+from .views import UserProfileView, professionals_list_async_view, professionals_list_view, user_profile_async_view
+
+
+class UserEndpointQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='Secreta.123', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.add_professionals(1)
+
+    @classmethod
+    def add_professionals(cls, count):
+        start = User.objects.filter(user_type='professional').count()
+        for index in range(start, start + count):
+            User.objects.create_user(
+                email=f'doctor{index}@test.com', password='x', first_name='Doctor', last_name=str(index),
+                user_type='professional', specialty='Cardiología'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_login_budget(self):
+        response = self.assertQueryBudget(1, self.client.post, reverse('token_obtain_pair'), {
+            'email': 'paciente@test.com', 'password': 'Secreta.123',
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_compatible_login_budget(self):
+        response = self.assertQueryBudget(1, self.client.post, reverse('compatible_login'), {
+            'username': 'paciente@test.com', 'password': 'Secreta.123',
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_register_budget(self):
+        response = self.assertQueryBudget(2, self.client.post, reverse('register'), {
+            'email': 'nuevo@test.com', 'first_name': 'Nuevo', 'last_name': 'Usuario',
+            'user_type': 'patient', 'password': 'Secreta.123', 'password2': 'Secreta.123',
+        })
+        self.assertEqual(response.status_code, 201)
+
+    def test_profile_budget(self):
+        self.client.force_authenticate(self.patient)
+        response = self.assertQueryBudget(0, self.client.get, reverse('profile'))
+        self.assertEqual(response.data['email'], 'paciente@test.com')
+
+    def test_professionals_list_is_constant(self):
+        self.client.force_authenticate(self.patient)
+        url = reverse('professionals-list')
+        # Versión del directorio (caché local: DirectoryVersion) + listado
+        self.assertConstantQueries(lambda: self.client.get(url), lambda: self.add_professionals(5), budget=2)
+
+    def test_legacy_token_verify_budget(self):
+        token = str(RefreshToken.for_user(self.patient).access_token)
+        response = self.assertQueryBudget(1, self.client.post, reverse('legacy_token_verify'), {'token': token})
+        self.assertTrue(response.data['valid'])
+
+    def test_token_refresh_budget(self):
+        refresh = str(RefreshToken.for_user(self.patient))
+        response = self.assertQueryBudget(0, self.client.post, reverse('token_refresh'), {'refresh': refresh})
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(SHARED_CACHE=True)
+class ProfessionalDirectoryTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        people = [
+            ('Juan', 'Pérez', 'Cardiología'),
+            ('María', 'García', 'Dermatología'),
+            ('Luis', 'Gómez', 'Cardiología Pediátrica'),
+            ('Sofía', 'Alvarez', 'Pediatría'),
+        ]
+        cls.professionals = [
+            User.objects.create_user(
+                email=f'doctor{index}@test.com', password='x', first_name=first, last_name=last,
+                user_type='professional', specialty=specialty
+            )
+            for index, (first, last, specialty) in enumerate(people)
+        ]
+        User.objects.create_user(
+            email='inactivo@test.com', password='x', first_name='Pedro', last_name='Inactivo',
+            user_type='professional', specialty='Cardiología', is_active=False
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.patient)
+        self.url = reverse('professionals-list')
+
+    def names(self, response):
+        return [item['last_name'] for item in response.data['results']]
+
+    def test_ordered_and_paginated(self):
+        response = self.client.get(self.url, {'page_size': 3})
+        self.assertEqual(self.names(response), ['Alvarez', 'García', 'Gómez'])
+        self.assertEqual(response.data['results'][0]['username'], 'doctor3')
+        response = self.client.get(response.data['next'])
+        self.assertEqual(self.names(response), ['Pérez'])
+        self.assertIsNone(response.data['next'])
+
+    def test_compat_mode_returns_plain_list(self):
+        response = self.client.get(self.url, {'paginate': 'false'})
+        self.assertEqual(len(response.data), 4)
+        self.assertEqual(response.data[0]['phone_number'], None)
+
+    def test_search_and_specialty_filters(self):
+        response = self.client.get(self.url, {'search': 'cardio'})
+        self.assertEqual(self.names(response), ['Gómez', 'Pérez'])
+        response = self.client.get(self.url, {'search': 'luis cardio'})
+        self.assertEqual(self.names(response), ['Gómez'])
+        response = self.client.get(self.url, {'specialty': 'derma'})
+        self.assertEqual(self.names(response), ['García'])
+
+    def test_cached_until_professional_changes(self):
+        self.assertQueryBudget(1, self.client.get, self.url)
+        response = self.assertQueryBudget(0, self.client.get, self.url)
+        self.assertEqual(len(response.data['results']), 4)
+
+        # Un paciente o un login no invalidan el directorio
+        self.patient.first_name = 'Ana María'
+        self.patient.save()
+        self.professionals[0].save(update_fields=['last_login'])
+        self.assertQueryBudget(0, self.client.get, self.url)
+
+        self.professionals[1].last_name = 'Zamora'
+        self.professionals[1].save()
+        response = self.assertQueryBudget(1, self.client.get, self.url)
+        self.assertEqual(self.names(response)[-1], 'Zamora')
+
+    def test_lost_version_does_not_revive_old_pages(self):
+        self.client.get(self.url)
+        old_version = directory_version()
+        # Versión desalojada: la nueva no puede coincidir con la de páginas aún cacheadas
+        cache.delete(VERSION_KEY)
+        bump_directory_version()
+        self.assertNotEqual(directory_version(), old_version)
+        self.assertQueryBudget(1, self.client.get, self.url)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_local_cache_reads_version_from_database(self):
+        self.assertQueryBudget(2, self.client.get, self.url)
+        self.assertQueryBudget(1, self.client.get, self.url)
+
+        # Edición atendida por otro worker: su caché local no es esta, pero la
+        # versión en la base de datos sí cambia
+        User.objects.filter(pk=self.professionals[1].pk).update(last_name='Zamora')
+        DirectoryVersion.objects.filter(pk=1).update(version=F('version') + 1)
+        response = self.assertQueryBudget(2, self.client.get, self.url)
+        self.assertEqual(self.names(response)[-1], 'Zamora')
+
+
+class CountingHasher(MD5PasswordHasher):
+    """Hasher rápido que cuenta cuántas veces se calcula un hash"""
+    calls = 0
+
+    def encode(self, password, salt):
+        CountingHasher.calls += 1
+        return super().encode(password, salt)
+
+
+@override_settings(PASSWORD_HASHERS=['users.tests.CountingHasher'])
+class LoginHashTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='paciente@test.com', password='Secreta.123', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.inactive = User.objects.create_user(
+            email='inactivo@test.com', password='Secreta.123', first_name='Iván', last_name='Ruiz',
+            user_type='patient', is_active=False
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        CountingHasher.calls = 0
+
+    def login(self, name, email, password):
+        if name == 'compatible_login':
+            return self.client.post(reverse(name), {'username': email, 'password': password})
+        return self.client.post(reverse(name), {'email': email, 'password': password})
+
+    def test_one_lookup_and_one_hash_per_attempt(self):
+        cases = [
+            ('paciente@test.com', 'Secreta.123', 200),
+            ('paciente@test.com', 'incorrecta', None),
+            ('nadie@test.com', 'incorrecta', None),
+        ]
+        for name in ('token_obtain_pair', 'compatible_login'):
+            for email, password, expected in cases:
+                with self.subTest(endpoint=name, email=email, password=password):
+                    CountingHasher.calls = 0
+                    response = self.assertQueryBudget(1, self.login, name, email, password)
+                    self.assertEqual(CountingHasher.calls, 1)
+                    if expected:
+                        self.assertEqual(response.status_code, expected)
+                    else:
+                        self.assertIn(response.status_code, (400, 401))
+
+    def test_inactive_user_is_rejected(self):
+        response = self.login('token_obtain_pair', 'inactivo@test.com', 'Secreta.123')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('inactivo', str(response.data))
+        response = self.login('compatible_login', 'inactivo@test.com', 'Secreta.123')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['error'], 'Usuario inactivo')
+
+
+# Una sola caché LocMem en el proceso del test hace de caché compartida
+@override_settings(SHARED_CACHE=True)
+class JWTUserCacheTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.client = APIClient()
+        self.authorize(tokens_for_user(self.user).access_token)
+
+    def authorize(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_user_is_resolved_once(self):
+        response = self.assertQueryBudget(1, self.client.get, reverse('profile'))
+        self.assertEqual(response.data['first_name'], 'Ana')
+        before = user_cache_stats().get('queries_saved', 0)
+        self.assertQueryBudget(0, self.client.get, reverse('profile'))
+        # Otro proceso: sin LRU local pero con la caché compartida
+        local_cache.clear()
+        self.assertQueryBudget(0, self.client.get, reverse('profile'))
+        self.assertEqual(user_cache_stats()['queries_saved'], before + 2)
+
+    def test_save_invalidates_cached_user(self):
+        self.client.get(reverse('profile'))
+        self.user.first_name = 'Ana María'
+        self.user.save()
+        response = self.assertQueryBudget(1, self.client.get, reverse('profile'))
+        self.assertEqual(response.data['first_name'], 'Ana María')
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+
+    def test_string_claim_is_invalidated(self):
+        # simplejwt >= 5.4 emite user_id como str; la pk del modelo es int
+        resolve_user(str(self.user.pk))
+        self.assertIsNotNone(local_cache.get(self.user.pk))
+        self.user.save()
+        self.assertIsNone(local_cache.get(self.user.pk))
+
+    def test_claims_only_reads_skip_user_lookup(self):
+        url = reverse('appointments-list')
+        response = self.assertQueryBudget(1, self.client.get, url)
+        self.assertEqual(response.data['results'], [])
+
+        # Sin claim user_type (tokens anteriores): camino cacheado
+        token = tokens_for_user(self.user).access_token
+        del token['user_type']
+        self.authorize(token)
+        self.assertQueryBudget(2, self.client.get, url)
+
+    def test_claims_only_rejects_deactivated_user(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('appointments-list')).status_code, 401)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_local_cache_disables_claims_only_reads(self):
+        url = reverse('appointments-list')
+        # Lectura del usuario + listado
+        self.assertQueryBudget(2, self.client.get, url)
+        # Desactivado desde otro worker: ni la marca ni la invalidación llegan a
+        # este proceso, pero al vencer el LRU local se lee el usuario de nuevo
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        local_cache.clear()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+
+# Sin caché del directorio: ambas vistas leen la base de datos
+@override_settings(PROFESSIONALS_CACHE_SECONDS=0)
+class AsyncReadViewTests(AsyncParityMixin, QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        for index, (last_name, specialty) in enumerate((('Pérez', 'Cardiología'), ('García', 'Dermatología'))):
+            User.objects.create_user(
+                email=f'doctor{index}@test.com', password='x', first_name='Doctor', last_name=last_name,
+                user_type='professional', specialty=specialty
+            )
+        cls.token = str(tokens_for_user(cls.user).access_token)
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.profile_view = UserProfileView.as_view()
+
+    def test_profile_matches_sync_view(self):
+        for token in (self.token, None, 'no-es-un-token'):
+            with self.subTest(token=token):
+                self.assertSameResponse(self.profile_view, user_profile_async_view, '/api/profile/', token=token)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.assertSameResponse(self.profile_view, user_profile_async_view, '/api/profile/', token=self.token)
+        self.assertEqual(response.status_code, 401)
+
+    def test_cached_user_needs_no_queries(self):
+        request = APIRequestFactory().get('/api/profile/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertQueryBudget(1, async_to_sync(user_profile_async_view), request)
+        response = self.assertQueryBudget(0, async_to_sync(user_profile_async_view), request)
+        self.assertEqual(response.data['email'], 'paciente@test.com')
+
+    def test_directory_matches_sync_view(self):
+        for params in ({}, {'search': 'cardio'}, {'specialty': 'derma'}, {'paginate': 'false'}, {'cursor': 'basura'}):
+            with self.subTest(params=params):
+                self.assertSameResponse(
+                    professionals_list_view, professionals_list_async_view, '/api/professionals/', params, self.token
+                )
+
+        url = '/api/professionals/?page_size=1'
+        response = self.assertSameResponse(professionals_list_view, professionals_list_async_view, url, token=self.token)
+        self.assertSameResponse(
+            professionals_list_view, professionals_list_async_view, response.data['next'], token=self.token
+        )
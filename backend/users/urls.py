@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     UserRegistrationView, 
@@ -5,10 +6,20 @@ from .views import (
     professionals_list_view,
     EmailTokenObtainPairView,
     compatible_login_view,
-    verify_token_view
+    verify_token_view,
+    user_profile_async_view,
+    professionals_list_async_view
 )
 from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
 
+# Lecturas async bajo ASGI (ver ASYNC_READ_VIEWS)
+if settings.ASYNC_READ_VIEWS:
+    profile_view = user_profile_async_view
+    professionals_view = professionals_list_async_view
+else:
+    profile_view = UserProfileView.as_view()
+    professionals_view = professionals_list_view
+
 urlpatterns = [
     # 🔐 Autenticación principal (recomendado)
     path('login/', EmailTokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -25,9 +36,9 @@ urlpatterns = [
     
     # 👤 Registro y perfil
     path('register/', UserRegistrationView.as_view(), name='register'),
-    path('profile/', UserProfileView.as_view(), name='profile'),
-    path('me/', UserProfileView.as_view(), name='user-me'),  # Para tu frontend
+    path('profile/', profile_view, name='profile'),
+    path('me/', profile_view, name='user-me'),  # Para tu frontend
     
     # 👨‍⚕️ Profesionales
-    path('professionals/', professionals_list_view, name='professionals-list'),
+    path('professionals/', professionals_view, name='professionals-list'),
 ]
\ No newline at end of file
@@ -1,15 +1,28 @@
-from rest_framework import generics, status, permissions
+from rest_framework import generics, status, permissions, serializers
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.exceptions import NotFound
 import logging
 
+from healthcare_system.async_views import async_read_view
+from healthcare_system.pagination import KeysetPagination
+
+from .authentication import ClaimsJWTAuthentication, check_credentials, resolve_user, tokens_for_user
+from .directory import (
+    DIRECTORY_ORDERING,
+    adirectory_version,
+    cache_timeout,
+    directory_version,
+    page_cache_key,
+    professional_payload,
+    search_professionals
+)
 from .models import User
 from .serializers import (
     UserRegistrationSerializer,
@@ -27,10 +40,9 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Permitir ambos campos para compatibilidad con frontend existente
-        self.fields['email'] = self.fields.pop('username', None)
+        # (username_field ya es 'email' porque User.USERNAME_FIELD = 'email')
         self.fields['email'].required = False
-        self.fields['username'] = self.fields.get('username', self.fields['email'].__class__())
-        self.fields['username'].required = False
+        self.fields['username'] = serializers.CharField(required=False)
     
     def validate(self, attrs):
         # Determinar qué campo usar
@@ -57,21 +69,8 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
                 code='authorization'
             )
         
-        # Autenticar usando el campo como email
-        user = authenticate(
-            request=self.context.get('request'),
-            username=auth_field,  # Tratar como email
-            password=password
-        )
-        
-        if user is None:
-            # Intentar buscar usuario por email
-            try:
-                user = User.objects.get(email=auth_field)
-                if not user.check_password(password):
-                    user = None
-            except User.DoesNotExist:
-                user = None
+        # Una búsqueda y un hash por intento (ver users.authentication)
+        user = check_credentials(auth_field, password)
         
         if user is None:
             raise serializers.ValidationError(
@@ -85,8 +84,8 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
                 code='authorization'
             )
         
-        # Generar token
-        refresh = self.get_token(user)
+        # Generar token (con el claim user_type)
+        refresh = tokens_for_user(user)
         
         data = {
             'user': {
@@ -122,7 +121,7 @@ class UserRegistrationView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
         
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         
         return Response({
             'user': {
@@ -161,6 +160,11 @@ class UserProfileView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+@async_read_view(UserProfileView.as_view())
+async def user_profile_async_view(view, request):
+    """GET de ``UserProfileView``: el usuario sale de la caché de JWT o del ORM async"""
+    return view.get(request)
+
 # ==================== VISTA COMPATIBILIDAD PARA FRONTEND ====================
 
 @api_view(['POST'])
@@ -180,17 +184,8 @@ def compatible_login_view(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Autenticar (username puede ser email)
-        user = authenticate(request, username=username, password=password)
-        
-        if user is None:
-            # Intentar con email
-            try:
-                user = User.objects.get(email=username)
-                if not user.check_password(password):
-                    user = None
-            except User.DoesNotExist:
-                user = None
+        # Autenticar (username es el email); mismo camino que /api/login/
+        user = check_credentials(username, password)
         
         if user is None:
             return Response(
@@ -198,8 +193,14 @@ def compatible_login_view(request):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
+        if not user.is_active:
+            return Response(
+                {'error': 'Usuario inactivo'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        
         # Generar tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         
         response_data = {
             'user': {
@@ -227,32 +228,101 @@ def compatible_login_view(request):
 
 # ==================== VISTAS PARA PROFESIONALES ====================
 
+class ProfessionalPagination(KeysetPagination):
+    ordering = DIRECTORY_ORDERING
+    max_page_size = 200
+
+# Parámetros que cambian el resultado (y por tanto la clave de caché)
+DIRECTORY_PARAMS = ('search', 'specialty', 'cursor', 'page_size', 'paginate')
+
+def directory_lookup(request, version):
+    """
+    Paginador, clave de caché y página cacheada del directorio en ``version``
+    (``directory_version``/``adirectory_version``). Si la página
+    no está en caché devuelve también la consulta a leer (sin ejecutar), para
+    que la vista sync o async la lea con su ORM y la pase a ``directory_result``;
+    el paginador es None cuando se pidió la lista completa.
+    """
+    params = {name: request.query_params[name] for name in DIRECTORY_PARAMS if name in request.query_params}
+    paginator = ProfessionalPagination()
+    key = page_cache_key(params, version)
+    page = cache.get(key)
+    if page is not None:
+        return paginator, key, page, None
+    
+    queryset = search_professionals(search=params.get('search', ''), specialty=params.get('specialty', ''))
+    page_queryset = paginator.page_queryset(queryset, request)
+    if page_queryset is None:
+        return None, key, None, queryset.order_by(*DIRECTORY_ORDERING)
+    return paginator, key, None, page_queryset
+
+def directory_result(request, paginator, key, page, rows):
+    """Respuesta del directorio; arma y cachea la página con ``rows`` si faltaba"""
+    if page is None:
+        if paginator is None:
+            page = directory_page(rows)
+        else:
+            page = directory_page(paginator.page_rows(rows), paginator)
+        cache.set(key, page, cache_timeout())
+    return directory_response(request, paginator, page)
+
+def directory_page(rows, paginator=None):
+    """Página cacheable; sin ``next``/``previous`` si no se paginó"""
+    page = {'results': [professional_payload(row) for row in rows]}
+    if paginator is not None:
+        page['next'] = paginator.next_position
+        page['previous'] = paginator.previous_position
+    return page
+
+def directory_response(request, paginator, page):
+    if 'next' not in page:
+        return Response(page['results'])
+    # Los enlaces se arman por request: la caché solo guarda las posiciones
+    paginator.request = request
+    return Response({
+        'next': paginator.encode_cursor(page['next'], reverse=False),
+        'previous': paginator.encode_cursor(page['previous'], reverse=True),
+        'results': page['results'],
+    })
+
+def directory_error(error):
+    logger.error(f"Error obteniendo profesionales: {str(error)}")
+    return Response(
+        {'error': 'Error obteniendo lista de profesionales'},
+        status=status.HTTP_500_INTERNAL_SERVER_ERROR
+    )
+
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([permissions.IsAuthenticated])
 def professionals_list_view(request):
-    """Lista todos los profesionales - compatible con frontend actual"""
+    """
+    Directorio de profesionales activos, paginado por cursor y cacheado.
+
+    GET ?search=<texto>&specialty=<prefijo>&page_size=<n>&cursor=<c>
+        -> {"next": ..., "previous": ..., "results": [...]}
+    GET ?paginate=false -> lista completa sin envolver (compatibilidad)
+    """
     try:
-        professionals = User.objects.filter(user_type='professional', is_active=True)
-        data = []
-        for prof in professionals:
-            data.append({
-                'id': prof.id,
-                'first_name': prof.first_name,
-                'last_name': prof.last_name,
-                'email': prof.email,
-                'specialty': getattr(prof, 'specialty', 'General'),
-                'license_number': getattr(prof, 'license_number', ''),
-                'phone_number': getattr(prof, 'phone', ''),
-                'user_type': prof.user_type,
-                'username': prof.email.split('@')[0]  # Para compatibilidad
-            })
-        return Response(data)
+        paginator, key, page, queryset = directory_lookup(request, directory_version())
+        rows = None if queryset is None else list(queryset)
+        return directory_result(request, paginator, key, page, rows)
+    except NotFound:
+        raise
     except Exception as e:
-        logger.error(f"Error obteniendo profesionales: {str(e)}")
-        return Response(
-            {'error': 'Error obteniendo lista de profesionales'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+        return directory_error(e)
+
+@async_read_view(professionals_list_view)
+async def professionals_list_async_view(view, request):
+    """GET de ``professionals_list_view`` con el ORM async (misma caché)"""
+    try:
+        paginator, key, page, queryset = directory_lookup(request, await adirectory_version())
+        rows = None if queryset is None else [row async for row in queryset]
+        return directory_result(request, paginator, key, page, rows)
+    except NotFound:
+        raise
+    except Exception as e:
+        return directory_error(e)
 
 # ==================== VISTA PARA VERIFICAR TOKEN ====================
 
@@ -277,7 +347,7 @@ def verify_token_view(request):
         user_id = access_token['user_id']
         
         try:
-            user = User.objects.get(id=user_id)
+            user = resolve_user(user_id)
             return Response({
                 'valid': True,
                 'user': {
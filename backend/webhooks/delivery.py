@@ -0,0 +1,159 @@
+"""
+Worker asíncrono que vacía el outbox de eventos hacia los destinos externos.
+
+Cada ciclo reclama eventos pendientes (``SELECT ... FOR UPDATE SKIP LOCKED``
+más un lease en ``next_attempt_at``), los agrupa por destino y envía un POST
+por lote reutilizando las conexiones HTTP del cliente. Los lotes fallidos se
+reintentan con backoff exponencial y, al agotar los intentos, quedan como
+``dead`` para revisión manual.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def backoff_delay(attempts):
+    """Espera antes del siguiente intento: base * 2^(intentos - 1), con tope"""
+    base = _setting('WEBHOOK_RETRY_BASE_SECONDS', 5)
+    cap = _setting('WEBHOOK_RETRY_MAX_SECONDS', 3600)
+    return timedelta(seconds=min(cap, base * 2 ** max(0, attempts - 1)))
+
+
+def claim_batches(batch_size):
+    """
+    Reclama hasta ``batch_size`` eventos pendientes y vencidos. Devuelve
+    ``{destino: [eventos]}``. El lease evita que otro worker los tome mientras
+    se entregan fuera de la transacción.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=_setting('WEBHOOK_LEASE_SECONDS', 60))
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if not events:
+            return {}
+        OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(
+            next_attempt_at=now + lease
+        )
+
+    batches = defaultdict(list)
+    for event in events:
+        batches[event.destination].append(event)
+    return dict(batches)
+
+
+def record_results(results):
+    """
+    Persiste el resultado de cada lote: ``results`` es una lista de
+    ``(eventos, error)`` donde ``error`` es None si la entrega fue exitosa.
+    """
+    now = timezone.now()
+    max_attempts = _setting('WEBHOOK_MAX_ATTEMPTS', 8)
+    with transaction.atomic():
+        for events, error in results:
+            ids = [event.id for event in events]
+            if error is None:
+                OutboxEvent.objects.filter(id__in=ids).update(
+                    status='delivered', delivered_at=now, attempts=F('attempts') + 1, last_error=''
+                )
+                continue
+            # Todos los eventos de un lote comparten número de intentos tras el primer fallo
+            attempts = max(event.attempts for event in events) + 1
+            if attempts >= max_attempts:
+                OutboxEvent.objects.filter(id__in=ids).update(
+                    status='dead', attempts=attempts, last_error=error
+                )
+                logger.error(f"Eventos {ids} descartados tras {attempts} intentos: {error}")
+            else:
+                OutboxEvent.objects.filter(id__in=ids).update(
+                    attempts=attempts, last_error=error, next_attempt_at=now + backoff_delay(attempts)
+                )
+
+
+class DeliveryWorker:
+    """
+    Entrega los lotes del outbox con un ``httpx.AsyncClient`` compartido, que
+    mantiene conexiones keep-alive por destino entre ciclos.
+    """
+
+    def __init__(self, destinations=None, batch_size=100, poll_interval=2.0, timeout=10.0, transport=None):
+        self.destinations = destinations or settings.WEBHOOK_DESTINATIONS
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.transport = transport
+        self.delivered = 0
+        self.failed = 0
+
+    async def deliver(self, client, destination, events):
+        config = self.destinations.get(destination)
+        if config is None:
+            return events, f'Destino desconocido: {destination}'
+        body = {'events': [event.payload for event in events]}
+        try:
+            response = await client.post(config['url'], json=body, headers=config.get('headers'))
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            self.failed += len(events)
+            return events, f'{type(exc).__name__}: {exc}'
+        self.delivered += len(events)
+        return events, None
+
+    async def run_once(self, client):
+        """Un ciclo: reclama, entrega en paralelo por destino y registra. Devuelve eventos procesados"""
+        batches = await sync_to_async(claim_batches)(self.batch_size)
+        if not batches:
+            return 0
+        results = await asyncio.gather(*(
+            self.deliver(client, destination, events) for destination, events in batches.items()
+        ))
+        await sync_to_async(record_results)(results)
+        return sum(len(events) for events in batches.values())
+
+    async def run(self, once=False, stop_event=None):
+        """
+        Ciclo principal. Con ``once=True`` vacía la cola disponible y termina.
+
+        Corre fuera del ciclo de peticiones, así que descarta en cada vuelta la
+        conexión a la base de datos caída o vencida por ``CONN_MAX_AGE``. En
+        modo continuo un error del ciclo se registra y se reintenta tras
+        ``poll_interval``: los eventos reclamados vuelven a la cola al vencer
+        su lease.
+        """
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
+            while stop_event is None or not stop_event.is_set():
+                await sync_to_async(close_old_connections)()
+                try:
+                    processed = await self.run_once(client)
+                except Exception:
+                    if once:
+                        raise
+                    logger.exception('Error en el ciclo de entrega; reintento en %ss', self.poll_interval)
+                    await sync_to_async(close_old_connections)()
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                if processed:
+                    continue
+                if once:
+                    return
+                await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,29 @@
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+
+from webhooks.delivery import DeliveryWorker
+
+
+class Command(BaseCommand):
+    """Worker que entrega el outbox de eventos de citas a n8n"""
+    help = 'Entrega los eventos pendientes del outbox a los webhooks configurados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Eventos reclamados por ciclo')
+        parser.add_argument('--interval', type=float, default=2.0, help='Segundos entre revisiones de la cola vacía')
+        parser.add_argument('--once', action='store_true', help='Vaciar la cola disponible y terminar')
+
+    def handle(self, *args, **options):
+        worker = DeliveryWorker(batch_size=options['batch_size'], poll_interval=options['interval'])
+        self.stdout.write('🚀 Entregando eventos del outbox...')
+        start = time.perf_counter()
+        try:
+            async_to_sync(worker.run)(once=options['once'])
+        except KeyboardInterrupt:
+            pass
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Entregados: {worker.delivered} | Fallidos: {worker.failed} | {elapsed:.2f}s'
+        ))
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:09
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destination', models.CharField(max_length=50, verbose_name='Destino')),
+                ('event_type', models.CharField(max_length=30, verbose_name='Tipo de evento')),
+                ('appointment_id', models.BigIntegerField(verbose_name='Cita')),
+                ('payload', models.JSONField(verbose_name='Datos')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('delivered', 'Entregado'), ('dead', 'Descartado')], default='pending', max_length=10, verbose_name='Estado')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próximo intento')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último error')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Evento saliente',
+                'verbose_name_plural': 'Eventos salientes',
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,42 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+class OutboxEvent(models.Model):
+    """
+    Evento pendiente de entregar a un destino externo (n8n).
+
+    Se escribe en la misma transacción que el cambio de la cita y lo entrega
+    el worker asíncrono de ``webhooks.delivery``.
+    """
+
+    STATUS_CHOICES = (
+        ('pending', 'Pendiente'),
+        ('delivered', 'Entregado'),
+        ('dead', 'Descartado'),
+    )
+
+    destination = models.CharField(max_length=50, verbose_name='Destino')
+    event_type = models.CharField(max_length=30, verbose_name='Tipo de evento')
+    appointment_id = models.BigIntegerField(verbose_name='Cita')
+    payload = models.JSONField(verbose_name='Datos')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name='Estado')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Intentos')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Próximo intento')
+    last_error = models.TextField(blank=True, verbose_name='Último error')
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Evento saliente'
+        verbose_name_plural = 'Eventos salientes'
+        ordering = ['id']
+        indexes = [
+            # Cola del worker: solo los pendientes, por fecha de próximo intento
+            models.Index(
+                fields=['next_attempt_at'], condition=models.Q(status='pending'),
+                name='outbox_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} cita {self.appointment_id} → {self.destination} ({self.status})"
@@ -0,0 +1,33 @@
+"""
+Escritura de eventos de citas en el outbox transaccional.
+"""
+from django.conf import settings
+
+from appointments.payloads import appointment_payload
+from .models import OutboxEvent
+
+
+def destinations_for(event_type):
+    """Nombres de los destinos de ``WEBHOOK_DESTINATIONS`` suscritos al evento"""
+    return [
+        name for name, destination in settings.WEBHOOK_DESTINATIONS.items()
+        if event_type in destination.get('events', ())
+    ]
+
+
+def record_appointment_event(appointment, event_type):
+    """
+    Guarda el evento para cada destino suscrito. Debe llamarse dentro de la
+    transacción que modifica la cita para que ambos se confirmen juntos.
+    """
+    destinations = destinations_for(event_type)
+    if not destinations:
+        return []
+    payload = {'event_type': event_type, 'appointment': appointment_payload(appointment)}
+    return OutboxEvent.objects.bulk_create([
+        OutboxEvent(
+            destination=destination, event_type=event_type,
+            appointment_id=appointment.id, payload=payload
+        )
+        for destination in destinations
+    ])
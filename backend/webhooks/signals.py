@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from appointments.models import Appointment
+from .outbox import record_appointment_event
+
+# Estado nuevo de la cita -> evento publicado
+STATUS_EVENTS = {
+    'confirmed': 'confirmed',
+    'cancelled': 'cancelled',
+}
+
+
+@receiver(post_save, sender=Appointment, dispatch_uid='webhooks_appointment_outbox')
+def appointment_outbox(sender, instance, created, raw=False, **kwargs):
+    """Publica en el outbox la creación y los cambios de estado de la cita"""
+    if raw:
+        return
+    if created:
+        record_appointment_event(instance, 'created')
+    elif instance.status != instance.previous_status and instance.status in STATUS_EVENTS:
+        record_appointment_event(instance, STATUS_EVENTS[instance.status])
@@ -1,3 +1,157 @@
-from django.test import TestCase
+import json
+import threading
+from datetime import date, time, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import OperationalError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from appointments.models import Appointment, Service
+from users.models import User
+from .delivery import DeliveryWorker
+from .models import OutboxEvent
+
+
+class StubWebhookServer:
+    """Servidor HTTP local que hace de n8n: guarda los cuerpos recibidos"""
+
+    def __init__(self, status=200):
+        received = self.received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers['Content-Length'])
+                received.append(json.loads(self.rfile.read(length)))
+                self.send_response(status)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/webhook'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(
+            email='paciente@test.com', password='x', first_name='Ana', last_name='López', user_type='patient'
+        )
+        cls.professional = User.objects.create_user(
+            email='doctor@test.com', password='x', first_name='Juan', last_name='Pérez', user_type='professional'
+        )
+        cls.service = Service.objects.create(name='Consulta General', duration=30)
+
+    def book(self, appointment_time=time(10, 0)):
+        return Appointment.objects.create(
+            patient=self.patient, professional=self.professional, service=self.service,
+            appointment_date=date.today() + timedelta(days=3), appointment_time=appointment_time
+        )
+
+    def run_worker(self, url, **kwargs):
+        worker = DeliveryWorker(destinations={'n8n': {'url': url}}, **kwargs)
+        # Dentro de la transacción de TestCase cerrar la conexión rompería el test
+        with mock.patch('webhooks.delivery.close_old_connections'):
+            async_to_sync(worker.run)(once=True)
+        return worker
+
+    def test_booking_writes_outbox_event(self):
+        appointment = self.book()
+        event = OutboxEvent.objects.get()
+        self.assertEqual((event.destination, event.event_type), ('n8n', 'created'))
+        self.assertEqual(event.appointment_id, appointment.id)
+        self.assertEqual(event.payload['appointment']['patient']['email'], 'paciente@test.com')
+
+    def test_status_transitions_write_events(self):
+        appointment = self.book()
+        appointment.notes = 'Sin cambios de estado'
+        appointment.save()
+        appointment.status = 'confirmed'
+        appointment.save()
+        appointment = Appointment.objects.get(id=appointment.id)
+        appointment.status = 'cancelled'
+        appointment.save(update_fields=['status'])
+        self.assertEqual(
+            list(OutboxEvent.objects.values_list('event_type', flat=True)),
+            ['created', 'confirmed', 'cancelled']
+        )
+
+    def test_payload_keeps_booked_duration(self):
+        appointment = self.book()
+        Service.objects.filter(id=self.service.id).update(duration=60)
+        appointment = Appointment.objects.get(id=appointment.id)
+        appointment.status = 'confirmed'
+        appointment.save()
+        event = OutboxEvent.objects.get(event_type='confirmed')
+        self.assertEqual(event.payload['appointment']['service']['duration'], 30)
+
+    def test_event_is_rolled_back_with_booking(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.book()
+                raise RuntimeError
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_worker_delivers_pending_events(self):
+        self.book()
+        self.book(appointment_time=time(11, 0))
+        with StubWebhookServer() as server:
+            worker = self.run_worker(server.url)
+        self.assertEqual(worker.delivered, 2)
+        self.assertEqual(len(server.received), 1)
+        self.assertEqual(len(server.received[0]['events']), 2)
+        self.assertFalse(OutboxEvent.objects.exclude(status='delivered').exists())
+
+    @override_settings(WEBHOOK_MAX_ATTEMPTS=2, WEBHOOK_RETRY_BASE_SECONDS=60)
+    def test_failed_delivery_backs_off_then_dead_letters(self):
+        self.book()
+        with StubWebhookServer(status=500) as server:
+            self.run_worker(server.url)
+            event = OutboxEvent.objects.get()
+            self.assertEqual((event.status, event.attempts), ('pending', 1))
+            self.assertGreater(event.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+            # Ya no está vencido: el worker no lo reintenta hasta que pase el backoff
+            self.run_worker(server.url)
+            self.assertEqual(len(server.received), 1)
+
+            OutboxEvent.objects.update(next_attempt_at=timezone.now())
+            with self.assertLogs('webhooks.delivery', 'ERROR'):
+                self.run_worker(server.url)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('dead', 2))
+        self.assertIn('500', event.last_error)
+
+    def test_loop_survives_database_errors(self):
+        stop = threading.Event()
+        calls = []
+
+        async def run_once(client):
+            calls.append(client)
+            if len(calls) == 1:
+                raise OperationalError('server closed the connection unexpectedly')
+            stop.set()
+            return 0
+
+        worker = DeliveryWorker(destinations={'n8n': {'url': 'http://127.0.0.1:9/webhook'}}, poll_interval=0)
+        closes = mock.patch('webhooks.delivery.close_old_connections')
+        with mock.patch.object(worker, 'run_once', run_once), closes as close_old_connections, \
+                self.assertLogs('webhooks.delivery', 'ERROR'):
+            async_to_sync(worker.run)(stop_event=stop)
+        self.assertEqual(len(calls), 2)
+        # Una por vuelta (2) y otra tras el ciclo fallido
+        self.assertEqual(close_old_connections.call_count, 3)
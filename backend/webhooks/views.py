@@ -3,6 +3,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import json
 from appointments.models import Appointment
+from appointments.payloads import appointment_payload
 
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -23,26 +24,7 @@ def appointment_webhook(request):
         # Datos para n8n
         webhook_data = {
             'event_type': event_type,
-            'appointment': {
-                'id': appointment.id,
-                'date': str(appointment.appointment_date),
-                'time': str(appointment.appointment_time),
-                'status': appointment.status,
-                'patient': {
-                    'id': appointment.patient.id,
-                    'name': appointment.patient.get_full_name(),
-                    'phone': appointment.patient.phone,  # Asegúrate de que este campo exista
-                    'email': appointment.patient.email
-                },
-                'professional': {
-                    'name': appointment.professional.get_full_name(),
-                    'specialty': appointment.professional.specialty
-                },
-                'service': {
-                    'name': appointment.service.name,
-                    'duration': appointment.service.duration
-                }
-            }
+            'appointment': appointment_payload(appointment)
         }
         
         return JsonResponse(webhook_data)
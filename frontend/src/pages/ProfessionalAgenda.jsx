@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Calendar, Clock, User, CheckCircle, XCircle } from 'lucide-react';
-import { appointmentService } from '../services/api';
+import { appointmentService, pushService } from '../services/api';
 import CreateAppointment from '../components/CreateAppointment';
 
 const ProfessionalAgenda = () => {
@@ -14,27 +14,43 @@ const ProfessionalAgenda = () => {
     loadAppointments();
   }, [selectedDate]);
 
-  const loadAppointments = async () => {
-    setLoading(true);
+  // Reservas y cancelaciones en vivo: recarga el mes (revalidado con ETag)
+  // cuando llega un evento de una cita de ese mes, sin mostrar el spinner
+  useEffect(() => {
+    const monthPrefix = selectedDate.slice(0, 7);
+    return pushService.subscribe((message) => {
+      if (message.event === 'resync' || message.appointment?.date.startsWith(monthPrefix)) {
+        loadAppointments({ silent: true });
+      }
+    });
+  }, [selectedDate]);
+
+  const loadAppointments = async ({ silent = false } = {}) => {
+    if (!silent) setLoading(true);
     try {
-      // CONECTAR CON BACKEND REAL
-      const data = await appointmentService.getAppointments();
+      // Agenda del mes de la fecha seleccionada, ya agrupada por día
+      const [year, month] = selectedDate.split('-').map(Number);
+      const lastDay = new Date(year, month, 0).getDate();
+      const monthPrefix = `${year}-${String(month).padStart(2, '0')}`;
+      const data = await appointmentService.getAgenda(`${monthPrefix}-01`, `${monthPrefix}-${lastDay}`);
       
-      // Transformar datos del backend
-      const transformedAppointments = data.map(appointment => ({
-        id: appointment.id,
-        patient_name: `${appointment.patient?.first_name || ''} ${appointment.patient?.last_name || ''}`,
-        service: appointment.service?.name || 'Consulta',
-        date: appointment.appointment_date,
-        time: appointment.appointment_time,
-        duration: 30, // Por defecto
-        status: appointment.status || 'pending',
-        notes: appointment.notes
-      }));
+      const transformedAppointments = Object.entries(data.days).flatMap(([date, dayAppointments]) =>
+        dayAppointments.map(appointment => ({
+          id: appointment.id,
+          patient_name: appointment.patient_name,
+          service: appointment.service_name,
+          date,
+          time: appointment.time,
+          duration: appointment.duration,
+          status: appointment.status
+        }))
+      );
       
       setAppointments(transformedAppointments);
     } catch (error) {
       console.error('Error loading appointments:', error);
+      // En una recarga en segundo plano se conserva lo que ya se muestra
+      if (silent) return;
       // Fallback a datos mock si hay error
       setAppointments([
         {
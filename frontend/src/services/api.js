@@ -111,13 +111,21 @@ export const authService = {
 export const appointmentService = {
   getAppointments: async () => {
     try {
-      const response = await api.get('/appointments/');
+      // paginate=false: lista completa sin paginar (modo compatibilidad)
+      const response = await api.get('/appointments/', { params: { paginate: 'false' } });
       return response.data;
     } catch (error) {
       console.error('Error obteniendo citas:', error.message);
       return [];
     }
   },
+
+  // Agenda agrupada por día entre dos fechas (YYYY-MM-DD). El servidor envía
+  // un ETag y el navegador revalida solo: si nada cambió, responde 304
+  getAgenda: async (from, to) => {
+    const response = await api.get('/appointments/agenda/', { params: { from, to } });
+    return response.data;
+  },
   
   createAppointment: async (appointmentData) => {
     try {
@@ -165,9 +173,12 @@ export const appointmentService = {
 };
 
 export const userService = {
-  getProfessionals: async () => {
+  // Lista completa (paginate=false); filters: { search, specialty } se aplican en el servidor
+  getProfessionals: async (filters = {}) => {
     try {
-      const response = await api.get('/users/professionals/');
+      const response = await api.get('/users/professionals/', {
+        params: { ...filters, paginate: 'false' }
+      });
       return response.data;
     } catch (error) {
       console.warn('Usando profesionales de respaldo');
@@ -179,6 +190,70 @@ export const userService = {
   }
 };
 
+export const syncService = {
+  // Citas y reseñas cambiadas desde la marca `since` (sin marca: copia completa,
+  // con reset: true). Aplicar los cambios, borrar los ids de `deleted` y repetir
+  // con since = watermark mientras has_more sea true
+  getChanges: async (since = null) => {
+    const response = await api.get('/sync/', { params: since ? { since } : {} });
+    return response.data;
+  }
+};
+
+export const pushService = {
+  // Eventos en vivo de las citas del usuario (SSE en /api/push/, solo con el
+  // servidor en modo asgi; con 404 deja de intentar). Se lee con fetch para
+  // poder enviar el token en el header; reconecta solo. onEvent recibe { event: 'created' | 'updated' |
+  // 'deleted' | 'resync', appointment }. Devuelve la función para cerrar.
+  subscribe: (onEvent) => {
+    const controller = new AbortController();
+    let retryDelay = 1000;
+    let connectedBefore = false;
+
+    const connect = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          const token = localStorage.getItem('access_token');
+          const response = await fetch(`${API_BASE_URL}/api/push/`, {
+            headers: token ? { Authorization: `Bearer ${token}` } : {},
+            signal: controller.signal,
+          });
+          if (response.status === 401 || response.status === 403) return;
+          // Servidor WSGI (sin /api/push/): no hay canal que esperar
+          if (response.status === 404) return;
+          if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+          retryDelay = 1000;
+          // Al reconectar pudo perderse algo: que la vista recargue
+          if (connectedBefore) onEvent({ event: 'resync' });
+          connectedBefore = true;
+          const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+          let buffer = '';
+          for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += value;
+            const messages = buffer.split('\n\n');
+            buffer = messages.pop();
+            messages
+              .flatMap(message => message.split('\n'))
+              .filter(line => line.startsWith('data: '))
+              .forEach(line => onEvent(JSON.parse(line.slice(6))));
+          }
+        } catch (error) {
+          if (controller.signal.aborted) return;
+          console.warn('Canal de eventos desconectado:', error.message);
+        }
+        await new Promise(resolve => setTimeout(resolve, retryDelay));
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      }
+    };
+
+    connect();
+    return () => controller.abort();
+  }
+};
+
 // Configurar token al cargar
 const token = localStorage.getItem('access_token');
 if (token) {
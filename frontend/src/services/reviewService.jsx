@@ -4,7 +4,7 @@ const reviewService = {
   // Obtener reseñas del usuario actual
   getMyReviews: async () => {
     try {
-      const response = await api.get('/reviews/my_reviews/');
+      const response = await api.get('/reviews/my_reviews/', { params: { paginate: 'false' } });
       return { success: true, data: response.data };
     } catch (error) {
       console.error('Error getting user reviews:', error);
@@ -58,10 +58,10 @@ const reviewService = {
   },
 
   // Obtener reseñas de un profesional específico
-  getProfessionalReviews: async (professionalId, page = 1, pageSize = 10) => {
+  getProfessionalReviews: async (professionalId) => {
     try {
       const response = await api.get(`/reviews/professional/${professionalId}/`, {
-        params: { page, page_size: pageSize }
+        params: { paginate: 'false' }
       });
       return { success: true, data: response.data };
     } catch (error) {
@@ -158,7 +158,7 @@ const reviewService = {
       }
       
       // Verificar que no existe ya una reseña para esta cita
-      const myReviewsResponse = await api.get('/reviews/my_reviews/');
+      const myReviewsResponse = await api.get('/reviews/my_reviews/', { params: { paginate: 'false' } });
       const existingReview = myReviewsResponse.data.find(
         review => review.appointment === appointmentId
       );
@@ -193,26 +193,19 @@ const reviewService = {
     }
   },
 
-  // Obtener citas completadas que pueden ser reseñadas
-  getReviewableAppointments: async () => {
+  // Obtener citas completadas que pueden ser reseñadas (filtradas en el servidor)
+  getReviewableAppointments: async (cursor = null) => {
     try {
-      // Obtener todas las citas del usuario
-      const appointmentsResponse = await api.get('/appointments/');
-      const myReviewsResponse = await api.get('/reviews/my_reviews/');
-      
-      const appointments = appointmentsResponse.data;
-      const myReviews = myReviewsResponse.data;
-      
-      // Filtrar citas completadas que no tienen reseña
-      const reviewableAppointments = appointments.filter(appointment => {
-        const isCompleted = appointment.status === 'completed';
-        const hasReview = myReviews.some(review => review.appointment === appointment.id);
-        return isCompleted && !hasReview;
+      const response = await api.get('/appointments/reviewable/', {
+        params: cursor ? { cursor } : {}
       });
+      const { results, next } = response.data;
       
       return { 
         success: true, 
-        data: reviewableAppointments 
+        data: results,
+        // Cursor de la siguiente página (null si no hay más)
+        nextCursor: next ? new URL(next).searchParams.get('cursor') : null
       };
     } catch (error) {
       console.error('Error getting reviewable appointments:', error);